@@ -0,0 +1 @@
+"""Performance benchmarks for the simulation hot paths; run with ``python -m benchmarks``."""
@@ -0,0 +1,67 @@
+"""Run the benchmark suite: ``python -m benchmarks``.
+
+``--out report.json`` writes the machine-readable report; ``--compare
+baseline.json`` prints the median ratio of every case against an earlier
+report and exits with status 1 when any case is slower by more than
+``--threshold``. Baselines only mean something on the machine that made them.
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+
+from .cases import BUILDS, all_cases
+from .harness import DEFAULT_THRESHOLD, compare, format_comparison, format_report, load_report, run_cases, save_report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='PPMonk simulation benchmarks.')
+    parser.add_argument('-k', '--filter', default=None, help='regex; only run cases whose name matches')
+    parser.add_argument('--builds', nargs='*', default=list(BUILDS), choices=list(BUILDS))
+    parser.add_argument('--repeat', type=int, default=5, help='minimum samples per case')
+    parser.add_argument('--min-time', type=float, default=0.2, help='minimum timed seconds per case')
+    parser.add_argument('--quick', action='store_true', help='3 samples and 0.05s per case (smoke runs)')
+    parser.add_argument('--list', action='store_true', help='list the case names and exit')
+    parser.add_argument('--out', default=None, help='write the JSON report here')
+    parser.add_argument('--compare', default=None, metavar='BASELINE', help='JSON report to compare against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='relative slowdown of the median that counts as a regression (default %(default)s)')
+    args = parser.parse_args(argv)
+
+    cases = all_cases(args.builds)
+    if args.filter:
+        pattern = re.compile(args.filter)
+        cases = [case for case in cases if pattern.search(case.name)]
+    if args.list:
+        print('\n'.join(case.name for case in cases))
+        return 0
+    baseline = load_report(args.compare) if args.compare else None
+    if baseline is not None and (args.filter or len(args.builds) < len(BUILDS)):
+        # A partial run is only compared on the cases it selected
+        selected = {case.name for case in cases}
+        baseline['results'] = {name: r for name, r in baseline['results'].items() if name in selected}
+
+    repeat, min_time = (3, 0.05) if args.quick else (args.repeat, args.min_time)
+
+    def progress(name, result):
+        print(f"{name}: {result['us_per_unit']['median']:.2f}us per {result['unit']}", file=sys.stderr)
+
+    report = run_cases(cases, repeat=repeat, min_time=min_time, progress=progress)
+    if args.out:
+        save_report(report, args.out)
+    if baseline is None:
+        print(format_report(report))
+        return 0
+    rows, added, removed = compare(report, baseline)
+    print(format_comparison(rows, added, removed, args.threshold))
+    regressions = [row.name for row in rows if row.status(args.threshold) == 'REGRESSION']
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
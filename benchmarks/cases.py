@@ -0,0 +1,167 @@
+"""Benchmark cases for the simulation hot paths.
+
+Every case runs once per representative build in ``BUILDS``. Case names are
+``<subsystem>/<build>`` (``spell_cast/<build>/<spell>`` for casts), and
+reports are keyed by them, so they must stay stable across versions.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, List, Sequence
+
+from ppmonk.core.player import PlayerState
+from ppmonk.core.rng import CombatRng
+from ppmonk.core.spell_book import SpellBook
+
+from .harness import Case
+
+# talents, PlayerState kwargs
+BUILDS: Dict[str, tuple] = {
+    'default': (['1-1', '5-4', '7-3', '9-7', '2-1', '8-1', '9-4', '9-8', '10-5'], {}),
+    'shado_pan': (['1-1', '5-4', '7-3_b', '9-7', 'hero-sp-header', 'hero-sp-choice1', '8-1', '9-4', '9-5', '4-1'], {}),
+    'cotc': (['1-1', '5-4', '7-3_b', '9-7', 'hero-cotc-header', 'hero-cotc-choice2', '2-1', '9-8', '8-1'], {}),
+    'aoe8': (['1-1', '5-4', '7-3', '9-7', '2-1', '8-1', '9-4', '9-8', '10-5'], {'target_count': 8}),
+}
+# The env's hot-path settings: event-driven regen and no combat log
+ENGINE_KWARGS = {'event_driven': True, 'detail_level': 'none'}
+EPISODE_SECONDS = 60.0
+ADVANCE_STEP = 0.5
+
+
+def _player(build: str):
+    talents, kwargs = BUILDS[build]
+    player = PlayerState(**ENGINE_KWARGS, **kwargs)
+    book = SpellBook(talents=talents)
+    book.apply_talents(player)
+    player.rng = CombatRng(0)
+    return player, book
+
+
+def _timeline():
+    from ppmonk.core.timeline import Timeline
+
+    return Timeline(spec={'name': 'benchmark 60s', 'duration': EPISODE_SECONDS, 'scenario': 0})
+
+
+def _env(build: str):
+    from ppmonk.envs.monk_env import MonkEnv
+
+    talents, kwargs = BUILDS[build]
+    env = MonkEnv(current_talents=list(talents), player_kwargs=dict(kwargs), detail_level='none',
+                  timeline=_timeline())
+    env.training_mode = False
+    env.reset(seed=0)  # Builds the cached talent profile outside the timed loops
+    return env
+
+
+def advance_time(build: str) -> Case:
+    """``PlayerState.advance_time`` over a minute of combat, per simulated second."""
+
+    def sample():
+        player, _ = _player(build)
+        steps = int(EPISODE_SECONDS / ADVANCE_STEP)
+        started = time.perf_counter()
+        for _ in range(steps):
+            player.advance_time(ADVANCE_STEP)
+        return int(EPISODE_SECONDS), time.perf_counter() - started
+
+    return Case(f'advance_time/{build}', 'simulated second', sample)
+
+
+def spell_cast(build: str, abbr: str, calls: int = 200) -> Case:
+    """``Spell.cast`` with resources and cooldown refilled before every call."""
+
+    def sample():
+        player, book = _player(build)
+        spell = book.spells[abbr]
+        meter: Dict[str, float] = {}
+        started = time.perf_counter()
+        for _ in range(calls):
+            player.energy, player.chi, player.gcd_remaining = player.max_energy, player.max_chi, 0.0
+            spell.current_cd = 0.0
+            spell.cast(player, other_spells=book.spells, damage_meter=meter)
+        return calls, time.perf_counter() - started
+
+    return Case(f'spell_cast/{build}/{abbr}', 'call', sample)
+
+
+def spellbook(build: str, count: int = 20) -> Case:
+    """``SpellBook`` construction plus ``apply_talents`` onto a fresh player."""
+    talents, kwargs = BUILDS[build]
+
+    def sample():
+        players = [PlayerState(**ENGINE_KWARGS, **kwargs) for _ in range(count)]
+        started = time.perf_counter()
+        for player in players:
+            SpellBook(talents=talents).apply_talents(player)
+        return count, time.perf_counter() - started
+
+    return Case(f'spellbook/{build}', 'build', sample)
+
+
+def env_reset(build: str, count: int = 50) -> Case:
+    def sample():
+        env = _env(build)
+        started = time.perf_counter()
+        for i in range(count):
+            env.reset(seed=i)
+        return count, time.perf_counter() - started
+
+    return Case(f'env_reset/{build}', 'reset', sample)
+
+
+def env_step(build: str, steps: int = 500) -> Case:
+    """``MonkEnv.step`` alone: the policy and episode resets are outside the timer."""
+    from ppmonk.sim.montecarlo import PriorityPolicy
+
+    policy = PriorityPolicy()
+
+    def sample():
+        env = _env(build)
+        env.reset(seed=0)
+        elapsed = 0.0
+        for i in range(steps):
+            action = policy(env)
+            started = time.perf_counter()
+            _, _, done, _, _ = env.step(action)
+            elapsed += time.perf_counter() - started
+            if done:
+                env.reset(seed=i)
+        return steps, elapsed
+
+    return Case(f'env_step/{build}', 'step', sample)
+
+
+def episode(build: str) -> Case:
+    """A full 60 s Monte Carlo episode played by the priority rotation."""
+    from ppmonk.sim.montecarlo import PriorityPolicy, Profile, make_env, run_episode
+
+    talents, kwargs = BUILDS[build]
+    profile = Profile(build, talents, dict(kwargs), _timeline(), PriorityPolicy())
+
+    def sample():
+        env = make_env(profile)
+        run_episode(env, profile, 0)  # Warm the talent profile cache
+        started = time.perf_counter()
+        run_episode(env, profile, 1)
+        return 1, time.perf_counter() - started
+
+    return Case(f'episode_60s/{build}', 'episode', sample)
+
+
+def known_spells(build: str) -> List[str]:
+    _, book = _player(build)
+    return [abbr for abbr, spell in book.spells.items() if spell.is_known]
+
+
+def all_cases(builds: Sequence[str] = tuple(BUILDS)) -> List[Case]:
+    cases: List[Any] = []
+    for build in builds:
+        cases.append(advance_time(build))
+        cases.extend(spell_cast(build, abbr) for abbr in known_spells(build))
+        cases.append(spellbook(build))
+        cases.append(env_reset(build))
+        cases.append(env_step(build))
+        cases.append(episode(build))
+    return cases
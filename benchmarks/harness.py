@@ -0,0 +1,148 @@
+"""Timing, JSON reports and baseline comparison for the benchmark suite.
+
+A ``Case`` wraps a ``sample()`` callable that does its own untimed setup,
+times its hot loop with ``time.perf_counter`` and returns
+``(units, seconds)``. ``measure`` calls it until both ``repeat`` samples and
+``min_time`` seconds of timed work are collected and reports the time per
+unit (microseconds) across samples. Comparisons use the median, which a
+single preempted sample does not move.
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+import platform
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_THRESHOLD = 0.10
+REPORT_FORMAT = 1
+
+
+@dataclass
+class Case:
+    name: str
+    unit: str
+    sample: Callable[[], Tuple[int, float]]
+
+
+def measure(case: Case, repeat: int = 5, min_time: float = 0.2) -> Dict[str, Any]:
+    """Per-unit timings of ``case`` in microseconds."""
+    per_unit, units, elapsed = [], 0, 0.0
+    while len(per_unit) < repeat or elapsed < min_time:
+        n, seconds = case.sample()
+        per_unit.append(seconds / n * 1e6)
+        units += n
+        elapsed += seconds
+    return {
+        'unit': case.unit,
+        'us_per_unit': {
+            'min': min(per_unit),
+            'median': statistics.median(per_unit),
+            'mean': statistics.fmean(per_unit),
+            'stdev': statistics.stdev(per_unit) if len(per_unit) > 1 else 0.0,
+        },
+        'samples': len(per_unit),
+        'units': units,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def environment() -> Dict[str, Any]:
+    """Where a report was measured; timings only compare on the same machine."""
+    import numpy as np
+
+    from ppmonk.core.version import ENGINE_VERSION
+
+    return {
+        'engine': ENGINE_VERSION,
+        'commit': _git_commit(),
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+    }
+
+
+def run_cases(cases: Iterable[Case], repeat: int = 5, min_time: float = 0.2,
+              progress: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """Measure every case and return a JSON-ready report."""
+    results = {}
+    for case in cases:
+        results[case.name] = measure(case, repeat, min_time)
+        if progress is not None:
+            progress(case.name, results[case.name])
+    return {'format': REPORT_FORMAT, 'environment': environment(),
+            'settings': {'repeat': repeat, 'min_time': min_time}, 'results': results}
+
+
+def save_report(report: Dict[str, Any], path: str) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    if report.get('format') != REPORT_FORMAT:
+        raise ValueError(f"{path}: unsupported benchmark report format {report.get('format')!r}")
+    return report
+
+
+@dataclass
+class Comparison:
+    name: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline > 0 else float('inf')
+
+    def status(self, threshold: float) -> str:
+        if self.ratio > 1.0 + threshold:
+            return 'REGRESSION'
+        if self.ratio < 1.0 / (1.0 + threshold):
+            return 'faster'
+        return 'ok'
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> Tuple[List[Comparison], List[str], List[str]]:
+    """Median comparisons of the cases in both reports, plus the names only in one of them."""
+    now, then = current['results'], baseline['results']
+    rows = [Comparison(name, then[name]['us_per_unit']['median'], now[name]['us_per_unit']['median'])
+            for name in now if name in then]
+    return rows, sorted(set(now) - set(then)), sorted(set(then) - set(now))
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [f"{'case':<40} {'median':>12} {'min':>12}  unit"]
+    for name, result in report['results'].items():
+        timing = result['us_per_unit']
+        lines.append(f"{name:<40} {timing['median']:>10.2f}us {timing['min']:>10.2f}us  {result['unit']}")
+    return '\n'.join(lines)
+
+
+def format_comparison(rows: List[Comparison], added: List[str], removed: List[str],
+                      threshold: float = DEFAULT_THRESHOLD) -> str:
+    lines = [f"{'case':<40} {'baseline':>12} {'current':>12} {'ratio':>7}"]
+    for row in rows:
+        lines.append(f"{row.name:<40} {row.baseline:>10.2f}us {row.current:>10.2f}us {row.ratio:>7.2f}  "
+                     f"{row.status(threshold)}")
+    lines.extend(f"{name:<40} (new, no baseline)" for name in added)
+    lines.extend(f"{name:<40} (missing from this run)" for name in removed)
+    return '\n'.join(lines)
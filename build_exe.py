@@ -12,7 +12,7 @@ def build():
 
     spec_content = r"""
 # -*- mode: python ; coding: utf-8 -*-
-from PyInstaller.utils.hooks import collect_all
+from PyInstaller.utils.hooks import collect_all, collect_submodules
 import os
 
 datas = []
@@ -40,9 +40,13 @@ for pkg in packages_to_collect:
     except Exception as e:
         print(f"Warning: could not collect {pkg}: {e}")
 
+# ppmonk's package __init__ files export names lazily through importlib, which
+# PyInstaller's import scan cannot follow
+hiddenimports += collect_submodules('ppmonk')
+
 # Add manual assets
 # Assume running from repo root
-datas += [('assets', 'assets')]
+datas += [('assets', 'assets'), ('configs', 'configs')]
 
 block_cipher = None
 
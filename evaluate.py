@@ -1,10 +1,39 @@
-"""Evaluation and playback script for PPMonk."""
+"""Evaluation and playback script for PPMonk.
+
+Works on policies exported to ``.npz`` (``train_best.py`` writes
+``models/best_model.npz``), so neither torch nor stable-baselines3 is
+imported: one logged fight via ``main.replay_policy``, then a Monte Carlo
+DPS estimate on the process pool.
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from main import SCENARIO_MAP, replay_policy
+from ppmonk.sim.montecarlo import MonteCarloRunner, Profile
+from ppmonk.sim.numpy_policy import NumpyPolicy
 
 
 def main() -> None:
-    """Placeholder evaluation routine."""
+    """Replay and Monte Carlo-evaluate an exported policy."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("policy", nargs="?", default="models/best_model.npz", help="exported .npz policy")
+    parser.add_argument("--talents", nargs="*", default=None, help="talent keys (none if omitted)")
+    parser.add_argument("--scenario", default="Patchwerk", choices=sorted(SCENARIO_MAP))
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--quiet", action="store_true", help="skip the logged replay fight")
+    args = parser.parse_args()
+
+    policy = NumpyPolicy.load(args.policy)
+    if not args.quiet:
+        replay_policy(policy, args.talents, {}, args.scenario)
 
-    print("Evaluation pipeline not yet implemented.")
+    profile = Profile(name=args.policy, talents=args.talents or (), timeline=SCENARIO_MAP[args.scenario], policy=policy)
+    with MonteCarloRunner(args.workers) as runner:
+        print(runner.run(profile, max_iterations=args.iterations).summary())
 
 
 if __name__ == "__main__":
@@ -1,115 +1,67 @@
 from ppmonk.core.visualizer import TimelineDataCollector
-from ppmonk.envs.monk_env import MonkEnv
+from ppmonk.utils.result_cache import ResultCache, cache_key
+
+# MonkEnv (gymnasium) and NumpyPolicy (numpy) are imported where they are used, torch and
+# sb3 only once training starts, so ``ui.py`` can import this module before its window opens
 
 SCENARIO_MAP = {
     "Patchwerk": 0,
     "Execute (End +200%)": 3
 }
 
-
-def mask_fn(env):
-    return env.action_masks()
-
-
-def make_env(rank, current_talents, player_kwargs):
-    def _init():
-        from sb3_contrib.common.wrappers import ActionMasker
-        from ppmonk.envs.monk_env import MonkEnv
-
-        env = MonkEnv(seed_offset=rank, current_talents=current_talents, player_kwargs=player_kwargs)
-        env = ActionMasker(env, mask_fn)
-        return env
-
-    return _init
-
-
-def run_simulation(
-        haste_rating=1500,
-        crit_rating=2000,
-        mastery_rating=1000,
-        vers_rating=500,
-        talents=None,
-        scenario_name="Patchwerk",
-        log_callback=print,
-        status_callback=None,
-        stop_event=None,
-        target_count=1,
-        **kwargs
-):
-    import torch
-    from sb3_contrib import MaskablePPO
-    from stable_baselines3.common.vec_env import SubprocVecEnv
-    from ppmonk.core.callbacks import TrainingControlCallback
-
-    if talents is None: talents = ['WDP', 'SW', 'Ascension', 'Zenith']
-
-    def log(msg):
-        if log_callback: log_callback(str(msg))
-
-    player_kwargs = {
-        'rating_haste': float(haste_rating),
-        'rating_crit': float(crit_rating),
-        'rating_mastery': float(mastery_rating),
-        'rating_vers': float(vers_rating),
-        'target_count': int(target_count)
-    }
-
-    log(f">>> 初始化 PPMonk (UI 模式)...")
-    log(f"  天赋: {talents}")
-    log(f"  属性: {player_kwargs}")
-    print(f"CUDA Available: {torch.cuda.is_available()}")
-    if torch.cuda.is_available():
-        print(f"Device Name: {torch.cuda.get_device_name(0)}")
-    else:
-        print("WARNING: Running on CPU! This will be slow.")
-
-    num_cpu = 8
-    env = SubprocVecEnv([make_env(i, talents, player_kwargs) for i in range(num_cpu)])
-
-    device = "cuda" if torch.cuda.is_available() else "cpu"
-    log(f"  设备: {device}")
-
-    if status_callback: status_callback("Training AI Model...", 0.1)
-
-    model = MaskablePPO(
-        "MlpPolicy",
-        env,
-        verbose=0,
-        device=device,
-        gamma=1.0,
-        learning_rate=3e-4,
-        ent_coef=0.02,
-        n_steps=512,
-        batch_size=1024,
+RATING_KEYS = ('rating_haste', 'rating_crit', 'rating_mastery', 'rating_vers')
+# Fine-tuning budget when a cached policy of the same build is close enough in stat space
+WARM_START_STEPS = 200000
+WARM_START_MAX_DISTANCE = 2000.0
+WARM_START_EVAL_FREQ = 20000
+
+
+def evaluate_policy_damage(policy, talents, player_kwargs, scenario, episodes=3):
+    """Mean damage of a ``NumpyPolicy`` over ``episodes`` fixed-seed fights."""
+    from ppmonk.envs.monk_env import MonkEnv
+
+    env = MonkEnv(current_talents=talents, player_kwargs=player_kwargs, detail_level='none')
+    env.training_mode = False
+    total = 0.0
+    for seed in range(episodes):
+        obs, _ = env.reset(seed=seed, options={'timeline': scenario})
+        done = False
+        while not done:
+            obs, _, done, _, info = env.step(policy.act(obs, env.action_masks()))
+            total += info['damage']
+    return total / episodes
+
+
+def _cell(entry, keys, width, scale=1.0):
+    # Cast and auto-attack logs name their fields differently; missing ones print as '-'
+    for key in keys:
+        value = entry.get(key)
+        if isinstance(value, (int, float)):
+            return f"{value * scale:<{width}.2f}"
+    return f"{'-':<{width}}"
+
+
+def _log_row(t_now, name, chi, en, entry):
+    return (
+        f"{t_now:<6.1f} | {name:<8} | {int(chi):<3} | {int(en):<4} | "
+        f"{_cell(entry, ('Base', 'Raw Base'), 10)} | {_cell(entry, ('Dmg Mod',), 8)} | "
+        f"{_cell(entry, ('Crit%',), 6) if 'Crit%' in entry else _cell(entry, ('final_crit',), 6, 100.0)} | "
+        f"{_cell(entry, ('Crit Mult', 'crit_mult'), 10)} | "
+        f"{_cell(entry, ('Expected DMG', 'Expected'), 12)}"
     )
 
-    total_steps = 1000000
-    log(f">>> 开始训练 ({total_steps} steps)...")
 
-    callback = TrainingControlCallback(
-        total_timesteps=total_steps,
-        status_callback=status_callback,
-        stop_event=stop_event,
-    )
+def replay_policy(policy, talents, player_kwargs, scenario_name="Patchwerk", log=print):
+    """Play one evaluation fight with an exported ``NumpyPolicy`` and log it; needs no torch.
 
-    model.learn(total_timesteps=total_steps, callback=callback)
-
-    if stop_event and stop_event.is_set():
-        log(">>> 训练已终止 (用户操作)")
-        if status_callback:
-            status_callback("Training Stopped", 0)
-        return {"total_ap": 0, "scenario": scenario_name, "status": "stopped"}
-
-    if status_callback: status_callback("Evaluating Strategy...", 0.8)
-
-    log("\n>>> 训练完成，开始评估...")
-    if status_callback: status_callback("Generating Timeline...", 0.95)
+    Returns the result dict of ``run_simulation`` (total damage, timeline
+    data for the timeline view and the damage meter).
+    """
+    from ppmonk.envs.monk_env import MonkEnv
 
+    target_scenario = SCENARIO_MAP.get(scenario_name, 0)
     eval_env = MonkEnv(current_talents=talents, player_kwargs=player_kwargs)
     eval_env.training_mode = False
-    eval_env = ActionMasker(eval_env, mask_fn)
-
-    target_scenario = SCENARIO_MAP.get(scenario_name, 0)
 
     log(f"\n{'=' * 30}")
     log(f"Testing Scenario: {scenario_name}")
@@ -123,28 +75,20 @@ def run_simulation(
     collector = TimelineDataCollector()
 
     while not done:
-        masks = eval_env.action_masks()
-        action, _ = model.predict(obs, action_masks=masks, deterministic=True)
-        action_item = action.item()
+        action_item = policy.act(obs, eval_env.action_masks())
 
-        t_now = eval_env.unwrapped.time
-        chi = eval_env.unwrapped.player.chi
-        en = eval_env.unwrapped.player.energy
+        t_now = eval_env.time
+        chi = eval_env.player.chi
+        en = eval_env.player.energy
 
         obs, reward, done, _, info = eval_env.step(action_item)
         dmg = info['damage']
         log_details = info.get('log_details', {})
         total_damage += dmg
-        act_name = eval_env.unwrapped.action_map[action_item]
-        duration = max(eval_env.unwrapped.time - t_now, 0.0)
+        act_name = eval_env.action_map[action_item]
+        duration = max(eval_env.time - t_now, 0.0)
         if action_item != 0 and log_details:
-            log_str = (
-                f"{t_now:<6.1f} | {act_name:<8} | {int(chi):<3} | {int(en):<4} | "
-                f"{log_details['Base']:<10.2f} | {log_details['Dmg Mod']:<8.2f} | "
-                f"{log_details['Crit%']:<6.2f} | {log_details['Crit Mult']:<10.2f} | "
-                f"{log_details['Expected DMG']:<12.2f}"
-            )
-            log(log_str)
+            log(_log_row(t_now, act_name, chi, en, log_details))
             collector.log_cast(t_now, act_name, duration=duration, damage=dmg, info=log_details)
             if 'extra_events' in log_details:
                 for extra in log_details['extra_events']:
@@ -153,19 +97,13 @@ def run_simulation(
             log(f"{t_now:<6.1f} | {'(Tick)':<8} | {int(chi):<3} | {int(en):<4} | {'-':<10} | {'-':<8} | {'-':<6} | {'-':<10} | {dmg:<12.2f}")
         auto_attack_logs = info.get('auto_attack_logs', [])
         for log_entry in auto_attack_logs:
-            log_str = (
-                f"{t_now:<6.1f} | {log_entry['Action']:<8} | {int(chi):<3} | {int(en):<4} | "
-                f"{log_entry['Base']:<10.2f} | {log_entry['Dmg Mod']:<8.2f} | "
-                f"{log_entry['Crit%']:<6.2f} | {log_entry['Crit Mult']:<10.2f} | "
-                f"{log_entry['Expected DMG']:<12.2f}"
-            )
-            log(log_str)
+            log(_log_row(t_now, log_entry['Action'], chi, en, log_entry))
             collector.log_cast(t_now, log_entry['Action'], duration=0.1, damage=log_entry.get('Expected DMG', 0), info=log_entry)
     log(f"{'-' * 30}")
     log(f"Total Damage Output: {total_damage:.2f}")
 
     # Summary Report
-    fight_duration = eval_env.unwrapped.time
+    fight_duration = eval_env.time
     total_damage_dealt = total_damage
     dps = total_damage_dealt / fight_duration if fight_duration > 0 else 0
     log("\n=== Summary Report ===")
@@ -175,7 +113,7 @@ def run_simulation(
     log("========================")
 
     # Damage Breakdown
-    damage_meter = eval_env.unwrapped.damage_meter
+    damage_meter = eval_env.damage_meter
     sorted_damage = sorted(damage_meter.items(), key=lambda item: item[1], reverse=True)
     total_damage_from_meter = sum(damage_meter.values())
 
@@ -186,10 +124,10 @@ def run_simulation(
     log(f"Total                 : {total_damage_from_meter:>8.0f}")
     log("========================")
 
-    p = eval_env.unwrapped.player
+    p = eval_env.player
     log(f"\n{'=' * 40}")
     log("FINAL CHARACTER STATS:")
-    log(f"  Talents: {eval_env.unwrapped.book.active_talents}")
+    log(f"  Talents: {eval_env.book.active_talents}")
     log(f"  Energy : {p.max_energy} (Regen: {10.0 * (1.0 + p.haste) * p.energy_regen_mult:.2f}/s)")
     log(f"  Haste  : {p.haste * 100:.2f}%")
     log(f"  Crit   : {p.crit * 100:.2f}%")
@@ -197,13 +135,167 @@ def run_simulation(
     log(f"  Vers   : {p.versatility * 100:.2f}%")
     log(f"{'=' * 40}\n")
 
-    if status_callback: status_callback("Complete", 1.0)
-
     return {
         "total_ap": total_damage_dealt,
         "scenario": scenario_name,
         "timeline_data": collector.get_data(),
+        "damage_meter": dict(damage_meter),
     }
 
+
+def run_simulation(
+        haste_rating=1500,
+        crit_rating=2000,
+        mastery_rating=1000,
+        vers_rating=500,
+        talents=None,
+        scenario_name="Patchwerk",
+        log_callback=print,
+        status_callback=None,
+        stop_event=None,
+        target_count=1,
+        result_cache=None,
+        **kwargs
+):
+    """Train a policy for the build and play one evaluation fight.
+
+    Finished runs are stored in ``result_cache`` (a ``ResultCache``, the
+    default one under ``cache/results`` if None, disabled with False); an
+    identical configuration returns the stored result and replays its log
+    without training. Otherwise, if the cache holds a policy for the same
+    talents, scenario and target count with ratings within
+    ``WARM_START_MAX_DISTANCE``, that policy is fine-tuned for at most
+    ``WARM_START_STEPS`` steps, stopping once its evaluation damage plateaus.
+    Fine-tunes are cached under their own key (step budget and source entry)
+    and only cold runs are used as warm-start sources.
+    """
+    if talents is None: talents = ['WDP', 'SW', 'Ascension', 'Zenith']
+
+    log_lines = []
+
+    def log(msg):
+        log_lines.append(str(msg))
+        if log_callback: log_callback(str(msg))
+
+    player_kwargs = {
+        'rating_haste': float(haste_rating),
+        'rating_crit': float(crit_rating),
+        'rating_mastery': float(mastery_rating),
+        'rating_vers': float(vers_rating),
+        'target_count': int(target_count)
+    }
+    target_scenario = SCENARIO_MAP.get(scenario_name, 0)
+    total_steps = 1000000
+
+    if result_cache is None:
+        result_cache = ResultCache()
+    key = cache_key(talents, player_kwargs, target_scenario, target_count, extra={'total_steps': total_steps})
+    cached = result_cache.get(key) if result_cache else None
+
+    # Only cold runs seed warm starts, so fine-tunes never chain off each other
+    warm_match = {'talents': list(dict.fromkeys(talents)), 'scenario': target_scenario,
+                  'target_count': int(target_count), 'warm_start_from': None}
+    stats = {stat: player_kwargs[stat] for stat in RATING_KEYS}
+    nearest = None
+    if cached is None and result_cache:
+        nearest = result_cache.nearest(warm_match, stats, WARM_START_MAX_DISTANCE)
+        if nearest:
+            # A fine-tune is its own result, never the cold run's
+            key = cache_key(talents, player_kwargs, target_scenario, target_count,
+                            extra={'total_steps': WARM_START_STEPS, 'warm_start_from': nearest[0]})
+            cached = result_cache.get(key)
+    if cached is not None:
+        for line in cached.get('log', []):
+            if log_callback: log_callback(line)
+        if log_callback: log_callback(f">>> 使用缓存结果 ({key[:12]})")
+        if status_callback: status_callback("Complete", 1.0)
+        return {**cached, "scenario": scenario_name, "cached": True}
+
+    import torch
+    from sb3_contrib import MaskablePPO
+    from ppmonk.core.callbacks import TrainingControlCallback
+    from ppmonk.envs.shared_vec_env import SharedMemoryMonkVecEnv
+    from ppmonk.sim.numpy_policy import NumpyPolicy
+
+    log(f">>> 初始化 PPMonk (UI 模式)...")
+    log(f"  天赋: {talents}")
+    log(f"  属性: {player_kwargs}")
+    print(f"CUDA Available: {torch.cuda.is_available()}")
+    if torch.cuda.is_available():
+        print(f"Device Name: {torch.cuda.get_device_name(0)}")
+    else:
+        print("WARNING: Running on CPU! This will be slow.")
+
+    num_cpu = 8
+    env = SharedMemoryMonkVecEnv(num_cpu, current_talents=talents, player_kwargs=player_kwargs)
+
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    log(f"  设备: {device}")
+
+    if status_callback: status_callback("Training AI Model...", 0.1)
+
+    if nearest:
+        warm_key, distance = nearest
+        model = MaskablePPO.load(result_cache.policy_path(warm_key), env=env, device=device)
+        train_steps = WARM_START_STEPS
+        log(f">>> 从缓存模型热启动 ({warm_key[:12]}, 属性距离 {distance:.0f})")
+        callback = TrainingControlCallback(
+            total_timesteps=train_steps,
+            status_callback=status_callback,
+            stop_event=stop_event,
+            eval_fn=lambda m: evaluate_policy_damage(NumpyPolicy.from_model(m), talents, player_kwargs, target_scenario),
+            eval_freq=WARM_START_EVAL_FREQ,
+        )
+    else:
+        warm_key = None
+        model = MaskablePPO(
+            "MlpPolicy",
+            env,
+            verbose=0,
+            device=device,
+            gamma=1.0,
+            learning_rate=3e-4,
+            ent_coef=0.02,
+            n_steps=512,
+            batch_size=1024,
+        )
+        train_steps = total_steps
+        callback = TrainingControlCallback(
+            total_timesteps=train_steps,
+            status_callback=status_callback,
+            stop_event=stop_event,
+        )
+
+    log(f">>> 开始训练 ({train_steps} steps)...")
+
+    model.learn(total_timesteps=train_steps, callback=callback)
+    if callback.plateaued:
+        log(f">>> 评估奖励已收敛，提前结束 ({callback.num_timesteps} steps)")
+    # Release the worker processes and shared buffers; evaluation runs on a local env
+    env.close()
+
+    if stop_event and stop_event.is_set():
+        log(">>> 训练已终止 (用户操作)")
+        if status_callback:
+            status_callback("Training Stopped", 0)
+        return {"total_ap": 0, "scenario": scenario_name, "status": "stopped"}
+
+    if status_callback: status_callback("Evaluating Strategy...", 0.8)
+
+    log("\n>>> 训练完成，开始评估...")
+    if status_callback: status_callback("Generating Timeline...", 0.95)
+
+    policy = NumpyPolicy.from_model(model)
+    result = replay_policy(policy, talents, player_kwargs, scenario_name, log)
+    if result_cache:
+        meta = {**warm_match, 'stats': stats, 'player_kwargs': player_kwargs,
+                'trained_steps': callback.num_timesteps, 'warm_start_from': warm_key}
+        result_cache.put(key, {**result, "log": log_lines}, save_policy=model.save,
+                         save_numpy_policy=policy.save, meta=meta)
+
+    if status_callback: status_callback("Complete", 1.0)
+
+    return result
+
 if __name__ == '__main__':
     run_simulation()
\ No newline at end of file
@@ -1,7 +1,13 @@
 """PPMonk package initialization."""
 
+from ppmonk.utils.lazy import lazy_exports
+
 __all__ = [
     "core",
     "envs",
+    "sim",
     "utils",
 ]
+
+# Subpackages load on first attribute access; ``import ppmonk`` itself stays free
+__getattr__, __dir__ = lazy_exports(__name__, {name: f".{name}" for name in __all__})
@@ -0,0 +1,7 @@
+"""``python -m ppmonk``: see ppmonk.cli."""
+
+import sys
+
+from ppmonk.cli import main
+
+sys.exit(main())
@@ -0,0 +1,203 @@
+"""Headless command line: ``python -m ppmonk <command>``.
+
+Only argparse is imported up front. Each command imports the part of the
+simulation stack it needs when it runs, and no command loads torch or
+stable-baselines3: policies are played through their ``.npz`` export.
+``COLD_START_BUDGET`` is the wall time the test suite allows for
+``python -m ppmonk --version``, from interpreter start to exit.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+
+COLD_START_BUDGET = 0.5  # seconds
+DEFAULT_TALENTS = ('WDP', 'SW', 'Ascension', 'Zenith')
+
+
+def _parse_value(text):
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+
+def _timeline(text):
+    return int(text) if text.isdigit() else text
+
+
+def _add_profile_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--talents', nargs='*', default=list(DEFAULT_TALENTS), help='talent keys in application order')
+    parser.add_argument('--stat', action='append', default=[], metavar='NAME=VALUE',
+                        help='PlayerState keyword, e.g. rating_haste=1800 (repeatable)')
+    parser.add_argument('--timeline', type=_timeline, default=0,
+                        help='built-in scenario 0-3 or a name from configs/timelines.yaml')
+    parser.add_argument('--policy', default=None, help='exported .npz policy (default: priority rotation)')
+
+
+def _add_runner_args(parser: argparse.ArgumentParser, iterations: int) -> None:
+    parser.add_argument('--iterations', type=int, default=iterations, help='maximum Monte Carlo iterations')
+    parser.add_argument('--ci', type=float, default=None, help='stop once the 95%% CI half-width is below this')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: all CPUs)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help='print the result as JSON')
+
+
+def _stats(pairs):
+    stats = {}
+    for pair in pairs:
+        name, sep, value = pair.partition('=')
+        if not sep:
+            raise SystemExit(f"--stat expects NAME=VALUE, got {pair!r}")
+        stats[name] = _parse_value(value)
+    return stats
+
+
+def build_profile(args):
+    """``Profile`` described by the profile arguments of ``args``."""
+    from ppmonk.sim.montecarlo import PriorityPolicy, Profile
+
+    if args.policy:
+        from ppmonk.sim.numpy_policy import NumpyPolicy
+
+        policy = NumpyPolicy.load(args.policy)
+    else:
+        policy = PriorityPolicy()
+    name = args.policy or ' '.join(args.talents) or 'no talents'
+    return Profile(name=name, talents=list(args.talents), player_kwargs=_stats(args.stat),
+                   timeline=args.timeline, policy=policy)
+
+
+def _emit(args, text, payload) -> None:
+    print(json.dumps(payload) if args.json else text)
+
+
+def cmd_sim(args) -> int:
+    from ppmonk.sim.montecarlo import MonteCarloRunner
+
+    profile = build_profile(args)
+    with MonteCarloRunner(args.workers, profiling=args.profile) as runner:
+        result = runner.run(profile, ci_target=args.ci, min_iterations=min(100, args.iterations),
+                            max_iterations=args.iterations, seed=args.seed)
+    meter = {name: stats.mean for name, stats in sorted(result.meter.items(), key=lambda item: -item[1].mean)}
+    payload = {
+        'name': result.name, 'dps': result.dps.mean, 'ci95': result.dps.ci95, 'iterations': result.iterations,
+        'converged': result.converged, 'elapsed': result.elapsed, 'damage_meter': meter,
+    }
+    text = result.summary()
+    if result.profiler is not None:
+        payload['profiler'] = result.profiler.as_dict()
+        text += '\n' + result.profiler.summary(f'profile ({result.profiler.episodes} episodes)')
+    _emit(args, text, payload)
+    return 0
+
+
+def cmd_weights(args) -> int:
+    from ppmonk.sim.montecarlo import MonteCarloRunner
+    from ppmonk.sim.stat_weights import stat_weights
+
+    profile = build_profile(args)
+    with MonteCarloRunner(args.workers) as runner:
+        result = stat_weights(profile, reference=args.reference, runner=runner, ci_target=args.ci,
+                              min_iterations=min(50, args.iterations), max_iterations=args.iterations, seed=args.seed)
+    _emit(args, result.summary(), {
+        'name': result.name, 'dps': result.base.mean, 'iterations': result.iterations, 'reference': result.reference,
+        'weights': {stat: {'weight': w.weight, 'error': w.error, 'normalized': w.normalized,
+                           'normalized_error': w.normalized_error} for stat, w in result.weights.items()},
+    })
+    return 0
+
+
+def cmd_optimize(args) -> int:
+    from ppmonk.sim.montecarlo import MonteCarloRunner
+    from ppmonk.sim.talent_optimizer import optimize_talents
+
+    with MonteCarloRunner(args.workers) as runner:
+        result = optimize_talents(points=args.points, player_kwargs=_stats(args.stat), beam_width=args.beam,
+                                  top_k=args.top_k, timeline=args.timeline, mc_iterations=args.iterations,
+                                  ci_target=args.ci, runner=runner, cache_path=args.cache or None, seed=args.seed)
+    _emit(args, result.summary(), {
+        'builds': [{'talents': list(b.talents), 'dps': b.dps, 'ci95': b.ci95, 'ev_dps': b.ev_dps}
+                   for b in result.builds],
+        'evaluated': result.evaluated, 'cached': result.cached,
+    })
+    return 0
+
+
+def cmd_batch(args) -> int:
+    from ppmonk.sim.batch import run_batch
+    from ppmonk.sim.montecarlo import MonteCarloRunner
+
+    output = args.out or os.path.splitext(args.manifest)[0] + '.results.jsonl'
+
+    def report(record):
+        print(f"{record['name']}: {record['dps']:,.0f} DPS ± {record['ci95']:,.0f} (n={record['iterations']})",
+              file=sys.stderr)
+
+    with MonteCarloRunner(args.workers, profiling=args.profile) as runner:
+        summary = run_batch(args.manifest, output, runner=runner, resume=not args.restart, on_result=report)
+    _emit(args, summary.summary(), {'total': summary.total, 'skipped': summary.skipped,
+                                    'completed': summary.completed, 'simulated': summary.simulated,
+                                    'output': summary.output})
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='ppmonk', description='Headless PPMonk simulations.')
+    parser.add_argument('--version', action='store_true', help='print the engine version and exit')
+    commands = parser.add_subparsers(dest='command', metavar='command')
+
+    sim = commands.add_parser('sim', help='Monte Carlo DPS of a build')
+    _add_profile_args(sim)
+    _add_runner_args(sim, iterations=1000)
+    sim.add_argument('--profile', action='store_true', help='count events and time per engine subsystem')
+    sim.set_defaults(handler=cmd_sim)
+
+    weights = commands.add_parser('weights', help='stat weights with common random numbers')
+    _add_profile_args(weights)
+    _add_runner_args(weights, iterations=500)
+    weights.add_argument('--reference', default='agility')
+    weights.set_defaults(handler=cmd_weights)
+
+    optimize = commands.add_parser('optimize', help='search for the best talent build')
+    optimize.add_argument('--stat', action='append', default=[], metavar='NAME=VALUE')
+    optimize.add_argument('--timeline', type=_timeline, default=0)
+    optimize.add_argument('--points', type=int, required=True, help='spec talent points to spend')
+    optimize.add_argument('--beam', type=int, default=12)
+    optimize.add_argument('--top-k', type=int, default=5)
+    optimize.add_argument('--cache', default='cache/talent_scores.json', help="score cache file ('' disables it)")
+    _add_runner_args(optimize, iterations=500)
+    optimize.set_defaults(handler=cmd_optimize)
+
+    batch = commands.add_parser('batch', help='run a YAML/JSON manifest of profiles, streaming results to JSONL')
+    batch.add_argument('manifest')
+    batch.add_argument('--out', default=None, help='JSONL output (default: <manifest>.results.jsonl)')
+    batch.add_argument('--restart', action='store_true', help='discard earlier results instead of resuming')
+    batch.add_argument('--workers', type=int, default=None, help='worker processes (default: all CPUs)')
+    batch.add_argument('--json', action='store_true', help='print the summary as JSON')
+    batch.add_argument('--profile', action='store_true', help="add per-subsystem counters to every result ('profiler')")
+    batch.set_defaults(handler=cmd_batch)
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.version:
+        from ppmonk.core.version import ENGINE_VERSION
+
+        print(f"ppmonk engine {ENGINE_VERSION}")
+        return 0
+    if args.command is None:
+        parser.print_help()
+        return 2
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,17 +1,37 @@
 # ppmonk/core/__init__.py
 
-# [修复] 使用绝对路径导入，彻底解决 "no known parent package" 问题
-from ppmonk.core.player import PlayerState as Player
-from ppmonk.core.spell_book import SpellBook
-from ppmonk.core.buff_manager import BuffManager
-from ppmonk.core.timeline import Timeline
-from ppmonk.core.talents import TalentManager, TALENT_DB
+from typing import TYPE_CHECKING
+
+from ppmonk.utils.lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from ppmonk.core.buff_manager import BuffManager
+    from ppmonk.core.player import PlayerState as Player
+    from ppmonk.core.profiler import Profiler
+    from ppmonk.core.rng import CombatRng
+    from ppmonk.core.spell_book import SpellBook
+    from ppmonk.core.talents import TALENT_DB, TalentManager
+    from ppmonk.core.timeline import Timeline
 
 __all__ = [
     "Player",
     "SpellBook",
     "BuffManager",
+    "Profiler",
+    "CombatRng",
     "Timeline",
     "TalentManager",
     "TALENT_DB"
-]
\ No newline at end of file
+]
+
+# Imported on first access: ``ppmonk.core.player`` alone must not load the timeline (numpy)
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "Player": "ppmonk.core.player:PlayerState",
+    "SpellBook": "ppmonk.core.spell_book:SpellBook",
+    "BuffManager": "ppmonk.core.buff_manager:BuffManager",
+    "Profiler": "ppmonk.core.profiler:Profiler",
+    "CombatRng": "ppmonk.core.rng:CombatRng",
+    "Timeline": "ppmonk.core.timeline:Timeline",
+    "TalentManager": "ppmonk.core.talents:TalentManager",
+    "TALENT_DB": "ppmonk.core.talents:TALENT_DB",
+})
@@ -0,0 +1,658 @@
+"""Struct-of-arrays simulator that advances N independent monks with numpy."""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+import numpy as np
+
+from ppmonk.core.mechanics import (COMBAT_WISDOM_COOLDOWN, COMBAT_WISDOM_CRIT, COMBO_BREAKER_CHANCE,
+                                   DANCE_OF_CHIJI_CHANCE_PER_CHI, DANCE_OF_CHIJI_DURATION,
+                                   DRINKING_HORN_COVER_ZENITH_DURATION, DUAL_THREAT_CHANCE, DUAL_THREAT_COEFF,
+                                   EXPEL_HARM_COEFF, FLURRY_OF_XUEN_CHANCE, JADEFIRE_STOMP_COEFF, JADE_IGNITION_COEFF,
+                                   MEMORY_OF_MONASTERY_CHANCE, MOMENTUM_BOOST_DURATION, RSK_RESET_CHANCE, RWK_COEFF,
+                                   THUNDERFIST_COEFF, THUNDERFIST_ICD, UNIVERSAL_ENERGY, WEAPON_OF_WIND,
+                                   XUEN_DURATION, ZENITH_DURATION, aura, auto_attack_coeff,
+                                   expected_auto_attack_coeff, flurry_of_xuen_base, hidden_aura, hit_combo_mult,
+                                   rwk_target_mult, soft_cap_scale, swing_speed, tick_teb, totm_base,
+                                   weapon_of_wind_mult, zenith_burst)
+from ppmonk.core.talent_profile import get_talent_profile
+
+# Hero-tree mechanics (Shado-Pan, Conduit of the Celestials) are not vectorized yet
+UNSUPPORTED_FLAGS = (
+    'has_shado_pan_base', 'has_pride_of_pandaria', 'has_high_impact', 'has_shado_over_battlefield',
+    'has_one_versus_many', 'has_stand_ready', 'has_weapons_of_the_wall', 'has_wisdom_of_the_wall',
+    'has_cotc_base', 'has_celestial_conduit', 'has_heart_of_jade_serpent', 'has_strength_of_black_ox',
+    'has_inner_compass', 'has_courage_of_white_tiger', 'has_xuens_guidance', 'has_temple_training',
+    'has_restore_balance', 'has_path_of_falling_star', 'has_unity_within',
+)
+
+SOFT_CAP_SPELLS = ('SOTWL', 'WDP')
+
+
+class _SpellTable:
+    """Static per-spell numbers read off the reference Spell once talents are applied."""
+
+    def __init__(self, spell, player) -> None:
+        self.spell = spell
+        self.abbr = spell.abbr
+        self.coeff = spell.tick_coeff
+        self.effective_cd = spell.get_effective_cd(player)
+        self.cast_time = spell.get_effective_cast_time(player)
+        self.tick_interval = spell.get_tick_interval(player)
+        self.gcd = spell.gcd_override if spell.gcd_override is not None else 1.0
+        self.crit_mult = 2.0 + spell.crit_damage_bonus + player.teb_crit_dmg_bonus
+
+        targets = player.target_count
+        modifiers = 1.0
+        for _, val in spell.modifiers:
+            modifiers *= val
+        haste = (1.0 + player.haste) if spell.haste_dmg_scaling else 1.0
+        auras = hidden_aura(self.abbr) * aura(self.abbr)
+        mitigation = player.get_physical_mitigation() if spell.damage_type == 'Physical' else 1.0
+        self.mult = mitigation * modifiers * haste * auras
+
+        crit_bonus = spell.bonus_crit_chance + sum(val for _, val in spell.crit_modifiers)
+        if self.abbr == 'RSK' and getattr(player, 'has_xuens_battlegear', False): crit_bonus += 0.20
+        if self.abbr == 'RSK' and getattr(player, 'has_skyfire_heel', False): crit_bonus += min(0.20, 0.04 * targets)
+        self.crit_bonus = crit_bonus
+
+        self.mastery_mult = 1.0 + player.mastery
+        if self.abbr == 'RSK' and getattr(player, 'has_sunfire_spiral', False):
+            self.mastery_mult = 1.0 + player.mastery * 1.2
+
+        skyfire_extra = 0.0
+        if self.abbr == 'RSK' and getattr(player, 'has_skyfire_heel', False) and targets > 1:
+            skyfire_extra = 0.10 * min(targets - 1, 5)
+        aoe_type = spell.aoe_type
+        if self.abbr == 'BOK' and getattr(player, 'has_shadowboxing', False): aoe_type = 'cleave'
+        self.aoe = spell._apply_aoe_scaling(1.0, player, aoe_type) + skyfire_extra
+
+        # Rushing Wind Kick replaces RSK's coefficient, ignores armor and always soft-caps
+        self.rwk_mult = modifiers * rwk_target_mult(targets) * haste * auras
+        self.rwk_aoe = spell._apply_aoe_scaling(1.0, player, 'soft_cap') + skyfire_extra
+
+
+class BatchPlayerState:
+    """N independent monks held as numpy arrays and advanced together.
+
+    The scalar ``PlayerState``/``SpellBook`` pair is the reference
+    implementation. Everything static (stats, spell coefficients, talent
+    modifiers, cooldowns) is read from a reference pair built with the same
+    talents, and proc coefficients, chances and timers come from
+    ``ppmonk.core.mechanics``, which both engines share. Only the runtime
+    state (energy, chi, charges, buffs, swing and channel timers) is
+    vectorized. Time advances like the reference player's: on the fixed
+    0.01s grid, or with ``event_driven=True`` straight to each monk's next
+    swing, tick or timer, so in expected-value mode each monk reproduces the
+    scalar result in either mode. Event-driven stepping needs as many numpy
+    passes as the busiest monk has events rather than one per 0.01s, and is
+    about 10x faster. Shado-Pan and Conduit of the Celestials talents are
+    rejected.
+    """
+
+    dt = 0.01
+
+    def __init__(self, n: int, talents: Optional[Iterable[str]] = None, use_expected_value: bool = False,
+                 rng: Optional[np.random.Generator] = None, seed: Optional[int] = None, **player_kwargs) -> None:
+        player, book = get_talent_profile(talents, {'detail_level': 'none', **player_kwargs}).instantiate()
+        unsupported = [flag for flag in UNSUPPORTED_FLAGS if getattr(player, flag, False)]
+        if unsupported:
+            raise ValueError(f"BatchPlayerState does not model: {', '.join(unsupported)}")
+
+        self.n = n
+        self.use_expected_value = use_expected_value
+        self.event_driven = player.event_driven
+        self.rng = rng if rng is not None else np.random.default_rng(seed)
+        self.reference = player
+        self.spell_index: Dict[str, int] = {abbr: i for i, abbr in enumerate(book.spells)}
+        self._spells = [_SpellTable(spell, player) for spell in book.spells.values()]
+        self.known = np.array([spell.is_known for spell in book.spells.values()])
+        self._max_charges = np.array([spell.max_charges for spell in book.spells.values()])
+        self._base_cd = np.array([float(spell.base_cd) for spell in book.spells.values()])
+
+        # Static stats and talent flags
+        self.ap_agi = player.attack_power * player.agility
+        self.haste = player.haste
+        self.mastery = player.mastery
+        self.versatility = player.versatility
+        self.target_count = player.target_count
+        self.max_chi = player.max_chi
+        self.max_energy = player.max_energy
+        self.energy_regen = 10.0 * (1.0 + player.haste) * player.energy_regen_mult
+        self.base_swing_time = player.base_swing_time
+        self.weapon_type = player.weapon_type
+        self.max_totm_stacks = player.max_totm_stacks
+        self.teb_crit_dmg_bonus = player.teb_crit_dmg_bonus
+        self.target_health_pct = player.target_health_pct
+        self.max_health = player.max_health
+        self._crit_base = player.crit
+        self._crit_xuen = player.crit + player.talent_crit_bonus
+        self.flags = {name: bool(value) for name, value in vars(player).items() if name.startswith('has_')}
+        for name in ('has_sequenced_strikes', 'has_rushing_wind_kick', 'has_memory_of_monastery', 'has_revolving_whirl',
+                     'has_echo_technique', 'has_knowledge_of_broken_temple', 'has_thunderfist', 'has_communion_with_wind'):
+            self.flags.setdefault(name, bool(getattr(player, name, False)))
+
+        # Runtime state, one entry per monk
+        self.time = np.zeros(n)
+        self._energy_value = np.full(n, player.energy)
+        self._energy_stamp = np.zeros(n)
+        self.chi = np.full(n, player.chi, dtype=np.int64)
+        self.gcd_remaining = np.zeros(n)
+        self.swing_timer = np.full(n, player.swing_timer)
+        self.charges = np.tile(self._max_charges, (n, 1))
+        self.ready_at = np.zeros((n, len(self._spells)))
+        self.last_spell = np.full(n, -1, dtype=np.int64)
+        self.crit = np.full(n, self._crit_base)
+
+        self.hit_combo_stacks = np.zeros(n, dtype=np.int64)
+        self.combo_breaker_stacks = np.zeros(n, dtype=np.int64)
+        self.dance_of_chiji_stacks = np.zeros(n, dtype=np.int64)
+        self.dance_of_chiji_duration = np.zeros(n)
+        self.totm_stacks = np.zeros(n, dtype=np.int64)
+        self.thunderfist_stacks = np.zeros(n, dtype=np.int64)
+        self.thunderfist_icd_timer = np.zeros(n)
+        self.rwk_ready = np.zeros(n, dtype=bool)
+
+        self.zenith_active = np.zeros(n, dtype=bool)
+        self.zenith_duration = np.zeros(n)
+        self.xuen_active = np.zeros(n, dtype=bool)
+        self.xuen_duration = np.zeros(n)
+        self.momentum_buff_active = np.zeros(n, dtype=bool)
+        self.momentum_buff_duration = np.zeros(n)
+        self.teb_stacks = np.full(n, player.teb_stacks, dtype=np.int64)
+        self.teb_timer = np.full(n, player.teb_timer)
+        self.teb_active_bonus = np.zeros(n)
+        self.combat_wisdom_ready = np.full(n, player.combat_wisdom_ready, dtype=bool)
+        self.combat_wisdom_timer = np.full(n, player.combat_wisdom_timer)
+
+        self.channel_spell = np.full(n, -1, dtype=np.int64)
+        self.channel_time_remaining = np.zeros(n)
+        self.channel_ticks_remaining = np.zeros(n, dtype=np.int64)
+        self.time_until_next_tick = np.zeros(n)
+        self.channel_tick_interval = np.zeros(n)
+        self.channel_mastery_snapshot = np.zeros(n, dtype=bool)
+        self.channel_docj_snapshot = np.zeros(n, dtype=bool)
+
+        self.damage = np.zeros(n)
+        self.damage_meter: Dict[str, np.ndarray] = {}
+
+    # --- Helpers ---
+
+    @property
+    def energy(self) -> np.ndarray:
+        return np.minimum(self.max_energy, self._energy_value + self.energy_regen * (self.time - self._energy_stamp))
+
+    def _spend_energy(self, idx: np.ndarray, amount: float) -> None:
+        elapsed = self.time[idx] - self._energy_stamp[idx]
+        current = np.minimum(self.max_energy, self._energy_value[idx] + self.energy_regen * elapsed)
+        self._energy_value[idx] = current - amount
+        self._energy_stamp[idx] = self.time[idx]
+
+    def _crit_factor(self, chance, crit_mult: float, size: int) -> np.ndarray:
+        if self.use_expected_value:
+            return 1.0 + chance * (crit_mult - 1.0) + np.zeros(size)
+        return np.where(self.rng.random(size) < chance, crit_mult, 1.0)
+
+    def _credit(self, name: str, idx: np.ndarray, amount: np.ndarray) -> None:
+        meter = self.damage_meter.get(name)
+        if meter is None:
+            meter = self.damage_meter[name] = np.zeros(self.n)
+        meter[idx] += amount
+        self.damage[idx] += amount
+
+    def _sync_charges(self, s: int) -> None:
+        max_charges = self._max_charges[s]
+        while True:
+            due = (self.charges[:, s] < max_charges) & (self.time >= self.ready_at[:, s])
+            if not due.any():
+                return
+            self.charges[due, s] += 1
+            still = due & (self.charges[:, s] < max_charges)
+            self.ready_at[still, s] += self._base_cd[s]
+
+    def current_cd(self, abbr: str) -> np.ndarray:
+        """Remaining cooldown of ``abbr`` for every monk (0 when all charges are up)."""
+
+        s = self.spell_index[abbr]
+        self._sync_charges(s)
+        remaining = np.maximum(0.0, self.ready_at[:, s] - self.time)
+        return np.where(self.charges[:, s] >= self._max_charges[s], 0.0, remaining)
+
+    def cast_time(self, abbr: str) -> float:
+        return self._spells[self.spell_index[abbr]].cast_time
+
+    def is_usable(self, abbr: str) -> np.ndarray:
+        """Vectorized ``Spell.is_usable`` for every monk."""
+
+        s = self.spell_index[abbr]
+        table = self._spells[s]
+        spell = table.spell
+        if not self.known[s]:
+            return np.zeros(self.n, dtype=bool)
+        self._sync_charges(s)
+        usable = (self.charges[:, s] >= 1) & (self.energy >= spell.energy_cost)
+
+        cost = np.full(self.n, spell.chi_cost)
+        if abbr == 'BOK': cost[self.combo_breaker_stacks > 0] = 0
+        if abbr == 'SCK': cost[self.dance_of_chiji_stacks > 0] = 0
+        if spell.chi_cost > 0: cost = np.where(self.zenith_active, np.maximum(0, cost - 1), cost)
+        usable &= self.chi >= cost
+
+        if abbr == 'WDP':
+            usable &= (self.current_cd('RSK') > 0) & (self.current_cd('FOF') > 0)
+        elif abbr == 'ToD':
+            usable &= self.target_health_pct < 0.15
+        elif abbr == 'Conduit':
+            usable &= False
+        return usable
+
+    def _hit_damage(self, s: int, idx: np.ndarray, mastery: np.ndarray, tick_idx=0) -> np.ndarray:
+        """Vectorized ``Spell.calculate_tick_damage`` for the monks in ``idx``."""
+
+        table = self._spells[s]
+        hit_combo = hit_combo_mult(self.hit_combo_stacks[idx]) if self.flags.get('has_hit_combo') else 1.0
+        if table.abbr == 'ToD':
+            return self.max_health * 0.35 * table.spell.damage_multiplier * hit_combo + np.zeros(idx.size)
+
+        coeff = np.full(idx.size, table.coeff)
+        mult = np.full(idx.size, table.mult)
+        aoe = np.full(idx.size, table.aoe)
+        if table.abbr == 'RSK':
+            rwk = self.rwk_ready[idx]
+            coeff[rwk] = RWK_COEFF
+            mult[rwk] = table.rwk_mult
+            aoe[rwk] = table.rwk_aoe
+        if table.spell.tick_dmg_ramp > 0.0:
+            mult *= 1.0 + table.spell.tick_dmg_ramp * tick_idx
+        if table.abbr == 'SCK':
+            mult[self.channel_docj_snapshot[idx]] *= 2.0
+        mult *= hit_combo
+        mult = np.where(mastery, mult * table.mastery_mult, mult)
+        mult *= 1.0 + self.versatility
+
+        crit = np.minimum(1.0, self.crit[idx] + table.crit_bonus + np.where(self.zenith_active[idx], self.teb_active_bonus[idx], 0.0))
+        raw = coeff * self.ap_agi * mult
+        return raw * self._crit_factor(crit, table.crit_mult, idx.size) * aoe
+
+    # --- Casting ---
+
+    def cast(self, abbr: str, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Cast ``abbr`` for every monk in ``mask`` that can. Returns ``(damage, cast_mask)``."""
+
+        s = self.spell_index[abbr]
+        table = self._spells[s]
+        spell = table.spell
+        flags = self.flags
+        ev = self.use_expected_value
+        casting = self.is_usable(abbr)
+        if mask is not None:
+            casting &= mask
+        damage = np.zeros(self.n)
+        idx = np.flatnonzero(casting)
+        k = idx.size
+        if k == 0:
+            return damage, casting
+
+        if spell.energy_cost:
+            self._spend_energy(idx, spell.energy_cost)
+
+        actual_cost = np.full(k, spell.chi_cost)
+        free = np.zeros(k, dtype=bool)
+        if abbr == 'BOK':
+            cb = self.combo_breaker_stacks[idx] > 0
+            cb_idx = idx[cb]
+            actual_cost[cb] = 0
+            free |= cb
+            self.combo_breaker_stacks[cb_idx] -= 1
+            if flags.get('has_energy_burst'):
+                self.chi[cb_idx] = np.minimum(self.max_chi, self.chi[cb_idx] + 1)
+            if flags['has_rushing_wind_kick']:
+                self.rwk_ready[cb_idx[self.rng.random(cb_idx.size) < 0.40]] = True
+        if abbr == 'SCK':
+            docj = self.dance_of_chiji_stacks[idx] > 0
+            actual_cost[docj] = 0
+            free |= docj
+            self.dance_of_chiji_stacks[idx[docj]] -= 1
+            if flags['has_sequenced_strikes']:
+                self.combo_breaker_stacks[idx[docj]] = np.minimum(2, self.combo_breaker_stacks[idx[docj]] + 1)
+        zenith = self.zenith_active[idx]
+        if spell.chi_cost > 0:
+            actual_cost = np.where(~free & zenith, max(0, spell.chi_cost - 1), actual_cost)
+        obsidian = (zenith & flags.get('has_obsidian_spiral', False)).astype(np.int64) if abbr == 'BOK' else 0
+
+        self.chi[idx] = np.maximum(0, self.chi[idx] - actual_cost)
+        self.chi[idx] = np.minimum(self.max_chi, self.chi[idx] + spell.chi_gen + obsidian)
+
+        full = self.charges[idx, s] == self._max_charges[s]
+        self.ready_at[idx[full], s] = self.time[idx[full]] + table.effective_cd
+        self.charges[idx, s] -= 1
+        self.gcd_remaining[idx] = table.gcd
+
+        # Mastery / Hit Combo
+        last = self.last_spell[idx]
+        if spell.is_combo_strike:
+            triggers_mastery = (last >= 0) & (last != s)
+        else:
+            triggers_mastery = np.zeros(k, dtype=bool)
+        if flags.get('has_hit_combo'):
+            self.hit_combo_stacks[idx[triggers_mastery]] = np.minimum(5, self.hit_combo_stacks[idx[triggers_mastery]] + 1)
+            if spell.is_combo_strike:
+                self.hit_combo_stacks[idx[~triggers_mastery & (last == s)]] = 0
+        self.last_spell[idx] = s
+
+        if abbr == 'TP' and flags.get('has_combo_breaker') and not ev:
+            chance = MEMORY_OF_MONASTERY_CHANCE if flags['has_memory_of_monastery'] else COMBO_BREAKER_CHANCE
+            proc = idx[self.rng.random(k) < chance]
+            self.combo_breaker_stacks[proc] = np.minimum(2, self.combo_breaker_stacks[proc] + 1)
+
+        if spell.chi_cost > 0 and flags.get('has_dance_of_chiji'):
+            proc = idx[self.rng.random(k) < DANCE_OF_CHIJI_CHANCE_PER_CHI * spell.chi_cost]
+            self.dance_of_chiji_stacks[proc] = np.minimum(2, self.dance_of_chiji_stacks[proc] + 1)
+            self.dance_of_chiji_duration[proc] = DANCE_OF_CHIJI_DURATION
+
+        if abbr in SOFT_CAP_SPELLS:
+            if flags['has_revolving_whirl']:
+                self.dance_of_chiji_stacks[idx] = np.minimum(2, self.dance_of_chiji_stacks[idx] + 1)
+                self.dance_of_chiji_duration[idx] = DANCE_OF_CHIJI_DURATION
+            if flags['has_echo_technique']:
+                self.combo_breaker_stacks[idx] = np.minimum(2, self.combo_breaker_stacks[idx] + 1)
+            if flags['has_knowledge_of_broken_temple']:
+                self.totm_stacks[idx] = np.minimum(self.max_totm_stacks, self.totm_stacks[idx] + 4)
+            if flags['has_thunderfist']:
+                self.thunderfist_stacks[idx] += 4 + self.target_count
+
+        if spell.triggers_sharp_reflexes:
+            reduction = np.where(zenith, 2.0, 1.0)
+            for target in ('RSK', 'FOF'):
+                t = self.spell_index[target]
+                remaining = self.current_cd(target)[idx]
+                self.ready_at[idx, t] = self.time[idx] + np.maximum(0.0, remaining - reduction)
+
+        if abbr == 'TP' and flags.get('has_totm'):
+            self.totm_stacks[idx] = np.minimum(self.max_totm_stacks, self.totm_stacks[idx] + 1)
+
+        extra = np.zeros(k)
+        hit_combo = hit_combo_mult(self.hit_combo_stacks[idx]) if flags.get('has_hit_combo') else 1.0
+        weapon_of_wind = weapon_of_wind_mult(zenith) if flags.get('has_weapon_of_wind') else 1.0
+        teb_bonus = np.where(zenith, self.teb_active_bonus[idx], 0.0)
+
+        # Jade Ignition
+        if abbr == 'SCK' and flags.get('has_jade_ignition'):
+            ji_mods = (1.0 + self.versatility) * hit_combo * weapon_of_wind
+            if flags.get('has_universal_energy'): ji_mods = ji_mods * UNIVERSAL_ENERGY
+            ji = JADE_IGNITION_COEFF * self.ap_agi * ji_mods * self._crit_factor(self.crit[idx] + teb_bonus, 2.0, k)
+            ji = ji * self.target_count * soft_cap_scale(self.target_count)
+            extra += ji
+            self._credit_meter('Jade Ignition', idx, ji)
+
+        # TotM Consumption
+        if abbr == 'BOK' and flags.get('has_totm'):
+            stacked = self.totm_stacks[idx] > 0
+            t_idx = idx[stacked]
+            base_mult = (1 + self.versatility) * _pick(hit_combo, stacked) * _pick(weapon_of_wind, stacked)
+            crit_c = self.crit[t_idx] + spell.bonus_crit_chance + teb_bonus[stacked]
+            crit_m = 2.0 + spell.crit_damage_bonus + self.teb_crit_dmg_bonus
+            totm = totm_base(self.totm_stacks[t_idx], self.ap_agi) * base_mult * self._crit_factor(crit_c, crit_m, t_idx.size)
+            extra[stacked] += totm
+            self._credit_meter('TotM', t_idx, totm)
+            self.totm_stacks[t_idx] = 0
+
+        # Reset Proc
+        rsk = self.spell_index['RSK']
+        if not ev:
+            reset = idx[self.rng.random(k) < RSK_RESET_CHANCE]
+            self.ready_at[reset, rsk] = self.time[reset]
+
+        # Glory of Dawn
+        if abbr == 'RSK' and flags.get('has_glory_of_the_dawn'):
+            proc = np.ones(k, dtype=bool) if ev else self.rng.random(k) < self.haste
+            g_idx = idx[proc]
+            base_glory = self.ap_agi * (1 + self.versatility) * _pick(hit_combo, proc) * _pick(weapon_of_wind, proc) * (1.0 + self.mastery)
+            crit_c = self.crit[g_idx] + spell.bonus_crit_chance + teb_bonus[proc]
+            crit_m = 2.0 + spell.crit_damage_bonus + self.teb_crit_dmg_bonus
+            glory = base_glory * self._crit_factor(crit_c, crit_m, g_idx.size)
+            if ev:
+                glory = glory * self.haste
+            else:
+                self.chi[g_idx] = np.minimum(self.max_chi, self.chi[g_idx] + 1)
+            extra[proc] += glory
+            self._credit_meter('Glory of Dawn', g_idx, glory)
+
+        # Zenith Cast
+        if abbr == 'Zenith':
+            self.zenith_active[idx] = True
+            self.zenith_duration[idx] = DRINKING_HORN_COVER_ZENITH_DURATION if flags.get('has_drinking_horn_cover') else ZENITH_DURATION
+            self.ready_at[idx, rsk] = self.time[idx]
+            self.chi[idx] = np.minimum(self.max_chi, self.chi[idx] + 2)
+            self.teb_active_bonus[idx] = self.teb_stacks[idx] * 0.02
+            self.teb_stacks[idx] = 0
+            ww_mod = WEAPON_OF_WIND if flags.get('has_weapon_of_wind') else 1.0
+            burst = zenith_burst(self.ap_agi, self.versatility, hit_combo, ww_mod, self.mastery)
+            extra += burst * self.target_count * soft_cap_scale(self.target_count)
+
+        # Xuen Cast
+        if abbr == 'Xuen':
+            self.xuen_active[idx] = True
+            self.xuen_duration[idx] = XUEN_DURATION
+            self.crit[idx] = self._crit_xuen
+
+        # Flurry of Xuen
+        if flags.get('has_flurry_of_xuen'):
+            fox_unit = flurry_of_xuen_base(self.ap_agi, self.versatility) * self.target_count * soft_cap_scale(self.target_count)
+            crit_m = 2.0 + spell.crit_damage_bonus + self.teb_crit_dmg_bonus
+            if abbr == 'Xuen':
+                extra += fox_unit * self._crit_factor(1.0, crit_m, k)
+            elif ev:
+                extra += fox_unit * self._crit_factor(self.crit[idx], crit_m, k) * FLURRY_OF_XUEN_CHANCE
+            else:
+                proc = self.rng.random(k) < FLURRY_OF_XUEN_CHANCE
+                extra[proc] += fox_unit * self._crit_factor(self.crit[idx[proc]], crit_m, int(proc.sum()))
+
+        # Combat Wisdom
+        if spell.triggers_combat_wisdom:
+            ready = self.combat_wisdom_ready[idx]
+            c_idx = idx[ready]
+            self.combat_wisdom_ready[c_idx] = False
+            self.combat_wisdom_timer[c_idx] = COMBAT_WISDOM_COOLDOWN
+            eh_crit = self.crit[c_idx] + COMBAT_WISDOM_CRIT + teb_bonus[ready]
+            crit_m = 2.0 + spell.crit_damage_bonus + self.teb_crit_dmg_bonus
+            extra[ready] += EXPEL_HARM_COEFF * self.ap_agi * (1.0 + self.versatility) * self._crit_factor(eh_crit, crit_m, c_idx.size)
+
+        if spell.is_channeled:
+            # Like the scalar engine, on-cast extras of a channel are dropped from the returned damage
+            self.channel_spell[idx] = s
+            self.channel_time_remaining[idx] = table.cast_time
+            self.channel_ticks_remaining[idx] = spell.total_ticks
+            self.channel_tick_interval[idx] = table.tick_interval
+            self.time_until_next_tick[idx] = table.tick_interval
+            self.channel_mastery_snapshot[idx] = triggers_mastery
+            self.channel_docj_snapshot[idx] = free if abbr == 'SCK' else False
+            return damage, casting
+
+        total = self._hit_damage(s, idx, triggers_mastery) + extra
+        if abbr == 'RSK':
+            self.rwk_ready[idx] = False
+        damage[idx] = total
+        self._credit(abbr, idx, total)
+        return damage, casting
+
+    def _credit_meter(self, name: str, idx: np.ndarray, amount: np.ndarray) -> None:
+        # On-cast extras are part of the cast's returned damage, so only the meter is touched here
+        meter = self.damage_meter.get(name)
+        if meter is None:
+            meter = self.damage_meter[name] = np.zeros(self.n)
+        meter[idx] += amount
+
+    # --- Time ---
+
+    def time_to_next_event(self) -> np.ndarray:
+        """Vectorized ``PlayerState.time_to_next_event`` (inf where nothing is pending, <= 0 where one is due)."""
+
+        fof = self.spell_index['FOF']
+        channeling = self.channel_spell >= 0
+        candidates = [
+            np.where((self.channel_spell != fof) & (self.swing_timer > 0), self.swing_timer, np.inf),
+            np.where(channeling, np.minimum(self.time_until_next_tick, self.channel_time_remaining), np.inf),
+            np.where(self.xuen_active, self.xuen_duration, np.inf),
+            np.where(self.zenith_active, self.zenith_duration, np.inf),
+            np.where(self.momentum_buff_active, self.momentum_buff_duration, np.inf),
+            np.where(self.dance_of_chiji_stacks > 0, self.dance_of_chiji_duration, np.inf),
+            np.where(self.thunderfist_icd_timer > 0, self.thunderfist_icd_timer, np.inf),
+            np.where(self.gcd_remaining > 0, self.gcd_remaining, np.inf),
+            np.where(self.combat_wisdom_ready, np.inf, self.combat_wisdom_timer),
+        ]
+        if self.flags.get('has_teb_stacking'):
+            candidates.append(self.teb_timer)
+        return np.minimum.reduce(candidates)
+
+    def advance_time(self, duration: Union[float, np.ndarray]) -> np.ndarray:
+        """Advance every monk by ``duration`` seconds (scalar or per-monk). Returns damage dealt."""
+
+        duration = np.broadcast_to(np.asarray(duration, dtype=float), (self.n,))
+        before = self.damage.copy()
+        elapsed = np.zeros(self.n)
+        while True:
+            pending = elapsed < duration
+            if not pending.any():
+                break
+            if self.event_driven:
+                # Same rules as the scalar engine: due timers fire after one dt step, near-ties fire together
+                next_event = self.time_to_next_event()
+                step = np.minimum(duration - elapsed, np.where(next_event <= 0, self.dt, next_event) + 1e-9)
+            else:
+                step = np.minimum(self.dt, duration - elapsed)
+            step = np.where(pending, step, 0.0)
+            self._advance_step(step, step > 0)
+            elapsed += step
+        return self.damage - before
+
+    def _advance_step(self, step: np.ndarray, active: np.ndarray) -> None:
+        flags = self.flags
+        ev = self.use_expected_value
+        fof = self.spell_index['FOF']
+
+        # --- Auto Attacks (paused while channeling FOF) ---
+        swinging = active & (self.channel_spell != fof)
+        temp = np.where(swinging, step, 0.0)
+        while True:
+            swing = swinging & (self.swing_timer <= temp)
+            if not swing.any():
+                break
+            i = np.flatnonzero(swing)
+            temp[i] -= self.swing_timer[i]
+            zenith = self.zenith_active[i]
+            speed = swing_speed(self.haste, self.momentum_buff_active[i], flags.get('has_martial_agility'), zenith)
+            self.swing_timer[i] = self.base_swing_time / speed
+
+            tf = (self.thunderfist_stacks[i] > 0) & (self.thunderfist_icd_timer[i] <= 0)
+            self.thunderfist_stacks[i[tf]] -= 1
+            self.thunderfist_icd_timer[i[tf]] = THUNDERFIST_ICD
+
+            final_coeff = np.full(i.size, auto_attack_coeff(self.weapon_type))
+            key = 'Auto Attack'
+            if flags.get('has_dual_threat'):
+                if ev:
+                    final_coeff[:] = expected_auto_attack_coeff(self.weapon_type)
+                    key = 'Auto Attack (EV w/ DT)'
+                else:
+                    dual = self.rng.random(i.size) < DUAL_THREAT_CHANCE
+                    final_coeff[dual] = DUAL_THREAT_COEFF
+            dmg_mod = (1.0 + self.versatility) * (weapon_of_wind_mult(zenith) if flags.get('has_weapon_of_wind') else 1.0)
+            swing_dmg = final_coeff * self.ap_agi * dmg_mod * self._crit_factor(self.crit[i], 2.0, i.size)
+            if flags.get('has_dual_threat') and not ev:
+                self._credit('Dual Threat', i[dual], swing_dmg[dual])
+                self._credit(key, i[~dual], swing_dmg[~dual])
+            else:
+                self._credit(key, i, swing_dmg)
+
+            if tf.any():
+                t_idx = i[tf]
+                tf_mod = (1.0 + self.versatility) * (weapon_of_wind_mult(zenith[tf]) if flags.get('has_weapon_of_wind') else 1.0)
+                if flags.get('has_universal_energy'): tf_mod = tf_mod * UNIVERSAL_ENERGY
+                self._credit('Thunderfist', t_idx, THUNDERFIST_COEFF * self.ap_agi * tf_mod * self._crit_factor(self.crit[t_idx], 2.0, t_idx.size))
+        self.swing_timer[swinging] -= temp[swinging]
+
+        self.time += step
+
+        # --- Timers ---
+        if flags.get('has_teb_stacking'):
+            self.teb_timer[active], self.teb_stacks[active] = tick_teb(self.teb_timer[active], self.teb_stacks[active], step[active])
+
+        icd = active & (self.thunderfist_icd_timer > 0)
+        self.thunderfist_icd_timer[icd] -= step[icd]
+
+        gcd = active & (self.gcd_remaining > 0)
+        self.gcd_remaining[gcd] = np.maximum(0.0, self.gcd_remaining[gcd] - step[gcd])
+
+        waiting = active & ~self.combat_wisdom_ready
+        self.combat_wisdom_timer[waiting] -= step[waiting]
+        ready = waiting & (self.combat_wisdom_timer <= 0)
+        self.combat_wisdom_ready[ready] = True
+        self.combat_wisdom_timer[ready] = 0.0
+
+        self._tick_buff(active, step, self.xuen_active, self.xuen_duration)
+        self.crit = np.where(self.xuen_active, self._crit_xuen, self._crit_base)
+        self._tick_buff(active, step, self.zenith_active, self.zenith_duration)
+        self._tick_buff(active, step, self.momentum_buff_active, self.momentum_buff_duration)
+
+        docj = active & (self.dance_of_chiji_stacks > 0)
+        self.dance_of_chiji_duration[docj] -= step[docj]
+        expired = docj & (self.dance_of_chiji_duration <= 0)
+        self.dance_of_chiji_stacks[expired] = 0
+        self.dance_of_chiji_duration[expired] = 0.0
+
+        # --- Channels ---
+        channeling = active & (self.channel_spell >= 0)
+        if not channeling.any():
+            return
+        self.channel_time_remaining[channeling] -= step[channeling]
+        self.time_until_next_tick[channeling] -= step[channeling]
+        ticking = channeling & (self.time_until_next_tick <= 1e-6) & (self.channel_ticks_remaining > 0)
+        for s in np.unique(self.channel_spell[ticking]):
+            i = np.flatnonzero(ticking & (self.channel_spell == s))
+            spell = self._spells[s].spell
+            tick_idx = spell.total_ticks - self.channel_ticks_remaining[i]
+            if spell.is_combo_strike:
+                mastery = (self.last_spell[i] >= 0) & (self.last_spell[i] != s)
+            else:
+                mastery = self.channel_mastery_snapshot[i]
+            self._credit(spell.abbr, i, self._hit_damage(s, i, mastery, tick_idx))
+            self.channel_ticks_remaining[i] -= 1
+            self.time_until_next_tick[i] += self.channel_tick_interval[i]
+
+        ending = channeling & ((self.channel_time_remaining <= 1e-6) | (self.channel_ticks_remaining <= 0))
+        fof_end = np.flatnonzero(ending & (self.channel_spell == fof))
+        if fof_end.size:
+            if flags.get('has_momentum_boost'):
+                self.momentum_buff_active[fof_end] = True
+                self.momentum_buff_duration[fof_end] = MOMENTUM_BOOST_DURATION
+            if flags.get('has_jadefire_stomp'):
+                self._jadefire_stomp(fof_end)
+        self.channel_spell[ending] = -1
+        self.channel_mastery_snapshot[ending] = False
+
+    def _tick_buff(self, active: np.ndarray, step: np.ndarray, flag: np.ndarray, duration: np.ndarray) -> None:
+        running = active & flag
+        duration[running] -= step[running]
+        flag[running & (duration <= 0)] = False
+
+    def _jadefire_stomp(self, idx: np.ndarray) -> None:
+        flags = self.flags
+        jf_mod = (1.0 + self.versatility) * (weapon_of_wind_mult(self.zenith_active[idx]) if flags.get('has_weapon_of_wind') else 1.0)
+        if flags.get('has_universal_energy'): jf_mod = jf_mod * UNIVERSAL_ENERGY
+        targets = self.target_count
+        if flags.get('has_path_of_jade'):
+            jf_mod = jf_mod * (1.0 + min(0.50, 0.10 * targets))
+        if flags.get('has_singularly_focused_jade'):
+            jf_mod = jf_mod * 4.0
+            targets = 1
+        scale = (5.0 / targets) ** 0.5 if targets > 5 else 1.0
+        # The scalar engine always uses the expected crit value for Jadefire Stomp
+        self._credit('Jadefire Stomp', idx, JADEFIRE_STOMP_COEFF * self.ap_agi * jf_mod * targets * scale * (1 + self.crit[idx]))
+
+
+def _pick(value, mask: np.ndarray):
+    """Subset a per-caster modifier that may also be a plain float."""
+
+    return value[mask] if isinstance(value, np.ndarray) else value
@@ -1,27 +1,93 @@
-from stable_baselines3.common.callbacks import BaseCallback
+"""Training callbacks for stable-baselines3 models.
 
+The classes subclass sb3's ``BaseCallback`` and are built on first access, so
+``import ppmonk.core.callbacks`` does not load stable-baselines3 or torch.
+"""
 
-class TrainingControlCallback(BaseCallback):
-    """Callback to relay training progress and honor stop requests."""
+import math
 
-    def __init__(self, total_timesteps, status_callback, stop_event, verbose=0):
-        super().__init__(verbose)
-        self.total_timesteps = total_timesteps
-        self.status_callback = status_callback
-        self.stop_event = stop_event
 
-    def _on_step(self) -> bool:
-        # 1. 检查是否收到停止信号
-        if self.stop_event and self.stop_event.is_set():
-            if self.status_callback:
-                self.status_callback("Stopping training...", 0)
-            return False  # 返回 False 会立即终止训练
+def _training_control_callback():
+    from stable_baselines3.common.callbacks import BaseCallback
 
-        # 2. 汇报进度 (每 1000 步汇报一次，避免 UI 卡死)
-        if self.n_calls % 1000 == 0:
-            progress = self.num_timesteps / self.total_timesteps
-            if self.status_callback:
-                # 发送百分比 (0.0 - 1.0)
-                self.status_callback(f"Training: {int(progress * 100)}%", progress)
+    class TrainingControlCallback(BaseCallback):
+        """Callback to relay training progress and honor stop requests.
 
-        return True
+        With an ``eval_fn`` (called with the model, returns a reward) training
+        also stops early once ``patience`` evaluations in a row, ``eval_freq``
+        steps apart, fail to beat the best reward by ``min_delta`` (relative).
+        """
+
+        def __init__(self, total_timesteps, status_callback, stop_event, verbose=0,
+                     eval_fn=None, eval_freq=20000, patience=3, min_delta=0.005):
+            super().__init__(verbose)
+            self.total_timesteps = total_timesteps
+            self.status_callback = status_callback
+            self.stop_event = stop_event
+            self.eval_fn = eval_fn
+            self.eval_freq = eval_freq
+            self.patience = patience
+            self.min_delta = min_delta
+            self.best_reward = -math.inf
+            self.evaluations = []
+            self.stale_evaluations = 0
+            self.plateaued = False
+            self._next_eval = eval_freq
+
+        def _on_training_start(self) -> None:
+            self._next_eval = self.num_timesteps + self.eval_freq
+            if self.eval_fn is not None:
+                # Baseline of the starting policy, so a warm start that is already converged stops early
+                self._evaluate()
+
+        def _on_step(self) -> bool:
+            # 1. 检查是否收到停止信号
+            if self.stop_event and self.stop_event.is_set():
+                if self.status_callback:
+                    self.status_callback("Stopping training...", 0)
+                return False  # 返回 False 会立即终止训练
+
+            # 2. 汇报进度 (每 1000 步汇报一次，避免 UI 卡死)
+            if self.n_calls % 1000 == 0:
+                progress = self.num_timesteps / self.total_timesteps
+                if self.status_callback:
+                    # 发送百分比 (0.0 - 1.0)
+                    self.status_callback(f"Training: {int(progress * 100)}%", progress)
+
+            # 3. 评估奖励是否进入平台期
+            if self.eval_fn is not None and self.num_timesteps >= self._next_eval:
+                self._next_eval += self.eval_freq
+                return self._evaluate()
+
+            return True
+
+        def _evaluate(self) -> bool:
+            reward = self.eval_fn(self.model)
+            if not self.evaluations or reward > self.best_reward + self.min_delta * abs(self.best_reward):
+                self.best_reward = reward
+                self.stale_evaluations = 0
+            else:
+                self.stale_evaluations += 1
+            self.evaluations.append((self.num_timesteps, reward))
+            if self.stale_evaluations >= self.patience:
+                self.plateaued = True
+                if self.status_callback:
+                    self.status_callback("Training converged", 1.0)
+                return False
+            return True
+
+    return TrainingControlCallback
+
+
+_FACTORIES = {'TrainingControlCallback': _training_control_callback}
+
+
+def __getattr__(name):
+    try:
+        factory = _FACTORIES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    cls = factory()
+    cls.__module__, cls.__qualname__ = __name__, name  # Picklable by name like a module-level class
+    globals()[name] = cls
+    return cls
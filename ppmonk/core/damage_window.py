@@ -0,0 +1,50 @@
+"""Sliding-window damage history for PPMonk."""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Deque, Tuple
+
+
+class DamageWindow:
+    """Damage dealt over the last ``window`` seconds, kept with a running total.
+
+    Entries are evicted from the left as they age out, so recording a hit and
+    querying the window total are both amortized O(1).
+    """
+
+    def __init__(self, window: float = 4.0) -> None:
+        self.window = window
+        self.entries: Deque[Tuple[float, float]] = deque()
+        self.total = 0.0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def record(self, timestamp: float, amount: float) -> None:
+        """Add a hit landing at ``timestamp``."""
+
+        self.entries.append((timestamp, amount))
+        self.total += amount
+        self.evict(timestamp)
+
+    def evict(self, now: float) -> None:
+        """Drop hits at or before ``now - window``."""
+
+        cutoff = now - self.window
+        entries = self.entries
+        while entries and entries[0][0] <= cutoff:
+            self.total -= entries.popleft()[1]
+        if not entries:
+            # Reset so subtraction round-off cannot accumulate across empty periods
+            self.total = 0.0
+
+    def sum(self, now: float) -> float:
+        """Total damage of hits strictly after ``now - window``."""
+
+        self.evict(now)
+        return self.total
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.total = 0.0
@@ -0,0 +1,133 @@
+"""Combat constants and formulas shared by the scalar and the batch engine.
+
+``Spell``/``PlayerState`` and ``BatchPlayerState`` both read their
+coefficients, proc chances and timers from here, so a tuning change lands in
+both at once. The functions are pure and use plain arithmetic plus
+``select``, which means they take Python scalars (one monk) as well as numpy
+arrays (one entry per monk) and broadcast like numpy. numpy itself is only
+imported once an array comes in, so the scalar engine stays light.
+"""
+
+import math
+
+# --- Spell damage ---
+RWK_COEFF = 1.7975  # Rushing Wind Kick replaces RSK's coefficient
+RWK_BONUS_PER_TARGET = 0.06
+RWK_MAX_BONUS = 0.30
+HIDDEN_AURAS = {'RSK': 1.70, 'SCK': 1.10}
+AURA = 1.04
+AURA_SPELLS = frozenset(('TP', 'BOK', 'RSK', 'SCK', 'FOF', 'WDP', 'SOTWL'))
+SOFT_CAP = 5
+
+TOTM_COEFF = 0.847
+ZENITH_BURST_COEFF = 10.0
+FLURRY_OF_XUEN_COEFF = 3.92
+FLURRY_OF_XUEN_CHANCE = 0.10
+JADE_IGNITION_COEFF = 1.80
+EXPEL_HARM_COEFF = 1.2
+COMBAT_WISDOM_CRIT = 0.15
+JADEFIRE_STOMP_COEFF = 0.4
+WEAPON_OF_WIND = 1.10
+UNIVERSAL_ENERGY = 1.15
+
+# --- Procs ---
+RSK_RESET_CHANCE = 0.12
+COMBO_BREAKER_CHANCE = 0.08
+MEMORY_OF_MONASTERY_CHANCE = 0.10  # Combo Breaker chance with Memory of the Monastery
+DANCE_OF_CHIJI_CHANCE_PER_CHI = 0.015
+
+# --- Auto attacks ---
+AUTO_ATTACK_COEFF_2H = 2.40
+AUTO_ATTACK_COEFF_DW = 1.80
+DUAL_THREAT_COEFF = 3.726
+DUAL_THREAT_CHANCE = 0.30
+MOMENTUM_SWING_SPEED = 1.6
+MARTIAL_AGILITY_SPEED = 1.3
+MARTIAL_AGILITY_ZENITH_SPEED = 1.6
+THUNDERFIST_COEFF = 1.61
+THUNDERFIST_ICD = 1.5
+
+# --- Timers ---
+TEB_INTERVAL = 8.0
+TEB_MAX_STACKS = 20
+ZENITH_DURATION = 15.0
+DRINKING_HORN_COVER_ZENITH_DURATION = 20.0
+XUEN_DURATION = 24.0
+DANCE_OF_CHIJI_DURATION = 15.0
+MOMENTUM_BOOST_DURATION = 8.0
+COMBAT_WISDOM_COOLDOWN = 15.0
+
+
+def select(condition, if_true, if_false):
+    """``if_true if condition else if_false``, element-wise when ``condition`` is an array."""
+    if isinstance(condition, bool):
+        return if_true if condition else if_false
+    import numpy as np
+
+    return np.where(condition, if_true, if_false)
+
+
+def hidden_aura(abbr):
+    return HIDDEN_AURAS.get(abbr, 1.0)
+
+
+def aura(abbr):
+    return AURA if abbr in AURA_SPELLS else 1.0
+
+
+def rwk_target_mult(target_count):
+    return 1.0 + min(RWK_MAX_BONUS, RWK_BONUS_PER_TARGET * target_count)
+
+
+def soft_cap_scale(target_count, cap=SOFT_CAP):
+    """Per-target damage scale of an AoE that is square-root capped at ``cap`` targets."""
+    if target_count <= cap: return 1.0
+    return math.sqrt(cap / float(target_count))
+
+
+def hit_combo_mult(stacks):
+    return 1.0 + stacks * 0.01
+
+
+def weapon_of_wind_mult(zenith_active):
+    return select(zenith_active, WEAPON_OF_WIND, 1.0)
+
+
+def swing_speed(haste, momentum_active, has_martial_agility, zenith_active):
+    """Attack speed multiplier; the swing timer resets to ``base_swing_time / swing_speed``."""
+    speed = (1.0 + haste) * select(momentum_active, MOMENTUM_SWING_SPEED, 1.0)
+    if has_martial_agility:
+        speed = speed * select(zenith_active, MARTIAL_AGILITY_ZENITH_SPEED, MARTIAL_AGILITY_SPEED)
+    return speed
+
+
+def auto_attack_coeff(weapon_type):
+    return AUTO_ATTACK_COEFF_2H if weapon_type == '2h' else AUTO_ATTACK_COEFF_DW
+
+
+def expected_auto_attack_coeff(weapon_type):
+    """Swing coefficient averaged over the Dual Threat proc."""
+    return (1.0 - DUAL_THREAT_CHANCE) * auto_attack_coeff(weapon_type) + DUAL_THREAT_CHANCE * DUAL_THREAT_COEFF
+
+
+def totm_base(stacks, ap_agi):
+    """Teachings of the Monastery damage of ``stacks`` extra hits before modifiers and crit."""
+    return stacks * (TOTM_COEFF * ap_agi)
+
+
+def zenith_burst(ap_agi, versatility, hit_combo, weapon_of_wind, mastery):
+    """Zenith's on-cast burst on one target, before the soft cap."""
+    return ZENITH_BURST_COEFF * ap_agi * (1.0 + versatility) * hit_combo * weapon_of_wind * (1.0 + mastery)
+
+
+def flurry_of_xuen_base(ap_agi, versatility):
+    """Flurry of Xuen damage on one target before crit and the soft cap."""
+    return FLURRY_OF_XUEN_COEFF * ap_agi * (1.0 + versatility)
+
+
+def tick_teb(timer, stacks, step):
+    """Advance the Tigereye Brew stacking timer by ``step``. Returns ``(timer, stacks)``."""
+    timer = timer - step
+    due = timer <= 0
+    stacks = select(due, stacks + 1, stacks)
+    return timer + select(due, TEB_INTERVAL, 0.0), select(stacks > TEB_MAX_STACKS, TEB_MAX_STACKS, stacks)
@@ -1,7 +1,15 @@
-import random
+from time import perf_counter
+
+from ppmonk.core.damage_window import DamageWindow
+from ppmonk.core.mechanics import (DUAL_THREAT_CHANCE, DUAL_THREAT_COEFF, JADEFIRE_STOMP_COEFF,
+                                   MOMENTUM_BOOST_DURATION, TEB_INTERVAL, THUNDERFIST_COEFF, THUNDERFIST_ICD,
+                                   UNIVERSAL_ENERGY, WEAPON_OF_WIND, auto_attack_coeff, expected_auto_attack_coeff,
+                                   swing_speed, tick_teb)
+from ppmonk.core.resources import LazyResource
+from ppmonk.core.rng import CombatRng
 
 class PlayerState:
-    def __init__(self, agility=2000.0, rating_crit=2000, rating_haste=1500, rating_mastery=1000, rating_vers=500, weapon_type='dw', max_health=100000.0, target_count=1):
+    def __init__(self, agility=2000.0, rating_crit=2000, rating_haste=1500, rating_mastery=1000, rating_vers=500, weapon_type='dw', max_health=100000.0, target_count=1, event_driven=False, detail_level='full'):
         self.rating_crit = rating_crit
         self.rating_haste = rating_haste
         self.rating_mastery = rating_mastery
@@ -17,6 +25,11 @@ class PlayerState:
         # But wait, the previous memory said: "The PlayerState now initializes self.attack_power to 1.0 ... to provide transparent breakdowns."
         # So the test is outdated. I should fix the test.
 
+        # Event-driven time engine: advance_time jumps between events instead of fixed 0.01s steps
+        self.event_driven = event_driven
+        # Log/breakdown detail: 'none' (training, bulk sims), 'totals' (damage per event) or 'full'
+        self.detail_level = detail_level
+
         self.max_health = max_health
         self.target_health_pct = 1.0
         self.target_count = max(1, target_count)
@@ -24,9 +37,10 @@ class PlayerState:
         self.base_mastery = 0.19
         self.base_crit = 0.10
 
-        self.max_energy = 100.0
+        # Energy regenerates lazily: advance_time only rebases the rate, reads evaluate it at simulation_time
+        self.simulation_time = 0.0
+        self._energy = LazyResource(100.0, maximum=100.0)
         self.energy_regen_mult = 1.0
-        self.energy = 100.0
 
         self.max_chi = 5
         self.chi = 2
@@ -79,7 +93,7 @@ class PlayerState:
         self.has_jadefire_stomp = False
 
         self.teb_stacks = 10
-        self.teb_timer = 8.0
+        self.teb_timer = TEB_INTERVAL
         self.teb_active_bonus = 0.0
         self.teb_crit_dmg_bonus = 0.0
         self.has_teb_stacking = False
@@ -105,9 +119,9 @@ class PlayerState:
         self.has_veterans_eye = False
 
         # [COTC] Conduit of the Celestials Flags & State
-        self.simulation_time = 0.0
         self.cooldown_recovery_rate = 1.0
-        self.recent_damage_window = [] # List of (timestamp, amount)
+        self.cooldown_clock = 0.0 # Integral of cooldown_recovery_rate over time; spell CDs are timestamps on it
+        self.recent_damage_window = DamageWindow(4.0) # (timestamp, amount) hits with a running total
         self.inner_compass_state = 0 # 0: Crane, 1: Tiger, 2: Ox, 3: Serpent
         self.conduit_window_timer = 0.0
         self.can_cast_conduit = False
@@ -154,15 +168,58 @@ class PlayerState:
         else:  # dw
             self.base_swing_time = 2.6
 
+        # ppmonk.core.profiler.Profiler while profiling; hot paths skip all timing when None
+        self.profiler = None
+        # Every proc and crit roll draws from a named stream of this (see ppmonk.core.rng); replace it to reseed
+        self.rng = CombatRng()
+
         self.update_stats()
 
+    @property
+    def energy(self):
+        return self._energy.value_at(self.simulation_time)
+
+    @energy.setter
+    def energy(self, value):
+        self._energy.set(value, self.simulation_time)
+
+    @property
+    def max_energy(self):
+        return self._energy.maximum
+
+    @max_energy.setter
+    def max_energy(self, value):
+        self._energy.rebase(self.simulation_time, maximum=value)
+
     # [COTC] Damage History Methods
     def record_damage(self, amount):
-        self.recent_damage_window.append((self.simulation_time, amount))
+        self.recent_damage_window.record(self.simulation_time, amount)
 
     def get_damage_last_4s(self):
-        cutoff = self.simulation_time - 4.0
-        return sum(d for t, d in self.recent_damage_window if t > cutoff)
+        return self.recent_damage_window.sum(self.simulation_time)
+
+    # Snapshot / Restore
+    def snapshot(self):
+        """Capture the full simulation state as a flat tuple (for rollback and branching)."""
+        energy = self._energy
+        window = self.recent_damage_window
+        return (tuple(self.__dict__.items()),
+                energy.value, energy.timestamp, energy.rate, energy.maximum,
+                tuple(window.entries), window.total, self.rng.snapshot())
+
+    def restore(self, state):
+        """Roll this player back to a tuple produced by its own snapshot()."""
+        items, value, timestamp, rate, maximum, entries, total, rng_state = state
+        attrs = self.__dict__
+        attrs.clear()
+        attrs.update(items)
+        self.rng.restore(rng_state)
+        energy = self._energy
+        energy.value, energy.timestamp, energy.rate, energy.maximum = value, timestamp, rate, maximum
+        window = self.recent_damage_window
+        window.entries.clear()
+        window.entries.extend(entries)
+        window.total = total
 
     # [COTC] Inner Compass Logic
     def advance_inner_compass(self):
@@ -216,219 +273,277 @@ class PlayerState:
         if self.has_inner_compass and self.inner_compass_state == 3:
             self.mastery += 0.02
 
+    def time_to_next_event(self):
+        """Time until the next swing, channel tick, proc timer or buff expiry (inf if none, <= 0 if one is due)."""
+        candidates = []
+        is_fof_channeling = (self.is_channeling and self.current_channel_spell and self.current_channel_spell.abbr == 'FOF')
+        if not is_fof_channeling and self.swing_timer > 0:
+            candidates.append(self.swing_timer)
+        if self.is_channeling:
+            candidates.append(self.time_until_next_tick)
+            candidates.append(self.channel_time_remaining)
+        if self.xuen_active:
+            candidates.append(self.xuen_duration)
+            if self.has_cotc_base:
+                candidates.append(self.xuen_lightning_timer)
+                candidates.append(self.xuen_empowered_timer)
+        if self.zenith_active:
+            candidates.append(self.zenith_duration)
+        if self.momentum_buff_active:
+            candidates.append(self.momentum_buff_duration)
+        if self.dance_of_chiji_stacks > 0:
+            candidates.append(self.dance_of_chiji_duration)
+        if self.jade_serpent_cdr_active:
+            candidates.append(self.jade_serpent_cdr_duration)
+        if self.conduit_window_timer > 0:
+            candidates.append(self.conduit_window_timer)
+        if self.has_teb_stacking:
+            candidates.append(self.teb_timer)
+        if self.thunderfist_icd_timer > 0:
+            candidates.append(self.thunderfist_icd_timer)
+        if self.gcd_remaining > 0:
+            candidates.append(self.gcd_remaining)
+        if not self.combat_wisdom_ready:
+            candidates.append(self.combat_wisdom_timer)
+
+        return min(candidates) if candidates else float('inf')
+
     def advance_time(self, duration, damage_meter=None, use_expected_value=False):
+        prof = self.profiler
+        if prof is not None:
+            started = perf_counter()
         total_damage = 0
         dt = 0.01
         elapsed = 0.0
         regen_rate = 10.0 * (1.0 + self.haste) * self.energy_regen_mult
+        self._energy.rebase(self.simulation_time, rate=regen_rate)
         log_entries = []
 
-        while elapsed < duration:
-            # Advance simulation time in small steps (dt or remainder)
-            step = min(dt, duration - elapsed)
-
-            # --- Auto Attack Logic (Decoupled from step size where possible) ---
-            # We want to process swings that happen within this 'step'
-            # Instead of just decrementing, we calculate if swing_timer hits 0 within 'step'
-
-            current_step_processed = 0.0
-
-            # Use a while loop to handle very fast swings or large steps (though step is small)
-            # Effectively, if swing_timer < step, we trigger event, reset timer, and continue
-
-            # FOF Pause: If channeling FOF, we skip swing logic entirely (timer doesn't advance/consume)
-            is_fof_channeling = (self.is_channeling and self.current_channel_spell and self.current_channel_spell.abbr == 'FOF')
-
-            step_damage = 0.0
-
-            if not is_fof_channeling:
-                temp_step = step
-                while self.swing_timer <= temp_step:
-                    # Consume time until swing
-                    time_to_swing = self.swing_timer
-                    temp_step -= time_to_swing
-
-                    swing_speed_mod = 1.0 + self.haste
-                    if self.momentum_buff_active:
-                        swing_speed_mod *= 1.6
-
-                    if self.has_martial_agility:
-                        ma_mod = 1.3
-                        if self.zenith_active:
-                            ma_mod = 1.6
-                        swing_speed_mod *= ma_mod
-
-                    # Reset Timer
-                    self.swing_timer = self.base_swing_time / swing_speed_mod
-
-                    # --- Execute Swing ---
-                    # [Task 3 & 2] Thunderfist Consumption on Auto Attack
-                    thunderfist_dmg = 0.0
-                    thunderfist_proc = False
-
-                    if self.thunderfist_stacks > 0 and self.thunderfist_icd_timer <= 0:
-                        self.thunderfist_stacks -= 1
-                        self.thunderfist_icd_timer = 1.5
-                        thunderfist_proc = True
-                        tf_base = 1.61 * self.attack_power * self.agility
+        # Cooldowns recover at the boosted rate until Heart of the Jade Serpent runs out, then at 1.0
+        if self.jade_serpent_cdr_active:
+            boosted = min(duration, max(0.0, self.jade_serpent_cdr_duration))
+            self.cooldown_clock += boosted * self.cooldown_recovery_rate + (duration - boosted)
+        else:
+            self.cooldown_clock += duration * self.cooldown_recovery_rate
 
-                    is_dual_threat = False
-                    if self.has_dual_threat:
-                        if use_expected_value:
-                            pass
-                        else:
-                            is_dual_threat = random.random() < 0.30
+        while elapsed < duration:
+            if self.event_driven:
+                # Jump straight to the next swing / tick / expiry; nothing changes in between.
+                # A timer that is already due fires at the end of one dt step, as in the fixed loop,
+                # and timers within 1e-9s of each other fire together instead of splitting on float noise.
+                next_event = self.time_to_next_event()
+                if next_event <= 0:
+                    next_event = dt
+                step = min(duration - elapsed, next_event + 1e-9)
+            else:
+                # Advance simulation time in small steps (dt or remainder)
+                step = min(dt, duration - elapsed)
+            total_damage += self._advance_step(step, elapsed, damage_meter, use_expected_value, log_entries)
+            elapsed += step
+        if prof is not None:
+            prof.add('advance_time', started)
+        return total_damage, log_entries
 
-                    coeff = 1.0
-                    if self.weapon_type == '2h':
-                        coeff = 2.40
+    def _advance_step(self, step, elapsed, damage_meter, use_expected_value, log_entries):
+        prof = self.profiler
+        total_damage = 0
+        crit_mult = 2.0
+        # detail_level: 'none' allocates no log entries, 'totals' logs damage only, 'full' adds breakdowns
+        log_events = self.detail_level != 'none'
+        full_detail = self.detail_level == 'full'
+
+        # --- Auto Attack Logic (Decoupled from step size where possible) ---
+        # We want to process swings that happen within this 'step'
+        # Instead of just decrementing, we calculate if swing_timer hits 0 within 'step'
+
+        # Use a while loop to handle very fast swings or large steps (though step is small)
+        # Effectively, if swing_timer < step, we trigger event, reset timer, and continue
+
+        # FOF Pause: If channeling FOF, we skip swing logic entirely (timer doesn't advance/consume)
+        is_fof_channeling = (self.is_channeling and self.current_channel_spell and self.current_channel_spell.abbr == 'FOF')
+
+        step_damage = 0.0
+
+        if not is_fof_channeling:
+            temp_step = step
+            while self.swing_timer <= temp_step:
+                if prof is not None:
+                    swing_started = perf_counter()
+                # Consume time until swing
+                time_to_swing = self.swing_timer
+                temp_step -= time_to_swing
+
+                # Reset Timer
+                self.swing_timer = self.base_swing_time / swing_speed(self.haste, self.momentum_buff_active,
+                                                                      self.has_martial_agility, self.zenith_active)
+
+                # --- Execute Swing ---
+                # [Task 3 & 2] Thunderfist Consumption on Auto Attack
+                thunderfist_proc = False
+
+                if self.thunderfist_stacks > 0 and self.thunderfist_icd_timer <= 0:
+                    self.thunderfist_stacks -= 1
+                    self.thunderfist_icd_timer = THUNDERFIST_ICD
+                    thunderfist_proc = True
+                    tf_base = THUNDERFIST_COEFF * self.attack_power * self.agility
+
+                is_dual_threat = False
+                if self.has_dual_threat:
+                    if use_expected_value:
+                        pass
                     else:
-                        coeff = 1.80 # DW
+                        is_dual_threat = self.rng.auto_attack.random() < DUAL_THREAT_CHANCE
 
-                    dual_coeff = 3.726
+                final_coeff = auto_attack_coeff(self.weapon_type)
+                if use_expected_value and self.has_dual_threat:
+                     final_coeff = expected_auto_attack_coeff(self.weapon_type)
+                elif is_dual_threat:
+                     final_coeff = DUAL_THREAT_COEFF
 
-                    final_coeff = coeff
-                    if use_expected_value and self.has_dual_threat:
-                         final_coeff = (0.7 * coeff) + (0.3 * dual_coeff)
-                    elif is_dual_threat:
-                         final_coeff = dual_coeff
+                base_dmg = final_coeff * self.attack_power * self.agility
 
-                    base_dmg = final_coeff * self.attack_power * self.agility
+                crit_chance = self.crit
+                crit_mult = 2.0
+                dmg_mod = 1.0 + self.versatility
 
-                    crit_chance = self.crit
-                    crit_mult = 2.0
-                    dmg_mod = 1.0 + self.versatility
+                if self.has_restore_balance and self.xuen_active:
+                    dmg_mod *= 1.05
 
-                    if self.has_restore_balance and self.xuen_active:
-                        dmg_mod *= 1.05
+                if self.zenith_active and getattr(self, 'has_weapon_of_wind', False):
+                    dmg_mod *= WEAPON_OF_WIND
 
-                    if self.zenith_active and getattr(self, 'has_weapon_of_wind', False):
-                        dmg_mod *= 1.10
+                if use_expected_value:
+                    expected_dmg = (base_dmg * dmg_mod) * (1 + (crit_chance * (crit_mult - 1)))
+                else:
+                     is_crit = self.rng.auto_attack.random() < crit_chance
+                     expected_dmg = (base_dmg * dmg_mod) * (crit_mult if is_crit else 1.0)
+                     if is_crit: crit_chance = 1.0 # For display
 
-                    if use_expected_value:
-                        expected_dmg = (base_dmg * dmg_mod) * (1 + (crit_chance * (crit_mult - 1)))
-                    else:
-                         is_crit = random.random() < crit_chance
-                         expected_dmg = (base_dmg * dmg_mod) * (crit_mult if is_crit else 1.0)
-                         if is_crit: crit_chance = 1.0 # For display
-
-                    step_damage += expected_dmg
-                    self.record_damage(expected_dmg)
-
-                    key = "Dual Threat" if is_dual_threat else "Auto Attack"
-                    if use_expected_value and self.has_dual_threat:
-                         key = "Auto Attack (EV w/ DT)"
+                step_damage += expected_dmg
+                self.record_damage(expected_dmg)
 
-                    if damage_meter is not None:
-                        damage_meter[key] = damage_meter.get(key, 0) + expected_dmg
-
-                    breakdown = {
-                        'base': int(base_dmg),
-                        'modifiers': ['Versatility: x%.2f' % (1.0 + self.versatility)],
-                        'crit_sources': ['Base: %.1f%%' % (self.crit*100)],
-                        'final_crit': crit_chance,
-                        'crit_mult': crit_mult
-                    }
+                key = "Dual Threat" if is_dual_threat else "Auto Attack"
+                if use_expected_value and self.has_dual_threat:
+                     key = "Auto Attack (EV w/ DT)"
 
-                    if self.zenith_active and getattr(self, 'has_weapon_of_wind', False):
-                        breakdown['modifiers'].append('WeaponOfWind: x1.10')
+                if damage_meter is not None:
+                    damage_meter[key] = damage_meter.get(key, 0) + expected_dmg
 
-                    log_entries.append({
+                if log_events:
+                    entry = {
                         "Action": key,
                         "Expected DMG": expected_dmg,
-                        "Breakdown": breakdown,
                         "source": "passive",
                         "timestamp": elapsed + time_to_swing, # Relative to start of advance_time call
                         "offset": elapsed + time_to_swing # Legacy key if needed
-                    })
+                    }
+                    if full_detail:
+                        breakdown = {
+                            'base': int(base_dmg),
+                            'modifiers': ['Versatility: x%.2f' % (1.0 + self.versatility)],
+                            'crit_sources': ['Base: %.1f%%' % (self.crit*100)],
+                            'final_crit': crit_chance,
+                            'crit_mult': crit_mult
+                        }
 
-                    # [Shado-Pan] Flurry Strikes Stacking
-                    if self.has_shado_pan_base:
-                        proc_chance = 1.0
-                        if self.weapon_type == 'dw':
-                            proc_chance = (17.14 * 2.6) / 60.0
+                        if self.zenith_active and getattr(self, 'has_weapon_of_wind', False):
+                            breakdown['modifiers'].append(f'WeaponOfWind: x{WEAPON_OF_WIND:.2f}')
+                        entry["Breakdown"] = breakdown
+                    log_entries.append(entry)
 
-                        if use_expected_value:
-                            pass
+                # [Shado-Pan] Flurry Strikes Stacking
+                if self.has_shado_pan_base:
+                    proc_chance = 1.0
+                    if self.weapon_type == 'dw':
+                        proc_chance = (17.14 * 2.6) / 60.0
 
-                        if random.random() < proc_chance:
-                            stacks_to_add = 1
-                            if self.has_one_versus_many and random.random() < crit_chance:
-                                stacks_to_add = 2
-                            self.flurry_charges += stacks_to_add
+                    if use_expected_value:
+                        pass
 
-                    # [Shado-Pan] Stand Ready Trigger
-                    if self.stand_ready_active:
-                        self.stand_ready_active = False
+                    if self.rng.flurry_strikes.random() < proc_chance:
+                        stacks_to_add = 1
+                        if self.has_one_versus_many and self.rng.flurry_strikes.random() < crit_chance:
+                            stacks_to_add = 2
+                        self.flurry_charges += stacks_to_add
 
-                        stacks = self.flurry_charges
-                        self.flurry_charges = 0
+                # [Shado-Pan] Stand Ready Trigger
+                if self.stand_ready_active:
+                    self.stand_ready_active = False
 
-                        if stacks > 0:
-                            flurry_coeff = 0.6
-                            flurry_base = flurry_coeff * self.attack_power * self.agility * stacks
+                    stacks = self.flurry_charges
+                    self.flurry_charges = 0
 
-                            mitigation = self.get_physical_mitigation()
-                            flurry_base *= mitigation
+                    if stacks > 0:
+                        if prof is not None:
+                            flurry_started = perf_counter()
+                        flurry_coeff = 0.6
+                        flurry_base = flurry_coeff * self.attack_power * self.agility * stacks
 
-                            f_mod = 1.0 + self.versatility
+                        mitigation = self.get_physical_mitigation()
+                        flurry_base *= mitigation
 
-                            if self.has_restore_balance and self.xuen_active:
-                                f_mod *= 1.05
-                            f_mod *= 0.7
+                        f_mod = 1.0 + self.versatility
 
-                            flurry_crit = self.crit
-                            if self.has_pride_of_pandaria:
-                                flurry_crit += 0.15
+                        if self.has_restore_balance and self.xuen_active:
+                            f_mod *= 1.05
+                        f_mod *= 0.7
 
-                            if use_expected_value:
-                                 flurry_dmg = flurry_base * f_mod * (1 + (flurry_crit * (crit_mult - 1)))
-                            else:
-                                 flurry_dmg = flurry_base * f_mod * (1 + (flurry_crit * (crit_mult - 1)))
+                        flurry_crit = self.crit
+                        if self.has_pride_of_pandaria:
+                            flurry_crit += 0.15
+
+                        if use_expected_value:
+                             flurry_dmg = flurry_base * f_mod * (1 + (flurry_crit * (crit_mult - 1)))
+                        else:
+                             flurry_dmg = flurry_base * f_mod * (1 + (flurry_crit * (crit_mult - 1)))
 
-                            step_damage += flurry_dmg
-                            self.record_damage(flurry_dmg)
+                        step_damage += flurry_dmg
+                        self.record_damage(flurry_dmg)
 
-                            if damage_meter is not None:
-                                damage_meter['Flurry Strikes'] = damage_meter.get('Flurry Strikes', 0) + flurry_dmg
+                        if damage_meter is not None:
+                            damage_meter['Flurry Strikes'] = damage_meter.get('Flurry Strikes', 0) + flurry_dmg
 
-                            log_entries.append({
+                        if log_events:
+                            entry = {
                                 "Action": f"Flurry Strikes (Stand Ready) x{stacks}",
                                 "Expected DMG": flurry_dmg,
-                                "Breakdown": {
+                                "source": "passive",
+                                "timestamp": elapsed + time_to_swing
+                            }
+                            if full_detail:
+                                entry["Breakdown"] = {
                                     "base": int(flurry_base),
                                     "modifiers": ["StandReady: x0.7", f"Mitigation: x{mitigation:.2f}"],
                                     "final_crit": flurry_crit
-                                },
-                                "source": "passive",
-                                "timestamp": elapsed + time_to_swing
-                            })
+                                }
+                            log_entries.append(entry)
 
-                            if self.has_shado_over_battlefield:
-                                sob_coeff = 0.52
-                                sob_base = sob_coeff * self.attack_power * self.agility * stacks
-                                sob_mod = 1.0 + self.versatility
-                                if getattr(self, 'has_universal_energy', False):
-                                    sob_mod *= 1.15
-                                if self.has_restore_balance and self.xuen_active:
-                                    sob_mod *= 1.05
+                        if self.has_shado_over_battlefield:
+                            sob_coeff = 0.52
+                            sob_base = sob_coeff * self.attack_power * self.agility * stacks
+                            sob_mod = 1.0 + self.versatility
+                            if getattr(self, 'has_universal_energy', False):
+                                sob_mod *= 1.15
+                            if self.has_restore_balance and self.xuen_active:
+                                sob_mod *= 1.05
 
-                                eff_targets = self.target_count
-                                scale = 1.0
-                                if eff_targets > 8:
-                                    scale = (8.0 / eff_targets) ** 0.5
+                            eff_targets = self.target_count
+                            scale = 1.0
+                            if eff_targets > 8:
+                                scale = (8.0 / eff_targets) ** 0.5
 
-                                if use_expected_value:
-                                    sob_total = sob_base * sob_mod * eff_targets * scale * (1 + (flurry_crit * (crit_mult - 1)))
-                                else:
-                                    sob_total = sob_base * sob_mod * eff_targets * scale * (1 + (flurry_crit * (crit_mult - 1)))
+                            if use_expected_value:
+                                sob_total = sob_base * sob_mod * eff_targets * scale * (1 + (flurry_crit * (crit_mult - 1)))
+                            else:
+                                sob_total = sob_base * sob_mod * eff_targets * scale * (1 + (flurry_crit * (crit_mult - 1)))
 
-                                step_damage += sob_total
-                                self.record_damage(sob_total)
+                            step_damage += sob_total
+                            self.record_damage(sob_total)
 
-                                if damage_meter is not None:
-                                    damage_meter['Shado Over Battlefield'] = damage_meter.get('Shado Over Battlefield', 0) + sob_total
+                            if damage_meter is not None:
+                                damage_meter['Shado Over Battlefield'] = damage_meter.get('Shado Over Battlefield', 0) + sob_total
 
+                            if log_events:
                                 log_entries.append({
                                     "Action": "Shado Over Battlefield",
                                     "Expected DMG": sob_total,
@@ -436,299 +551,329 @@ class PlayerState:
                                     "timestamp": elapsed + time_to_swing
                                 })
 
-                            if self.has_high_impact:
-                                hi_coeff = 1.0
-                                hi_base = hi_coeff * self.attack_power * self.agility * stacks
+                        if self.has_high_impact:
+                            hi_coeff = 1.0
+                            hi_base = hi_coeff * self.attack_power * self.agility * stacks
 
-                                hi_mod = 1.0 + self.versatility
-                                if self.has_restore_balance and self.xuen_active:
-                                    hi_mod *= 1.05
+                            hi_mod = 1.0 + self.versatility
+                            if self.has_restore_balance and self.xuen_active:
+                                hi_mod *= 1.05
 
-                                eff_targets = self.target_count
-                                scale = 1.0
-                                if eff_targets > 8:
-                                    scale = (8.0 / eff_targets) ** 0.5
+                            eff_targets = self.target_count
+                            scale = 1.0
+                            if eff_targets > 8:
+                                scale = (8.0 / eff_targets) ** 0.5
 
-                                if use_expected_value:
-                                    hi_total = hi_base * hi_mod * eff_targets * scale * (1 + (flurry_crit * (crit_mult - 1)))
-                                else:
-                                    hi_total = hi_base * hi_mod * eff_targets * scale * (1 + (flurry_crit * (crit_mult - 1)))
+                            if use_expected_value:
+                                hi_total = hi_base * hi_mod * eff_targets * scale * (1 + (flurry_crit * (crit_mult - 1)))
+                            else:
+                                hi_total = hi_base * hi_mod * eff_targets * scale * (1 + (flurry_crit * (crit_mult - 1)))
 
-                                step_damage += hi_total
-                                self.record_damage(hi_total)
+                            step_damage += hi_total
+                            self.record_damage(hi_total)
 
-                                if damage_meter is not None:
-                                    damage_meter['High Impact'] = damage_meter.get('High Impact', 0) + hi_total
+                            if damage_meter is not None:
+                                damage_meter['High Impact'] = damage_meter.get('High Impact', 0) + hi_total
 
+                        if prof is not None:
+                            prof.add('proc.flurry_strikes', flurry_started)
 
-                    # Handle Thunderfist Event
-                    if thunderfist_proc:
-                        tf_mod = 1.0 + self.versatility
-                        if self.zenith_active and getattr(self, 'has_weapon_of_wind', False):
-                            tf_mod *= 1.10
+                # Handle Thunderfist Event
+                if thunderfist_proc:
+                    if prof is not None:
+                        tf_started = perf_counter()
+                    tf_mod = 1.0 + self.versatility
+                    if self.zenith_active and getattr(self, 'has_weapon_of_wind', False):
+                        tf_mod *= WEAPON_OF_WIND
 
-                        if self.has_restore_balance and self.xuen_active:
-                            tf_mod *= 1.05
+                    if self.has_restore_balance and self.xuen_active:
+                        tf_mod *= 1.05
 
-                        if getattr(self, 'has_universal_energy', False):
-                            tf_mod *= 1.15
+                    if getattr(self, 'has_universal_energy', False):
+                        tf_mod *= UNIVERSAL_ENERGY
 
-                        tf_crit = self.crit
+                    tf_crit = self.crit
 
-                        if use_expected_value:
-                            tf_expected = (tf_base * tf_mod) * (1 + (tf_crit * (crit_mult - 1)))
-                        else:
-                            is_crit = random.random() < tf_crit
-                            tf_expected = (tf_base * tf_mod) * (crit_mult if is_crit else 1.0)
-                            if is_crit: tf_crit = 1.0
+                    if use_expected_value:
+                        tf_expected = (tf_base * tf_mod) * (1 + (tf_crit * (crit_mult - 1)))
+                    else:
+                        is_crit = self.rng.thunderfist.random() < tf_crit
+                        tf_expected = (tf_base * tf_mod) * (crit_mult if is_crit else 1.0)
+                        if is_crit: tf_crit = 1.0
 
-                        step_damage += tf_expected
-                        self.record_damage(tf_expected)
+                    step_damage += tf_expected
+                    self.record_damage(tf_expected)
 
-                        if damage_meter is not None:
-                            damage_meter['Thunderfist'] = damage_meter.get('Thunderfist', 0) + tf_expected
-
-                        tf_breakdown = {
-                            'base': int(tf_base),
-                            'modifiers': ['Versatility: x%.2f' % (1.0 + self.versatility)],
-                            'crit_sources': ['Base: %.1f%%' % (self.crit*100)],
-                            'final_crit': tf_crit,
-                            'crit_mult': crit_mult
-                        }
-                        if getattr(self, 'has_universal_energy', False):
-                            tf_breakdown['modifiers'].append('UniversalEnergy: x1.15')
+                    if damage_meter is not None:
+                        damage_meter['Thunderfist'] = damage_meter.get('Thunderfist', 0) + tf_expected
 
-                        log_entries.append({
+                    if log_events:
+                        entry = {
                             "Action": "Thunderfist",
                             "Expected DMG": tf_expected,
-                            "Breakdown": tf_breakdown,
                             "source": "passive",
                             "timestamp": elapsed + time_to_swing
-                        })
-
-                # Decrease Swing Timer by actual elapsed step
-                # Note: This means if we had a swing at t=0.005 in a 0.01 step, we decrement the FULL step from the NEW timer?
-                # The while loop logic: `temp_step -= time_to_swing`.
-                # Remaining `temp_step` is the time AFTER the swing.
-                # We reset `self.swing_timer` to full duration.
-                # We need to subtract the *remaining* `temp_step` from the NEW `swing_timer`.
-                # The logic `self.swing_timer -= step` is WRONG because `step` includes the time BEFORE the swing which was already consumed.
-                # Correct logic: `self.swing_timer -= temp_step` where `temp_step` is the remaining time in this step.
-                self.swing_timer -= temp_step
-                total_damage += step_damage
-
-            # --- End Auto Attack Logic ---
-
-            self.simulation_time += step
-
-            if self.jade_serpent_cdr_active:
-                self.jade_serpent_cdr_duration -= step
-                if self.jade_serpent_cdr_duration <= 0:
-                    self.jade_serpent_cdr_active = False
-                    self.cooldown_recovery_rate = 1.0
-
-            if self.conduit_window_timer > 0:
-                self.conduit_window_timer -= step
-                if self.conduit_window_timer <= 0:
-                    self.can_cast_conduit = False
-
-            while self.recent_damage_window and self.recent_damage_window[0][0] <= self.simulation_time - 4.0:
-                self.recent_damage_window.pop(0)
-
-            self.energy = min(self.max_energy, self.energy + regen_rate * step)
-
-            if self.has_teb_stacking:
-                self.teb_timer -= step
-                if self.teb_timer <= 0:
-                    self.teb_stacks = min(20, self.teb_stacks + 1)
-                    self.teb_timer += 8.0
-
-            if self.thunderfist_icd_timer > 0:
-                self.thunderfist_icd_timer -= step
-
-            if self.gcd_remaining > 0:
-                self.gcd_remaining = max(0, self.gcd_remaining - step)
-            if not self.combat_wisdom_ready:
-                self.combat_wisdom_timer -= step
-                if self.combat_wisdom_timer <= 0:
-                    self.combat_wisdom_ready = True
-                    self.combat_wisdom_timer = 0
-            if self.xuen_active:
-                self.xuen_duration -= step
-                if self.xuen_duration <= 0:
-                    self.xuen_active = False
-                    self.update_stats()
-
-                if self.has_cotc_base:
-                    # Tiger Lightning
-                    self.xuen_lightning_timer -= step
-                    if self.xuen_lightning_timer <= 0:
-                        self.xuen_lightning_timer += 1.0
-                        tl_targets = min(self.target_count, 3)
-                        # Corrected AP Logic: 0.257 * AP(1.0) * Agility
-                        tl_base = 0.257 * self.attack_power * self.agility
-
-                        tl_mod = 1.0 + self.versatility
-                        if self.has_universal_energy:
-                            tl_mod *= 1.15
-                        if self.has_restore_balance:
-                            tl_mod *= 1.05
-
-                        crit_m = 2.0
-                        if use_expected_value:
-                             tl_mod *= (1 + (self.crit * (crit_m - 1)))
-                        else:
-                             if random.random() < self.crit:
-                                 tl_mod *= crit_m
+                        }
+                        if full_detail:
+                            tf_breakdown = {
+                                'base': int(tf_base),
+                                'modifiers': ['Versatility: x%.2f' % (1.0 + self.versatility)],
+                                'crit_sources': ['Base: %.1f%%' % (self.crit*100)],
+                                'final_crit': tf_crit,
+                                'crit_mult': crit_mult
+                            }
+                            if getattr(self, 'has_universal_energy', False):
+                                tf_breakdown['modifiers'].append(f'UniversalEnergy: x{UNIVERSAL_ENERGY:.2f}')
+                            entry["Breakdown"] = tf_breakdown
+                        log_entries.append(entry)
+                    if prof is not None:
+                        prof.add('proc.thunderfist', tf_started)
+
+                if prof is not None:
+                    prof.add('auto_attack', swing_started)
+
+            # Decrease Swing Timer by actual elapsed step
+            # Note: This means if we had a swing at t=0.005 in a 0.01 step, we decrement the FULL step from the NEW timer?
+            # The while loop logic: `temp_step -= time_to_swing`.
+            # Remaining `temp_step` is the time AFTER the swing.
+            # We reset `self.swing_timer` to full duration.
+            # We need to subtract the *remaining* `temp_step` from the NEW `swing_timer`.
+            # The logic `self.swing_timer -= step` is WRONG because `step` includes the time BEFORE the swing which was already consumed.
+            # Correct logic: `self.swing_timer -= temp_step` where `temp_step` is the remaining time in this step.
+            self.swing_timer -= temp_step
+            total_damage += step_damage
+
+        # --- End Auto Attack Logic ---
+
+        self.simulation_time += step
+
+        if self.jade_serpent_cdr_active:
+            self.jade_serpent_cdr_duration -= step
+            if self.jade_serpent_cdr_duration <= 0:
+                self.jade_serpent_cdr_active = False
+                self.cooldown_recovery_rate = 1.0
+
+        if self.conduit_window_timer > 0:
+            self.conduit_window_timer -= step
+            if self.conduit_window_timer <= 0:
+                self.can_cast_conduit = False
+
+        if self.has_teb_stacking:
+            self.teb_timer, self.teb_stacks = tick_teb(self.teb_timer, self.teb_stacks, step)
+
+        if self.thunderfist_icd_timer > 0:
+            self.thunderfist_icd_timer -= step
+
+        if self.gcd_remaining > 0:
+            self.gcd_remaining = max(0, self.gcd_remaining - step)
+        if not self.combat_wisdom_ready:
+            self.combat_wisdom_timer -= step
+            if self.combat_wisdom_timer <= 0:
+                self.combat_wisdom_ready = True
+                self.combat_wisdom_timer = 0
+        if self.xuen_active:
+            self.xuen_duration -= step
+            if self.xuen_duration <= 0:
+                self.xuen_active = False
+                self.update_stats()
+
+            if self.has_cotc_base:
+                if prof is not None:
+                    xuen_started = perf_counter()
+                # Tiger Lightning
+                self.xuen_lightning_timer -= step
+                if self.xuen_lightning_timer <= 0:
+                    self.xuen_lightning_timer += 1.0
+                    tl_targets = min(self.target_count, 3)
+                    # Corrected AP Logic: 0.257 * AP(1.0) * Agility
+                    tl_base = 0.257 * self.attack_power * self.agility
+
+                    tl_mod = 1.0 + self.versatility
+                    if self.has_universal_energy:
+                        tl_mod *= 1.15
+                    if self.has_restore_balance:
+                        tl_mod *= 1.05
+
+                    crit_m = 2.0
+                    if use_expected_value:
+                         tl_mod *= (1 + (self.crit * (crit_m - 1)))
+                    else:
+                         if self.rng.xuen_lightning.random() < self.crit:
+                             tl_mod *= crit_m
 
-                        tl_total = tl_base * tl_mod * tl_targets
-                        total_damage += tl_total
-                        self.record_damage(tl_total)
-                        if damage_meter is not None:
-                             damage_meter['Xuen: Tiger Lightning'] = damage_meter.get('Xuen: Tiger Lightning', 0) + tl_total
+                    tl_total = tl_base * tl_mod * tl_targets
+                    total_damage += tl_total
+                    self.record_damage(tl_total)
+                    if damage_meter is not None:
+                         damage_meter['Xuen: Tiger Lightning'] = damage_meter.get('Xuen: Tiger Lightning', 0) + tl_total
+                    if log_events:
                         log_entries.append({
                             "Action": "Xuen: Tiger Lightning",
                             "Expected DMG": tl_total,
                             "source": "passive",
-                            "offset": elapsed
+                            "timestamp": elapsed + step,
+                            "offset": elapsed + step
                         })
 
-                    # Empowered Lightning
-                    self.xuen_empowered_timer -= step
-                    if self.xuen_empowered_timer <= 0:
-                        self.xuen_empowered_timer += 4.0
-                        recent = self.get_damage_last_4s()
-                        el_base = recent * 0.08
-                        el_total = el_base
+                # Empowered Lightning
+                self.xuen_empowered_timer -= step
+                if self.xuen_empowered_timer <= 0:
+                    self.xuen_empowered_timer += 4.0
+                    recent = self.get_damage_last_4s()
+                    el_base = recent * 0.08
+                    el_total = el_base
 
-                        total_damage += el_total
-                        self.record_damage(el_total)
-                        if damage_meter is not None:
-                             damage_meter['Xuen: Empowered Lightning'] = damage_meter.get('Xuen: Empowered Lightning', 0) + el_total
+                    total_damage += el_total
+                    self.record_damage(el_total)
+                    if damage_meter is not None:
+                         damage_meter['Xuen: Empowered Lightning'] = damage_meter.get('Xuen: Empowered Lightning', 0) + el_total
+                    if log_events:
                         log_entries.append({
                             "Action": "Xuen: Empowered Lightning",
                             "Expected DMG": el_total,
                             "source": "passive",
-                            "offset": elapsed
+                            "timestamp": elapsed + step,
+                            "offset": elapsed + step
                         })
-
-
-            if self.zenith_active:
-                self.zenith_duration -= step
-                if self.zenith_duration <= 0:
-                    self.zenith_active = False
-
-            if self.momentum_buff_active:
-                self.momentum_buff_duration -= step
-                if self.momentum_buff_duration <= 0:
-                    self.momentum_buff_active = False
-
-            if self.dance_of_chiji_stacks > 0:
-                self.dance_of_chiji_duration -= step
-                if self.dance_of_chiji_duration <= 0:
-                    self.dance_of_chiji_stacks = 0
-                    self.dance_of_chiji_duration = 0.0
-
-            if self.is_channeling:
-                self.channel_time_remaining -= step
-                self.time_until_next_tick -= step
-                if self.time_until_next_tick <= 1e-6:
-                    if self.channel_ticks_remaining > 0:
-                        spell = self.current_channel_spell
-                        tick_idx = spell.total_ticks - self.channel_ticks_remaining
-                        tick_dmg, breakdown = spell.calculate_tick_damage(self, tick_idx=tick_idx, use_expected_value=use_expected_value)
-                        total_damage += tick_dmg
-                        self.record_damage(tick_dmg)
-
-                        if damage_meter is not None and spell:
-                            damage_meter[spell.abbr] = damage_meter.get(spell.abbr, 0) + tick_dmg
-                        self.channel_ticks_remaining -= 1
-                        self.time_until_next_tick += self.channel_tick_interval
-
-                        log_entries.append({
+                if prof is not None:
+                    prof.add('proc.xuen_lightning', xuen_started)
+
+        if self.zenith_active:
+            self.zenith_duration -= step
+            if self.zenith_duration <= 0:
+                self.zenith_active = False
+
+        if self.momentum_buff_active:
+            self.momentum_buff_duration -= step
+            if self.momentum_buff_duration <= 0:
+                self.momentum_buff_active = False
+
+        if self.dance_of_chiji_stacks > 0:
+            self.dance_of_chiji_duration -= step
+            if self.dance_of_chiji_duration <= 0:
+                self.dance_of_chiji_stacks = 0
+                self.dance_of_chiji_duration = 0.0
+
+        if self.is_channeling:
+            self.channel_time_remaining -= step
+            self.time_until_next_tick -= step
+            if self.time_until_next_tick <= 1e-6:
+                if self.channel_ticks_remaining > 0:
+                    if prof is not None:
+                        tick_started = perf_counter()
+                    spell = self.current_channel_spell
+                    tick_idx = spell.total_ticks - self.channel_ticks_remaining
+                    if prof is not None:
+                        damage_started = perf_counter()
+                    tick_dmg, breakdown = spell.calculate_tick_damage(self, tick_idx=tick_idx, use_expected_value=use_expected_value)
+                    if prof is not None:
+                        prof.add('tick_damage', damage_started)
+                    total_damage += tick_dmg
+                    self.record_damage(tick_dmg)
+
+                    if damage_meter is not None and spell:
+                        damage_meter[spell.abbr] = damage_meter.get(spell.abbr, 0) + tick_dmg
+                    self.channel_ticks_remaining -= 1
+                    self.time_until_next_tick += self.channel_tick_interval
+
+                    if log_events:
+                        entry = {
                             "Action": f"{spell.abbr} (Tick)",
                             "Expected DMG": tick_dmg,
-                            "Breakdown": breakdown,
                             "source": "active",
-                            "offset": elapsed
-                        })
-
-                if self.channel_time_remaining <= 1e-6 or self.channel_ticks_remaining <= 0:
-                    # [COTC] Conduit Finish: Unity Within
-                    if self.current_channel_spell.abbr == 'Conduit' and self.has_unity_within:
-                         tick_dmg, breakdown = self.current_channel_spell.calculate_tick_damage(self, tick_idx=0, use_expected_value=use_expected_value)
-                         burst_dmg = tick_dmg * 2.0
-                         total_damage += burst_dmg
-                         self.record_damage(burst_dmg)
-
-                         if damage_meter is not None:
-                             damage_meter['Conduit (Unity Within)'] = damage_meter.get('Conduit (Unity Within)', 0) + burst_dmg
-
-                         log_entries.append({
+                            "timestamp": elapsed + step,
+                            "offset": elapsed + step
+                        }
+                        if full_detail:
+                            entry["Breakdown"] = breakdown
+                        log_entries.append(entry)
+                    if prof is not None:
+                        prof.add('channel_tick', tick_started)
+
+            if self.channel_time_remaining <= 1e-6 or self.channel_ticks_remaining <= 0:
+                # [COTC] Conduit Finish: Unity Within
+                if self.current_channel_spell.abbr == 'Conduit' and self.has_unity_within:
+                     tick_dmg, breakdown = self.current_channel_spell.calculate_tick_damage(self, tick_idx=0, use_expected_value=use_expected_value)
+                     burst_dmg = tick_dmg * 2.0
+                     total_damage += burst_dmg
+                     self.record_damage(burst_dmg)
+
+                     if damage_meter is not None:
+                         damage_meter['Conduit (Unity Within)'] = damage_meter.get('Conduit (Unity Within)', 0) + burst_dmg
+
+                     if log_events:
+                         entry = {
                             "Action": "Conduit: Unity Within",
                             "Expected DMG": burst_dmg,
-                            "Breakdown": breakdown,
                             "source": "passive",
-                            "offset": elapsed
-                        })
+                            "timestamp": elapsed + step,
+                            "offset": elapsed + step
+                         }
+                         if full_detail:
+                             entry["Breakdown"] = breakdown
+                         log_entries.append(entry)
 
 
-                    if self.current_channel_spell.abbr == 'FOF':
-                        if self.has_momentum_boost:
-                            self.momentum_buff_active = True
-                            self.momentum_buff_duration = 8.0
+                if self.current_channel_spell.abbr == 'FOF':
+                    if self.has_momentum_boost:
+                        self.momentum_buff_active = True
+                        self.momentum_buff_duration = MOMENTUM_BOOST_DURATION
 
-                        if getattr(self, 'has_jadefire_stomp', False):
-                            # Corrected: AP * Agility
-                            jf_base = 0.4 * self.attack_power * self.agility
+                    if getattr(self, 'has_jadefire_stomp', False):
+                        # Corrected: AP * Agility
+                        jf_base = JADEFIRE_STOMP_COEFF * self.attack_power * self.agility
 
-                            jf_mod = 1.0 + self.versatility
-                            if self.zenith_active and getattr(self, 'has_weapon_of_wind', False):
-                                jf_mod *= 1.10
-                            if getattr(self, 'has_universal_energy', False):
-                                jf_mod *= 1.15
-                            if self.has_restore_balance and self.xuen_active:
-                                jf_mod *= 1.05
+                        jf_mod = 1.0 + self.versatility
+                        if self.zenith_active and getattr(self, 'has_weapon_of_wind', False):
+                            jf_mod *= WEAPON_OF_WIND
+                        if getattr(self, 'has_universal_energy', False):
+                            jf_mod *= UNIVERSAL_ENERGY
+                        if self.has_restore_balance and self.xuen_active:
+                            jf_mod *= 1.05
 
-                            eff_target_count = self.target_count
-                            poj_bonus = 0.0
-                            if getattr(self, 'has_path_of_jade', False):
-                                poj_bonus = min(0.50, 0.10 * eff_target_count)
-                                jf_mod *= (1.0 + poj_bonus)
+                        eff_target_count = self.target_count
+                        poj_bonus = 0.0
+                        if getattr(self, 'has_path_of_jade', False):
+                            poj_bonus = min(0.50, 0.10 * eff_target_count)
+                            jf_mod *= (1.0 + poj_bonus)
 
-                            if getattr(self, 'has_singularly_focused_jade', False):
-                                jf_mod *= 4.0
-                                eff_target_count = 1
+                        if getattr(self, 'has_singularly_focused_jade', False):
+                            jf_mod *= 4.0
+                            eff_target_count = 1
 
-                            scale = 1.0
-                            if eff_target_count > 5:
-                                scale = (5.0 / eff_target_count) ** 0.5
+                        scale = 1.0
+                        if eff_target_count > 5:
+                            scale = (5.0 / eff_target_count) ** 0.5
 
-                            if use_expected_value:
-                                jf_total = jf_base * jf_mod * eff_target_count * scale * (1 + (self.crit * (crit_mult - 1)))
-                            else:
-                                jf_total = jf_base * jf_mod * eff_target_count * scale * (1 + (self.crit * (crit_mult - 1)))
+                        if use_expected_value:
+                            jf_total = jf_base * jf_mod * eff_target_count * scale * (1 + (self.crit * (crit_mult - 1)))
+                        else:
+                            jf_total = jf_base * jf_mod * eff_target_count * scale * (1 + (self.crit * (crit_mult - 1)))
 
-                            total_damage += jf_total
-                            self.record_damage(jf_total)
+                        total_damage += jf_total
+                        self.record_damage(jf_total)
 
-                            if damage_meter is not None:
-                                damage_meter['Jadefire Stomp'] = damage_meter.get('Jadefire Stomp', 0) + jf_total
+                        if damage_meter is not None:
+                            damage_meter['Jadefire Stomp'] = damage_meter.get('Jadefire Stomp', 0) + jf_total
 
-                            log_entries.append({
+                        if log_events:
+                            entry = {
                                 "Action": "Jadefire Stomp",
                                 "Expected DMG": jf_total,
-                                "Breakdown": {
+                                "source": "passive",
+                                "timestamp": elapsed + step,
+                                "offset": elapsed + step
+                            }
+                            if full_detail:
+                                entry["Breakdown"] = {
                                     "base": int(jf_base),
                                     "targets": eff_target_count,
                                     "modifiers": ["SoftCap" if eff_target_count>5 else "Uncapped", f"PathJade:{poj_bonus:.2f}"],
-                                },
-                                "source": "passive",
-                                "offset": elapsed
-                            })
+                                }
+                            log_entries.append(entry)
+
+                self.is_channeling = False
+                self.current_channel_spell = None
+                self.channel_mastery_snapshot = False
+        return total_damage
 
-                    self.is_channeling = False
-                    self.current_channel_spell = None
-                    self.channel_mastery_snapshot = False
-            elapsed += step
-        return total_damage, log_entries
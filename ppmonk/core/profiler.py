@@ -0,0 +1,103 @@
+"""Opt-in counters and wall time for the simulation hot paths.
+
+Instrumented code reads ``player.profiler`` (``None`` unless profiling) once
+and only calls ``time.perf_counter`` when it is set, so a disabled profiler
+costs one ``is not None`` check per site::
+
+    prof = player.profiler
+    if prof is not None:
+        started = perf_counter()
+    ...  # the work
+    if prof is not None:
+        prof.add('auto_attack', started)
+
+``MonkEnv(profiler=...)`` hands a profiler to every player it builds;
+``MonteCarloRunner(profiling=True)`` collects one per chunk and merges them
+into ``MonteCarloResult.profiler``. Times are inclusive: a channel tick's time
+also contains its ``tick_damage``, and ``env_step`` contains everything the
+step did, so ``env_step`` minus its children is the env's own overhead.
+"""
+
+from __future__ import annotations
+
+from time import perf_counter
+from typing import Callable, Dict, List, Optional
+
+# Instrumented sections, outermost first
+SUBSYSTEMS = (
+    'env_step',          # MonkEnv.step
+    'advance_time',      # PlayerState.advance_time
+    'auto_attack',       # one swing, with its procs
+    'channel_tick',      # one channel tick, with its tick_damage
+    'cast',              # Spell.cast from the env
+    'tick_damage',       # calculate_tick_damage (damage plus breakdown building)
+    'proc.flurry_strikes',   # Flurry Strikes bursts with Shado Over Battlefield / High Impact
+    'proc.thunderfist',
+    'proc.xuen_lightning',   # Tiger Lightning and Empowered Lightning
+    'spellbook_tick',    # SpellBook.tick
+    'action_masks',      # MonkEnv.action_masks
+    'obs_encoding',      # MonkEnv._get_obs
+)
+
+
+class Profiler:
+    """Event counts and accumulated wall time per subsystem.
+
+    ``sink`` (e.g. ``print`` or a logger method) makes every finished
+    ``MonkEnv`` episode dump its summary and start the next one from zero;
+    without it, counts accumulate until ``reset``.
+    """
+
+    def __init__(self, sink: Optional[Callable[[str], None]] = None) -> None:
+        self.sink = sink
+        self.stats: Dict[str, List[float]] = {}  # name -> [count, seconds]
+        self.episodes = 0
+
+    def add(self, name: str, started: float) -> None:
+        """Count one ``name`` event that began at ``perf_counter()`` value ``started``."""
+        elapsed = perf_counter() - started
+        entry = self.stats.get(name)
+        if entry is None:
+            self.stats[name] = [1, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+
+    def merge(self, other: 'Profiler') -> None:
+        for name, (count, seconds) in other.stats.items():
+            entry = self.stats.setdefault(name, [0, 0.0])
+            entry[0] += count
+            entry[1] += seconds
+        self.episodes += other.episodes
+
+    def reset(self) -> None:
+        self.stats.clear()
+        self.episodes = 0
+
+    def end_episode(self, label: str = '') -> None:
+        """Called by ``MonkEnv`` when an episode finishes."""
+        self.episodes += 1
+        if self.sink is not None:
+            self.sink(self.summary(label or f'episode {self.episodes}'))
+            self.stats.clear()
+
+    def count(self, name: str) -> int:
+        return int(self.stats.get(name, (0, 0.0))[0])
+
+    def seconds(self, name: str) -> float:
+        return self.stats.get(name, (0, 0.0))[1]
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        return {name: {'count': int(count), 'seconds': seconds} for name, (count, seconds) in self.stats.items()}
+
+    def summary(self, title: str = 'profile') -> str:
+        order = {name: i for i, name in enumerate(SUBSYSTEMS)}
+        lines = [title, f"  {'subsystem':<20} {'count':>10} {'total ms':>10} {'us/event':>10}"]
+        for name in sorted(self.stats, key=lambda n: (order.get(n, len(order)), n)):
+            count, seconds = self.stats[name]
+            lines.append(f"  {name:<20} {int(count):>10} {seconds * 1e3:>10.2f} {seconds / count * 1e6:>10.2f}")
+        return '\n'.join(lines)
+
+    def __getstate__(self):
+        # The sink (often a bound method or print) stays in the process that made it
+        return {'sink': None, 'stats': self.stats, 'episodes': self.episodes}
@@ -0,0 +1,45 @@
+"""Lazily evaluated regenerating resources for PPMonk."""
+
+from __future__ import annotations
+
+
+class LazyResource:
+    """A capped resource that regenerates linearly between writes.
+
+    The resource is stored as a ``(value, timestamp, rate)`` triple and its
+    current amount is evaluated on read, so the simulation loop never has to
+    add regeneration step by step.
+    """
+
+    __slots__ = ("value", "timestamp", "rate", "maximum")
+
+    def __init__(self, value: float, maximum: float, rate: float = 0.0, timestamp: float = 0.0) -> None:
+        self.value = value
+        self.maximum = maximum
+        self.rate = rate
+        self.timestamp = timestamp
+
+    def value_at(self, now: float) -> float:
+        """Return the amount at simulation time ``now``."""
+
+        elapsed = now - self.timestamp
+        if elapsed <= 0:
+            return self.value
+        return min(self.maximum, self.value + self.rate * elapsed)
+
+    def set(self, value: float, now: float) -> None:
+        """Overwrite the amount as of simulation time ``now``."""
+
+        self.value = value
+        self.timestamp = now
+
+    def rebase(self, now: float, rate: float | None = None, maximum: float | None = None) -> None:
+        """Fold regeneration up to ``now`` into the stored value, then change rate and/or cap."""
+
+        self.value = self.value_at(now)
+        self.timestamp = now
+        if rate is not None:
+            self.rate = rate
+        if maximum is not None:
+            self.maximum = maximum
+
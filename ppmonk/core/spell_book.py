@@ -1,7 +1,20 @@
-import random
-import math
+from time import perf_counter
+
+from .mechanics import (COMBAT_WISDOM_COOLDOWN, COMBAT_WISDOM_CRIT, COMBO_BREAKER_CHANCE,
+                        DANCE_OF_CHIJI_CHANCE_PER_CHI, DANCE_OF_CHIJI_DURATION, DRINKING_HORN_COVER_ZENITH_DURATION,
+                        EXPEL_HARM_COEFF, FLURRY_OF_XUEN_CHANCE, JADE_IGNITION_COEFF, MEMORY_OF_MONASTERY_CHANCE,
+                        RSK_RESET_CHANCE, RWK_COEFF, UNIVERSAL_ENERGY, WEAPON_OF_WIND, XUEN_DURATION, ZENITH_DURATION,
+                        aura, flurry_of_xuen_base, hidden_aura, hit_combo_mult, rwk_target_mult, soft_cap_scale,
+                        totm_base, zenith_burst)
 from .talents import TalentManager
 
+class CooldownClock:
+    """Shared cooldown time base. It advances at the player's cooldown recovery rate."""
+    __slots__ = ('now',)
+
+    def __init__(self):
+        self.now = 0.0
+
 class Spell:
     def __init__(self, abbr, ap_coeff, name=None, energy=0, chi_cost=0, chi_gen=0, cd=0, cd_haste=False,
                  cast_time=0, cast_haste=False, is_channeled=False, ticks=1, req_talent=False, gcd_override=None,
@@ -24,8 +37,10 @@ class Spell:
         self.gcd_override = gcd_override
         self.is_known = not req_talent
         self.max_charges = max_charges
-        self.charges = self.max_charges
-        self.current_cd = 0.0
+        # Cooldowns are stored as the clock timestamp at which the next charge comes back
+        self.clock = CooldownClock()
+        self._charges = self.max_charges
+        self._ready_at = 0.0
         self.is_combo_strike = True
         self.haste_dmg_scaling = False
         self.tick_dmg_ramp = 0.0
@@ -42,6 +57,43 @@ class Spell:
         self.bonus_crit_chance = 0.0
         self.crit_damage_bonus = 0.0
 
+    def _sync_charges(self):
+        while self._charges < self.max_charges and self.clock.now >= self._ready_at:
+            self._charges += 1
+            if self._charges < self.max_charges:
+                self._ready_at += self.base_cd
+
+    def tick_cd(self, dt, player=None):
+        """Recover ``dt`` seconds of this spell's cooldown alone.
+
+        Kept for callers that tick spells one at a time; ``SpellBook.tick``
+        moves the shared clock instead, which recovers every spell at once.
+        """
+        rate = player.cooldown_recovery_rate if player else 1.0
+        if self._charges < self.max_charges:
+            self._ready_at -= dt * rate
+            self._sync_charges()
+
+    @property
+    def charges(self):
+        self._sync_charges()
+        return self._charges
+
+    @charges.setter
+    def charges(self, value):
+        self._charges = value
+
+    @property
+    def current_cd(self):
+        self._sync_charges()
+        if self._charges >= self.max_charges:
+            return 0.0
+        return max(0.0, self._ready_at - self.clock.now)
+
+    @current_cd.setter
+    def current_cd(self, value):
+        self._ready_at = self.clock.now + value
+
     def add_modifier(self, name, value):
         self.modifiers.append((name, value))
 
@@ -97,7 +149,7 @@ class Spell:
             if player.has_energy_burst:
                 player.chi = min(player.max_chi, player.chi + 1)
             if getattr(player, 'has_rushing_wind_kick', False):
-                 if random.random() < 0.40:
+                 if player.rng.rushing_wind_kick.random() < 0.40:
                      player.rwk_ready = True
 
         is_dance_of_chiji = False
@@ -147,24 +199,24 @@ class Spell:
 
         # TP Procs
         if self.abbr == 'TP' and getattr(player, 'has_combo_breaker', False):
-            chance = 0.10 if getattr(player, 'has_memory_of_monastery', False) else 0.08
+            chance = MEMORY_OF_MONASTERY_CHANCE if getattr(player, 'has_memory_of_monastery', False) else COMBO_BREAKER_CHANCE
             should_proc_cb = force_proc_combo_breaker
 
-            if not should_proc_cb and not use_expected_value and random.random() < chance:
+            if not should_proc_cb and not use_expected_value and player.rng.combo_breaker.random() < chance:
                 should_proc_cb = True
 
             if should_proc_cb:
                 player.combo_breaker_stacks = min(2, player.combo_breaker_stacks + 1)
 
         if self.chi_cost > 0 and getattr(player, 'has_dance_of_chiji', False):
-            if random.random() < 0.015 * self.chi_cost:
+            if player.rng.dance_of_chiji.random() < DANCE_OF_CHIJI_CHANCE_PER_CHI * self.chi_cost:
                 player.dance_of_chiji_stacks = min(2, player.dance_of_chiji_stacks + 1)
-                player.dance_of_chiji_duration = 15.0
+                player.dance_of_chiji_duration = DANCE_OF_CHIJI_DURATION
 
         if self.abbr in ['SOTWL', 'WDP']:
             if getattr(player, 'has_revolving_whirl', False):
                 player.dance_of_chiji_stacks = min(2, player.dance_of_chiji_stacks + 1)
-                player.dance_of_chiji_duration = 15.0
+                player.dance_of_chiji_duration = DANCE_OF_CHIJI_DURATION
             if getattr(player, 'has_echo_technique', False):
                 player.combo_breaker_stacks = min(2, player.combo_breaker_stacks + 1)
             if getattr(player, 'has_knowledge_of_broken_temple', False):
@@ -192,7 +244,7 @@ class Spell:
                 player.guaranteed_courage_proc = False
             elif player.has_courage_of_white_tiger:
                  ppm = 4.0
-                 if random.random() < ppm * (player.base_swing_time / 60.0):
+                 if player.rng.courage_of_white_tiger.random() < ppm * (player.base_swing_time / 60.0):
                      should_proc_courage = True
 
             if should_proc_courage:
@@ -201,7 +253,7 @@ class Spell:
                 c_mod *= player.get_physical_mitigation()
                 if player.has_restore_balance and player.xuen_active: c_mod *= 1.05
 
-                is_crit = random.random() < player.crit
+                is_crit = player.rng.courage_of_white_tiger.random() < player.crit
                 c_final = courage_dmg * c_mod * (2.0 if is_crit else 1.0)
                 player.record_damage(c_final)
                 if damage_meter is not None:
@@ -211,6 +263,7 @@ class Spell:
 
         extra_damage = 0.0
         extra_damage_details = []
+        log_events = player.detail_level != 'none'
 
         # FOF Flurry Consumption
         if self.abbr == 'FOF' and player.flurry_charges > 0:
@@ -222,7 +275,7 @@ class Spell:
                 if flurry_total > 0: damage_meter['Flurry Strikes'] = damage_meter.get('Flurry Strikes', 0) + flurry_total
                 if sob_total > 0: damage_meter['Shado Over Battlefield'] = damage_meter.get('Shado Over Battlefield', 0) + sob_total
                 if hi_total > 0: damage_meter['High Impact'] = damage_meter.get('High Impact', 0) + hi_total
-            extra_damage_details.append({
+            if log_events: extra_damage_details.append({
                 'name': f'Flurry Burst (FOF) x{consumed}',
                 'damage': flurry_total + sob_total + hi_total
             })
@@ -234,15 +287,15 @@ class Spell:
                  extra_damage += flurry_total + sob_total + hi_total
                  if damage_meter is not None:
                     damage_meter['Flurry Strikes'] = damage_meter.get('Flurry Strikes', 0) + flurry_total
-                 extra_damage_details.append({'name': 'Wisdom of Wall x3', 'damage': flurry_total})
+                 if log_events: extra_damage_details.append({'name': 'Wisdom of Wall x3', 'damage': flurry_total})
 
         # Jade Ignition
         if self.abbr == 'SCK' and getattr(player, 'has_jade_ignition', False):
-            ji_base = 1.80 * player.attack_power * player.agility
+            ji_base = JADE_IGNITION_COEFF * player.attack_power * player.agility
             ji_mods = 1.0 + player.versatility
-            if getattr(player, 'has_hit_combo', False): ji_mods *= (1.0 + player.hit_combo_stacks * 0.01)
-            if getattr(player, 'has_universal_energy', False): ji_mods *= 1.15
-            if player.zenith_active and getattr(player, 'has_weapon_of_wind', False): ji_mods *= 1.10
+            if getattr(player, 'has_hit_combo', False): ji_mods *= hit_combo_mult(player.hit_combo_stacks)
+            if getattr(player, 'has_universal_energy', False): ji_mods *= UNIVERSAL_ENERGY
+            if player.zenith_active and getattr(player, 'has_weapon_of_wind', False): ji_mods *= WEAPON_OF_WIND
             if player.has_restore_balance and player.xuen_active: ji_mods *= 1.05
 
             ji_crit = player.crit + (player.teb_active_bonus if player.zenith_active else 0.0)
@@ -250,13 +303,13 @@ class Spell:
             if use_expected_value:
                 ji_final = ji_base * ji_mods * (1 + ji_crit * (2.0 - 1)) # Crit 2.0
             else:
-                is_crit = random.random() < ji_crit
+                is_crit = player.rng.jade_ignition.random() < ji_crit
                 ji_final = ji_base * ji_mods * (2.0 if is_crit else 1.0)
 
             ji_final = self._apply_aoe_scaling(ji_final, player, 'soft_cap')
             extra_damage += ji_final
             if damage_meter is not None: damage_meter['Jade Ignition'] = damage_meter.get('Jade Ignition', 0) + ji_final
-            extra_damage_details.append({'name': 'Jade Ignition', 'damage': ji_final})
+            if log_events: extra_damage_details.append({'name': 'Jade Ignition', 'damage': ji_final})
 
         # Niuzao Stomp
         if self.abbr == 'BOK' and player.niuzao_ready:
@@ -273,20 +326,20 @@ class Spell:
             if use_expected_value:
                  stomp_total = stomp_base * stomp_mod * player.target_count * stomp_scale * (1 + (player.crit * (2.0 - 1)))
             else:
-                 stomp_total = stomp_base * stomp_mod * player.target_count * stomp_scale * (2.0 if random.random() < player.crit else 1.0)
+                 stomp_total = stomp_base * stomp_mod * player.target_count * stomp_scale * (2.0 if player.rng.niuzao_stomp.random() < player.crit else 1.0)
 
             extra_damage += stomp_total
             if damage_meter is not None: damage_meter['Niuzao Stomp'] = damage_meter.get('Niuzao Stomp', 0) + stomp_total
             player.advance_inner_compass()
-            extra_damage_details.append({'name': 'Niuzao Stomp', 'damage': stomp_total})
+            if log_events: extra_damage_details.append({'name': 'Niuzao Stomp', 'damage': stomp_total})
 
         # TotM Consumption
         if self.abbr == 'BOK' and player.has_totm and player.totm_stacks > 0:
             extra_hits = player.totm_stacks
-            dmg_per_hit = 0.847 * player.attack_power * player.agility
+            totm_dmg = totm_base(extra_hits, player.attack_power * player.agility)
 
-            hc_mod = 1.0 + (player.hit_combo_stacks * 0.01) if getattr(player, 'has_hit_combo', False) else 1.0
-            ww_mod = 1.10 if (player.zenith_active and getattr(player, 'has_weapon_of_wind', False)) else 1.0
+            hc_mod = hit_combo_mult(player.hit_combo_stacks) if getattr(player, 'has_hit_combo', False) else 1.0
+            ww_mod = WEAPON_OF_WIND if (player.zenith_active and getattr(player, 'has_weapon_of_wind', False)) else 1.0
             base_mult = (1 + player.versatility) * hc_mod * ww_mod
             if player.has_restore_balance and player.xuen_active: base_mult *= 1.05
 
@@ -294,23 +347,23 @@ class Spell:
             crit_m = 2.0 + self.crit_damage_bonus + player.teb_crit_dmg_bonus
 
             if use_expected_value:
-                total_extra = extra_hits * dmg_per_hit * base_mult * (1 + crit_c * (crit_m - 1))
+                total_extra = totm_dmg * base_mult * (1 + crit_c * (crit_m - 1))
             else:
-                is_crit = random.random() < crit_c
-                total_extra = extra_hits * dmg_per_hit * base_mult * (crit_m if is_crit else 1.0)
+                is_crit = player.rng.teachings_of_the_monastery.random() < crit_c
+                total_extra = totm_dmg * base_mult * (crit_m if is_crit else 1.0)
 
             extra_damage += total_extra
             if damage_meter is not None: damage_meter['TotM'] = damage_meter.get('TotM', 0) + total_extra
-            extra_damage_details.append({'name': 'TotM Hits', 'damage': total_extra, 'hits': extra_hits})
+            if log_events: extra_damage_details.append({'name': 'TotM Hits', 'damage': total_extra, 'hits': extra_hits})
 
-            if not getattr(player, 'has_xuens_guidance', False) or random.random() >= 0.15:
+            if not getattr(player, 'has_xuens_guidance', False) or player.rng.xuens_guidance.random() >= 0.15:
                 player.totm_stacks = 0
             else:
                 player.totm_stacks = 1 # Refund
 
         # Reset Proc
         should_reset = force_proc_reset
-        if not should_reset and not use_expected_value and random.random() < 0.12:
+        if not should_reset and not use_expected_value and player.rng.rsk_reset.random() < RSK_RESET_CHANCE:
             should_reset = True
         if should_reset and other_spells and 'RSK' in other_spells:
              other_spells['RSK'].current_cd = 0.0
@@ -318,14 +371,14 @@ class Spell:
         # Glory of Dawn
         if self.abbr == 'RSK' and player.has_glory_of_the_dawn:
             should_proc_glory = force_proc_glory
-            if not should_proc_glory and not use_expected_value and random.random() < player.haste:
+            if not should_proc_glory and not use_expected_value and player.rng.glory_of_the_dawn.random() < player.haste:
                 should_proc_glory = True
 
             if should_proc_glory or use_expected_value:
                 glory_dmg = 1.0 * player.attack_power * player.agility
                 # Apply same mods as RSK roughly
-                hc_mod = 1.0 + (player.hit_combo_stacks * 0.01) if getattr(player, 'has_hit_combo', False) else 1.0
-                ww_mod = 1.10 if (player.zenith_active and getattr(player, 'has_weapon_of_wind', False)) else 1.0
+                hc_mod = hit_combo_mult(player.hit_combo_stacks) if getattr(player, 'has_hit_combo', False) else 1.0
+                ww_mod = WEAPON_OF_WIND if (player.zenith_active and getattr(player, 'has_weapon_of_wind', False)) else 1.0
                 base_glory = glory_dmg * (1 + player.versatility) * hc_mod * ww_mod * (1.0 + player.mastery)
 
                 crit_c = player.crit + self.bonus_crit_chance
@@ -335,18 +388,19 @@ class Spell:
                 if use_expected_value:
                     final_glory = base_glory * (1 + crit_c * (crit_m - 1)) * player.haste # EV includes proc chance
                 else:
-                    is_crit = random.random() < crit_c
+                    is_crit = player.rng.glory_of_the_dawn.random() < crit_c
                     final_glory = base_glory * (crit_m if is_crit else 1.0)
                     player.chi = min(player.max_chi, player.chi + 1)
 
                 extra_damage += final_glory
                 if damage_meter is not None: damage_meter['Glory of Dawn'] = damage_meter.get('Glory of Dawn', 0) + final_glory
-                extra_damage_details.append({'name': 'Glory of Dawn', 'damage': final_glory})
+                if log_events: extra_damage_details.append({'name': 'Glory of Dawn', 'damage': final_glory})
 
         # Zenith Cast
         if self.abbr == 'Zenith':
             player.zenith_active = True
-            player.zenith_duration = 20.0 if getattr(player, 'has_drinking_horn_cover', False) else 15.0
+            player.zenith_duration = (DRINKING_HORN_COVER_ZENITH_DURATION if getattr(player, 'has_drinking_horn_cover', False)
+                                      else ZENITH_DURATION)
             if getattr(player, 'has_stand_ready', False):
                 player.stand_ready_active = True
                 player.flurry_charges += 10
@@ -357,21 +411,20 @@ class Spell:
             player.teb_stacks = 0
             player.teb_active_bonus = consumed * 0.02
 
-            zenith_burst = 10.0 * player.attack_power * player.agility
-            hc_mod = 1.0 + (player.hit_combo_stacks * 0.01) if getattr(player, 'has_hit_combo', False) else 1.0
-            ww_mod = 1.10 if getattr(player, 'has_weapon_of_wind', False) else 1.0
+            hc_mod = hit_combo_mult(player.hit_combo_stacks) if getattr(player, 'has_hit_combo', False) else 1.0
+            ww_mod = WEAPON_OF_WIND if getattr(player, 'has_weapon_of_wind', False) else 1.0
             if getattr(player, 'has_weapons_of_the_wall', False): ww_mod *= 1.20
 
-            zenith_final = zenith_burst * (1.0 + player.versatility) * hc_mod * ww_mod * (1.0 + player.mastery)
+            zenith_final = zenith_burst(player.attack_power * player.agility, player.versatility, hc_mod, ww_mod, player.mastery)
             zenith_final = self._apply_aoe_scaling(zenith_final, player, 'soft_cap')
 
             extra_damage += zenith_final
-            extra_damage_details.append({'name': 'Zenith Blast', 'damage': zenith_final})
+            if log_events: extra_damage_details.append({'name': 'Zenith Blast', 'damage': zenith_final})
 
         # Xuen Cast
         if self.abbr == 'Xuen':
             player.xuen_active = True
-            player.xuen_duration = 24.0
+            player.xuen_duration = XUEN_DURATION
             player.update_stats()
             if player.has_cotc_base:
                 player.can_cast_conduit = True
@@ -382,35 +435,35 @@ class Spell:
 
         # Flurry of Xuen
         if getattr(player, 'has_flurry_of_xuen', False):
-            should_proc = (self.abbr == 'Xuen') or (not use_expected_value and random.random() < 0.10)
+            should_proc = (self.abbr == 'Xuen') or (not use_expected_value and player.rng.flurry_of_xuen.random() < FLURRY_OF_XUEN_CHANCE)
             if should_proc or (use_expected_value and self.abbr != 'Xuen'): # EV Mode logic for random proc
-                 fox_base = 3.92 * player.attack_power * player.agility
-                 fox_unit = self._apply_aoe_scaling(fox_base * (1.0 + player.versatility), player, 'soft_cap')
+                 fox_unit = self._apply_aoe_scaling(flurry_of_xuen_base(player.attack_power * player.agility, player.versatility),
+                                                    player, 'soft_cap')
                  crit_m = 2.0 + self.crit_damage_bonus + player.teb_crit_dmg_bonus
                  crit_c = 1.0 if self.abbr == 'Xuen' else player.crit
 
                  if use_expected_value:
-                     chance = 1.0 if self.abbr == 'Xuen' else 0.10
+                     chance = 1.0 if self.abbr == 'Xuen' else FLURRY_OF_XUEN_CHANCE
                      fox_dmg = fox_unit * (1 + crit_c * (crit_m - 1)) * chance
                  else:
-                     fox_dmg = fox_unit * (crit_m if random.random() < crit_c else 1.0)
+                     fox_dmg = fox_unit * (crit_m if player.rng.flurry_of_xuen.random() < crit_c else 1.0)
 
                  extra_damage += fox_dmg
-                 extra_damage_details.append({'name': 'Flurry of Xuen', 'damage': fox_dmg})
+                 if log_events: extra_damage_details.append({'name': 'Flurry of Xuen', 'damage': fox_dmg})
 
         if self.triggers_combat_wisdom and getattr(player, 'combat_wisdom_ready', False):
             player.combat_wisdom_ready = False
-            player.combat_wisdom_timer = 15.0
-            eh_base = 1.2 * player.attack_power * player.agility
-            eh_crit = player.crit + 0.15 + (player.teb_active_bonus if player.zenith_active else 0.0)
+            player.combat_wisdom_timer = COMBAT_WISDOM_COOLDOWN
+            eh_base = EXPEL_HARM_COEFF * player.attack_power * player.agility
+            eh_crit = player.crit + COMBAT_WISDOM_CRIT + (player.teb_active_bonus if player.zenith_active else 0.0)
             crit_m = 2.0 + self.crit_damage_bonus + player.teb_crit_dmg_bonus
 
             if use_expected_value:
                 eh_dmg = eh_base * (1.0 + player.versatility) * (1 + eh_crit * (crit_m - 1))
             else:
-                eh_dmg = eh_base * (1.0 + player.versatility) * (crit_m if random.random() < eh_crit else 1.0)
+                eh_dmg = eh_base * (1.0 + player.versatility) * (crit_m if player.rng.combat_wisdom.random() < eh_crit else 1.0)
             extra_damage += eh_dmg
-            extra_damage_details.append({'name': 'Expel Harm', 'damage': eh_dmg})
+            if log_events: extra_damage_details.append({'name': 'Expel Harm', 'damage': eh_dmg})
 
         if self.is_channeled:
             player.is_channeling = True
@@ -421,10 +474,17 @@ class Spell:
             player.time_until_next_tick = player.channel_tick_interval
             player.channel_mastery_snapshot = triggers_mastery
             player.channel_docj_snapshot = is_dance_of_chiji
+            if not log_events:
+                return 0.0, None
             return 0.0, {'base': 0, 'modifiers': [], 'crit_sources': [], 'extra_events': extra_damage_details}
         else:
             # 4. Pass triggers_mastery as the override
+            prof = player.profiler
+            if prof is not None:
+                damage_started = perf_counter()
             base_dmg, breakdown = self.calculate_tick_damage(player, mastery_override=triggers_mastery, use_expected_value=use_expected_value, force_crit=force_proc_glory)
+            if prof is not None:
+                prof.add('tick_damage', damage_started)
 
             total_damage = base_dmg + extra_damage
             if extra_damage_details:
@@ -448,6 +508,9 @@ class Spell:
         return damage_per_target * target_count
 
     def _calculate_flurry_strikes_damage(self, player, stacks, scale=1.0, use_expected_value=False):
+        prof = player.profiler
+        if prof is not None:
+            started = perf_counter()
         flurry_base = 0.6 * player.attack_power * player.agility * stacks * scale
         mitigation = player.get_physical_mitigation()
         flurry_base *= mitigation
@@ -462,7 +525,7 @@ class Spell:
         if use_expected_value:
              flurry_total = flurry_base * f_mod * (1 + crit_c * (crit_m - 1))
         else:
-             flurry_total = flurry_base * f_mod * (crit_m if random.random() < crit_c else 1.0)
+             flurry_total = flurry_base * f_mod * (crit_m if player.rng.flurry_strikes.random() < crit_c else 1.0)
 
         sob_total = 0.0
         if getattr(player, 'has_shado_over_battlefield', False):
@@ -475,7 +538,7 @@ class Spell:
             if use_expected_value:
                 sob_total = sob_base * sob_mod * player.target_count * sob_scale * (1 + crit_c * (crit_m - 1))
             else:
-                sob_total = sob_base * sob_mod * player.target_count * sob_scale * (crit_m if random.random() < crit_c else 1.0)
+                sob_total = sob_base * sob_mod * player.target_count * sob_scale * (crit_m if player.rng.flurry_strikes.random() < crit_c else 1.0)
 
         hi_total = 0.0
         if getattr(player, 'has_high_impact', False):
@@ -487,20 +550,23 @@ class Spell:
             if use_expected_value:
                  hi_total = hi_base * hi_mod * player.target_count * hi_scale * (1 + crit_c * (crit_m - 1))
             else:
-                 hi_total = hi_base * hi_mod * player.target_count * hi_scale * (crit_m if random.random() < crit_c else 1.0)
+                 hi_total = hi_base * hi_mod * player.target_count * hi_scale * (crit_m if player.rng.flurry_strikes.random() < crit_c else 1.0)
 
+        if prof is not None:
+            prof.add('proc.flurry_strikes', started)
         return flurry_total, sob_total, hi_total
 
     def _get_aoe_modifier(self, target_count, soft_cap):
-        if target_count <= soft_cap: return 1.0
-        return math.sqrt(soft_cap / float(target_count))
+        return soft_cap_scale(target_count, soft_cap)
 
     def calculate_tick_damage(self, player, mastery_override=None, tick_idx=0, use_expected_value=False, force_crit=False):
         is_rwk = (self.abbr == 'RSK' and getattr(player, 'rwk_ready', False))
-        current_ap_coeff = 1.7975 if is_rwk else self.tick_coeff
+        current_ap_coeff = RWK_COEFF if is_rwk else self.tick_coeff
 
         raw_base = current_ap_coeff * player.attack_power * player.agility
 
+        # Modifier/crit strings are only built for the 'full' detail level
+        full_detail = player.detail_level == 'full'
         modifiers = []
         crit_sources = []
         current_mult = 1.0
@@ -508,50 +574,48 @@ class Spell:
         if self.damage_type == 'Physical' and not is_rwk:
              mitigation = player.get_physical_mitigation()
              current_mult *= mitigation
-             modifiers.append(f"PhysicalDR: x{mitigation:.3f}")
+             if full_detail: modifiers.append(f"PhysicalDR: x{mitigation:.3f}")
 
         for name, val in self.modifiers:
             current_mult *= val
-            modifiers.append(f"{name}: x{val:.2f}")
+            if full_detail: modifiers.append(f"{name}: x{val:.2f}")
 
         if is_rwk:
-             rwk_bonus = min(0.30, 0.06 * player.target_count)
-             if rwk_bonus > 0:
-                 current_mult *= (1.0 + rwk_bonus)
-                 modifiers.append(f"RWK_Targets: x{1+rwk_bonus:.2f}")
+             rwk_mod = rwk_target_mult(player.target_count)
+             if rwk_mod != 1.0:
+                 current_mult *= rwk_mod
+                 if full_detail: modifiers.append(f"RWK_Targets: x{rwk_mod:.2f}")
 
         # [Momentum Boost] Haste scaling and Tick Ramp
         if self.haste_dmg_scaling:
              h_mod = 1.0 + player.haste
              current_mult *= h_mod
-             modifiers.append(f"MomentumHaste: x{h_mod:.2f}")
+             if full_detail: modifiers.append(f"MomentumHaste: x{h_mod:.2f}")
 
         if self.tick_dmg_ramp > 0.0:
              ramp_val = 1.0 + (self.tick_dmg_ramp * tick_idx)
              current_mult *= ramp_val
-             modifiers.append(f"MomentumRamp(Tick{tick_idx}): x{ramp_val:.2f}")
+             if full_detail: modifiers.append(f"MomentumRamp(Tick{tick_idx}): x{ramp_val:.2f}")
 
         if self.abbr == 'SCK' and getattr(player, 'channel_docj_snapshot', False):
              current_mult *= 2.0
-             modifiers.append("DanceOfChiJi: x2.00")
+             if full_detail: modifiers.append("DanceOfChiJi: x2.00")
 
         # Hidden Aura & Passive Auras
-        hidden_mod = 1.0
-        if self.abbr == 'RSK': hidden_mod *= 1.70
-        if self.abbr == 'SCK': hidden_mod *= 1.10
+        hidden_mod = hidden_aura(self.abbr)
         if hidden_mod != 1.0:
             current_mult *= hidden_mod
-            modifiers.append(f"HiddenAura: x{hidden_mod:.2f}")
+            if full_detail: modifiers.append(f"HiddenAura: x{hidden_mod:.2f}")
 
-        aura_mod = 1.04 if self.abbr in ['TP', 'BOK', 'RSK', 'SCK', 'FOF', 'WDP', 'SOTWL'] else 1.0
+        aura_mod = aura(self.abbr)
         if aura_mod != 1.0:
             current_mult *= aura_mod
-            modifiers.append(f"Aura: x{aura_mod:.2f}")
+            if full_detail: modifiers.append(f"Aura: x{aura_mod:.2f}")
 
         if getattr(player, 'has_hit_combo', False) and player.hit_combo_stacks > 0:
-            hc_mod = 1.0 + (player.hit_combo_stacks * 0.01)
+            hc_mod = hit_combo_mult(player.hit_combo_stacks)
             current_mult *= hc_mod
-            modifiers.append(f"HitCombo({player.hit_combo_stacks}): x{hc_mod:.2f}")
+            if full_detail: modifiers.append(f"HitCombo({player.hit_combo_stacks}): x{hc_mod:.2f}")
 
         # Mastery Logic Update
         apply_mastery = False
@@ -570,15 +634,15 @@ class Spell:
             if self.abbr == 'RSK' and getattr(player, 'has_sunfire_spiral', False):
                 m_mod = 1.0 + (player.mastery * 1.2)
             current_mult *= m_mod
-            modifiers.append(f"Mastery: x{m_mod:.2f}")
+            if full_detail: modifiers.append(f"Mastery: x{m_mod:.2f}")
 
         v_mod = 1.0 + player.versatility
         current_mult *= v_mod
-        modifiers.append(f"Versatility: x{v_mod:.2f}")
+        if full_detail: modifiers.append(f"Versatility: x{v_mod:.2f}")
 
         # Crit
         base_crit = player.crit
-        crit_sources.append(f"PlayerStat: {base_crit*100:.1f}%")
+        if full_detail: crit_sources.append(f"PlayerStat: {base_crit*100:.1f}%")
 
         bonus_crit = self.bonus_crit_chance
         for name, val in self.crit_modifiers: bonus_crit += val
@@ -600,7 +664,7 @@ class Spell:
         snapshot_dmg = expected_dmg
 
         if not use_expected_value:
-             is_crit_hit = random.random() < final_crit_chance
+             is_crit_hit = player.rng.crit.random() < final_crit_chance
              if force_crit: is_crit_hit = True
              snapshot_dmg = (raw_base * current_mult) * (crit_mult if is_crit_hit else 1.0)
 
@@ -612,12 +676,13 @@ class Spell:
         if self.abbr == 'RSK' and getattr(player, 'has_skyfire_heel', False) and player.target_count > 1:
              total_dmg += snapshot_dmg * 0.10 * min(player.target_count - 1, 5)
 
+        if player.detail_level == 'none':
+            return total_dmg, None
+
         # Detailed Breakdown
         breakdown = {
             "Raw Base": raw_base, # Capitalized as per task hint, though 'Raw Base' is usually display name
             "raw_base": raw_base, # Keep lower for compatibility
-            "components": f"Coeff {current_ap_coeff:.3f} * AP {player.attack_power} * Agi {player.agility}",
-            "modifiers": modifiers,
             "Expected": expected_dmg,
             "expected_dmg": expected_dmg,
             "Snapshot": snapshot_dmg,
@@ -625,24 +690,18 @@ class Spell:
             "is_crit": is_crit_hit,
             "final_crit": final_crit_chance,
             "crit_mult": crit_mult,
-            "crit_sources": crit_sources,
             "aoe_type": aoe_type,
             "targets": player.target_count,
             "total_dmg_after_aoe": total_dmg,
             "ev_mode": use_expected_value
         }
+        if full_detail:
+            breakdown["components"] = f"Coeff {current_ap_coeff:.3f} * AP {player.attack_power} * Agi {player.agility}"
+            breakdown["modifiers"] = modifiers
+            breakdown["crit_sources"] = crit_sources
 
         return total_dmg, breakdown
 
-    def tick_cd(self, dt, player=None):
-        rate = player.cooldown_recovery_rate if player else 1.0
-        if self.charges < self.max_charges:
-            self.current_cd = max(0, self.current_cd - dt * rate)
-            if self.current_cd == 0:
-                self.charges += 1
-                if self.charges < self.max_charges:
-                    self.current_cd = self.base_cd
-
 class CelestialConduit(Spell):
     def is_usable(self, player, other_spells):
         return super().is_usable(player) and player.can_cast_conduit
@@ -665,17 +724,21 @@ class CelestialConduit(Spell):
         if use_expected_value:
              total = base * mult * player.target_count * scale * (1 + crit * (crit_m - 1))
         else:
-             is_crit = random.random() < crit
+             is_crit = player.rng.crit.random() < crit
              total = base * mult * player.target_count * scale * (crit_m if is_crit else 1.0)
 
+        if player.detail_level == 'none':
+            return total, None
+
         breakdown = {
             'Raw Base': base,
             'raw_base': base,
-            'components': f"5.0 * 2.75 * AP {player.attack_power} * Agi {player.agility}",
-            'modifiers': [f"Scale: {scale:.2f}"],
             'targets': player.target_count,
             'total_dmg_after_aoe': total
         }
+        if player.detail_level == 'full':
+            breakdown['components'] = f"5.0 * 2.75 * AP {player.attack_power} * Agi {player.agility}"
+            breakdown['modifiers'] = [f"Scale: {scale:.2f}"]
         return total, breakdown
 
 class TouchOfDeath(Spell):
@@ -691,14 +754,18 @@ class TouchOfDeath(Spell):
 
         final_dmg = base_dmg * current_mult
 
+        if player.detail_level == 'none':
+            return final_dmg, None
+
         breakdown = {
             'Raw Base': base_dmg,
             'raw_base': base_dmg,
-            'components': "35% Max HP",
-            'modifiers': [f"Mult: x{current_mult:.2f}"],
             'final_crit': 0.0,
             'total_dmg_after_aoe': final_dmg
         }
+        if player.detail_level == 'full':
+            breakdown['components'] = "35% Max HP"
+            breakdown['modifiers'] = [f"Mult: x{current_mult:.2f}"]
         return final_dmg, breakdown
 
 class SpellWDP(Spell):
@@ -729,6 +796,8 @@ class SpellBook:
             'ToD': TouchOfDeath('ToD', 0.0, name="Touch of Death", cd=90.0, energy=0, chi_gen=3, req_talent=False, category='Major Cooldown', aoe_type='single'),
             'Conduit': CelestialConduit('Conduit', 0.0, name="Celestial Conduit", cd=0.0, is_channeled=True, ticks=4, cast_time=4.0, category='Major Cooldown', damage_type='Nature', req_talent=True)
         }
+        self.clock = CooldownClock()
+        for s in self.spells.values(): s.clock = self.clock
         self.spells['TP'].triggers_combat_wisdom = True
         self.spells['BOK'].triggers_sharp_reflexes = True
         self.active_talents = active_talents if active_talents else []
@@ -739,5 +808,42 @@ class SpellBook:
         self.player = player
         self.talent_manager.apply_talents(self.active_talents, player, self)
 
+    def snapshot(self):
+        """Capture clock time and every spell's charge state as a flat tuple.
+
+        Talent-derived spell parameters never change after apply_talents(), so
+        charges and ready-at timestamps are the only per-spell runtime state.
+        """
+        state = [self.clock.now]
+        for spell in self.spells.values():
+            state.append(spell._charges)
+            state.append(spell._ready_at)
+        return tuple(state)
+
+    def restore(self, state):
+        """Roll this spell book back to a tuple produced by its own snapshot()."""
+        self.clock.now = state[0]
+        i = 1
+        for spell in self.spells.values():
+            spell._charges = state[i]
+            spell._ready_at = state[i + 1]
+            i += 2
+
     def tick(self, dt):
-        for s in self.spells.values(): s.tick_cd(dt, player=self.player)
+        """Recover cooldowns over a ``dt``-second step.
+
+        Spells read their cooldowns off the shared clock, so ticking is just
+        moving it forward. With a player attached the clock follows
+        ``player.cooldown_clock``, which ``advance_time`` moves at the cooldown
+        recovery rate: call ``player.advance_time(dt)`` first and ``dt`` is not
+        used. If the player clock has not moved past the book's, both advance
+        by ``dt`` at the player's current recovery rate.
+        """
+        player = self.player
+        if player is None:
+            self.clock.now += dt
+        elif player.cooldown_clock > self.clock.now:
+            self.clock.now = player.cooldown_clock
+        else:
+            self.clock.now += dt * player.cooldown_recovery_rate
+            player.cooldown_clock = self.clock.now
@@ -0,0 +1,81 @@
+"""Compiled talent profiles: talent application done once, restored per episode."""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
+
+from ppmonk.core.damage_window import DamageWindow
+from ppmonk.core.player import PlayerState
+from ppmonk.core.resources import LazyResource
+from ppmonk.core.rng import CombatRng
+from ppmonk.core.spell_book import CooldownClock, SpellBook
+
+
+class TalentProfile:
+    """Frozen player flags and spell parameters produced by a talent build.
+
+    Building a ``PlayerState`` and ``SpellBook`` and replaying every talent's
+    ``apply()`` is the expensive part of an environment reset. A profile does
+    it once and then hands out fresh copies by restoring the captured
+    attribute dictionaries.
+    """
+
+    def __init__(self, talents: Iterable[str], player_kwargs: Optional[Dict] = None) -> None:
+        self.talents = tuple(talents)
+        self.player_kwargs = dict(player_kwargs or {})
+
+        player = PlayerState(**self.player_kwargs)
+        book = SpellBook(talents=list(self.talents))
+        book.apply_talents(player)
+
+        self._player_state = dict(player.__dict__)
+        self._book_state = dict(book.__dict__)
+        self._spell_states = {key: (type(spell), dict(spell.__dict__)) for key, spell in book.spells.items()}
+
+    def instantiate(self) -> Tuple[PlayerState, SpellBook]:
+        """Return a fresh ``(player, spell_book)`` pair with the talents already applied."""
+
+        player = PlayerState.__new__(PlayerState)
+        player.__dict__.update(self._player_state)
+        # Mutable per-episode state must not be shared with the template
+        energy = self._player_state['_energy']
+        player._energy = LazyResource(energy.value, energy.maximum, energy.rate, energy.timestamp)
+        player.recent_damage_window = DamageWindow(self._player_state['recent_damage_window'].window)
+        player.rng = CombatRng()
+
+        clock = CooldownClock()
+        spells = {}
+        for key, (spell_cls, state) in self._spell_states.items():
+            spell = spell_cls.__new__(spell_cls)
+            spell.__dict__.update(state)
+            spell.modifiers = list(spell.modifiers)
+            spell.crit_modifiers = list(spell.crit_modifiers)
+            spell.clock = clock
+            spells[key] = spell
+
+        book = SpellBook.__new__(SpellBook)
+        book.__dict__.update(self._book_state)
+        book.active_talents = list(book.active_talents)
+        book.clock = clock
+        book.spells = spells
+        book.player = player
+        return player, book
+
+
+@lru_cache(maxsize=64)
+def _compile_profile(talent_key: Tuple[str, ...], kwargs_key: Tuple) -> TalentProfile:
+    return TalentProfile(talent_key, dict(kwargs_key))
+
+
+def get_talent_profile(talents: Optional[Iterable[str]], player_kwargs: Optional[Dict] = None) -> TalentProfile:
+    """Return the cached profile for a talent list and player configuration.
+
+    Talents are keyed in application order (duplicates dropped, as SpellBook
+    does) because several of them are not commutative, e.g. Spiritual Focus
+    vs. Efficient Training on Zenith's cooldown.
+    """
+
+    talent_key = tuple(dict.fromkeys(talents or []))
+    kwargs_key = tuple(sorted((player_kwargs or {}).items()))
+    return _compile_profile(talent_key, kwargs_key)
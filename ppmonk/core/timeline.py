@@ -1,53 +1,157 @@
-"""Timeline utilities extracted from the original run_monk_ai script."""
+"""Encounter timelines: fight length, downtime, damage-amp and target-count phases.
+
+The four 20s training scenarios of the original run_monk_ai script are
+built-in (``Timeline(0..3)``); longer encounters are described in
+``configs/timelines.yaml`` and loaded with ``Timeline.from_yaml``.
+
+Every phase edge goes into one sorted boundary list, so the fight is a
+sequence of segments with constant status. ``get_status`` bisects into that
+list and remembers the last segment, which makes the forward-moving lookups
+of the event engine (``get_status``, ``time_to_next_change``) O(1).
+"""
+
+import math
+import os
+from bisect import bisect_right
+from functools import lru_cache
 
 import numpy as np
 
+DEFAULT_TIMELINES_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'configs', 'timelines.yaml')
+MAP_SLOTS = 20
+
+SCENARIOS = (
+    # 0: 20s Patchwerk (纯木桩)
+    {'name': 'Patchwerk', 'duration': 20.0},
+    # 1: Fixed Downtime (8s打 - 4s停 - 8s打)
+    {'name': 'Fixed Downtime', 'duration': 20.0, 'downtime': [{'start': 8.0, 'end': 12.0}]},
+    # 2: Probabilistic Downtime (中间4s有20%概率停手，否则继续打)
+    {'name': 'Probabilistic Downtime', 'duration': 20.0, 'downtime': [{'start': 8.0, 'end': 12.0, 'chance': 0.2}]},
+    # 3: Execute Phase (最后4s 伤害提高200% -> 3.0x)
+    {'name': 'Execute', 'duration': 20.0, 'damage_amp': [{'start': 16.0, 'end': 20.0, 'multiplier': 3.0}]},
+)
+
+
+def _windows(spec, key, duration, value_key=None, default=None):
+    windows = []
+    for entry in spec.get(key) or ():
+        start = float(entry['start'])
+        end = min(float(entry.get('end', duration)), duration)
+        if start < 0.0 or end <= start:
+            raise ValueError(f"Invalid {key} window [{start}, {end}) in timeline {spec.get('name')!r}")
+        value = entry.get(value_key, default) if value_key else None
+        windows.append((start, end, value))
+    return windows
+
 
 class Timeline:
-    def __init__(self, scenario_id):
-        """
-        0: 20s Patchwerk (纯木桩)
-        1: Fixed Downtime (8s打 - 4s停 - 8s打)
-        2: Probabilistic Downtime (中间4s有20%概率停手，否则继续打)
-        3: Execute Phase (最后4s 伤害提高200% -> 3.0x)
+    def __init__(self, scenario_id=0, spec=None):
+        """Build a built-in scenario (``scenario_id`` 0-3) or a timeline from a ``spec`` dict.
+
+        A spec has a ``duration`` and optional ``downtime`` (with ``chance``,
+        rolled on every reset), ``damage_amp`` (``multiplier``, overlapping
+        windows stack) and ``targets`` (``count``) window lists. Custom
+        timelines have no ``scenario_id`` unless the spec sets ``scenario``.
         """
-        self.scenario_id = scenario_id
-        self.duration = 20.0
-        self.burst_start = -1.0
-        if scenario_id == 3:
-            self.burst_start = 16.0
-
-        self.global_map = np.zeros(20, dtype=np.float32)
-        for i in range(20):
-            t = float(i)
-            mod = 1.0
-            if scenario_id == 3 and t >= self.burst_start:
-                mod = 3.0
-            self.global_map[i] = mod / 3.0
-
-        self.is_random_downtime_active = False
-
-    def reset(self):
-        if self.scenario_id == 2:
-            self.is_random_downtime_active = np.random.rand() < 0.2
+        if spec is None:
+            spec = SCENARIOS[scenario_id]
         else:
-            self.is_random_downtime_active = False
+            scenario_id = spec.get('scenario')
+            if scenario_id is not None and (not isinstance(scenario_id, int) or scenario_id not in range(len(SCENARIOS))):
+                raise ValueError(f"Timeline {spec.get('name')!r} has an unknown scenario {scenario_id!r}")
+        self.scenario_id = scenario_id
+        self.name = spec.get('name', f'scenario {scenario_id}')
+        self.duration = float(spec.get('duration', 20.0))
+        if self.duration <= 0.0:
+            raise ValueError(f"Timeline {self.name!r} needs a positive duration")
+
+        self.downtime = _windows(spec, 'downtime', self.duration, 'chance', 1.0)
+        self.damage_amp = _windows(spec, 'damage_amp', self.duration, 'multiplier', 1.0)
+        self.targets = _windows(spec, 'targets', self.duration, 'count')
+
+        edges = {0.0, self.duration}
+        for start, end, _ in (*self.downtime, *self.damage_amp, *self.targets):
+            edges.update((start, end))
+        self.boundaries = sorted(edges)
+        mids = [(lo + hi) / 2.0 for lo, hi in zip(self.boundaries[:-1], self.boundaries[1:])]
+
+        # Static per-segment values; uptime depends on the downtime rolls made in reset()
+        self._mods = [math.prod((m for start, end, m in self.damage_amp if start <= t < end), start=1.0) for t in mids]
+        self._target_counts = [next((int(c) for start, end, c in reversed(self.targets) if start <= t < end), None)
+                               for t in mids]
+        self._mids = mids
+        self._cursor = 0
+        self.active_downtime = [chance >= 1.0 for _, _, chance in self.downtime]
+        self._build_uptime()
+
+        amp_starts = [start for start, _, m in self.damage_amp if m > 1.0]
+        self.burst_start = min(amp_starts) if amp_starts else -1.0
+
+        self.global_map = np.zeros(MAP_SLOTS, dtype=np.float32)
+        for i in range(MAP_SLOTS):
+            t = i * self.duration / MAP_SLOTS
+            self.global_map[i] = self._mods[self.segment_index(t)] / 3.0
+
+    @classmethod
+    def from_yaml(cls, name, path=None):
+        """Build the timeline ``name`` from a YAML file (``configs/timelines.yaml`` by default)."""
+        specs = load_timeline_specs(path or DEFAULT_TIMELINES_PATH)
+        if name not in specs:
+            raise KeyError(f"Unknown timeline {name!r}; available: {', '.join(specs)}")
+        return cls(spec={'name': name, **specs[name]})
+
+    @property
+    def is_random_downtime_active(self):
+        return any(active for (_, _, chance), active in zip(self.downtime, self.active_downtime) if chance < 1.0)
+
+    def _build_uptime(self):
+        windows = [(start, end) for (start, end, _), active in zip(self.downtime, self.active_downtime) if active]
+        self._uptime = [not any(start <= t < end for start, end in windows) for t in self._mids]
+
+    def reset(self, rng=None):
+        """Roll the optional downtime windows with ``rng.random()`` (numpy's global RNG if omitted)."""
+        draw = (rng or np.random).random
+        self.active_downtime = [chance >= 1.0 or draw() < chance for _, _, chance in self.downtime]
+        self._build_uptime()
+        self._cursor = 0
+
+    def segment_index(self, current_time):
+        """Index of the constant-status segment containing ``current_time``."""
+        b = self.boundaries
+        i = self._cursor
+        if not b[i] <= current_time < b[i + 1]:
+            i = min(max(bisect_right(b, current_time) - 1, 0), len(b) - 2)
+            self._cursor = i
+        return i
+
+    def next_boundary(self, current_time):
+        """Time of the next phase boundary (``inf`` once the fight is over)."""
+        if current_time >= self.duration:
+            return math.inf
+        return self.boundaries[self.segment_index(current_time) + 1]
+
+    def time_to_next_change(self, current_time):
+        """Seconds until the next phase boundary (``inf`` once the fight is over)."""
+        return self.next_boundary(current_time) - current_time
+
+    def get_target_count(self, current_time):
+        """Target count forced by a ``targets`` phase, or None outside of one."""
+        if current_time >= self.duration:
+            return None
+        return self._target_counts[self.segment_index(current_time)]
 
     def get_status(self, current_time):
         """返回: (is_uptime, damage_modifier, is_done)"""
-        is_uptime = True
-        dmg_mod = 1.0
-        is_done = current_time >= self.duration
-
-        if is_done:
-            return is_uptime, dmg_mod, is_done
-
-        if self.scenario_id == 1 and 8.0 <= current_time < 12.0:
-            is_uptime = False
-        elif self.scenario_id == 2 and 8.0 <= current_time < 12.0:
-            if self.is_random_downtime_active:
-                is_uptime = False
-        elif self.scenario_id == 3 and current_time >= 16.0:
-            dmg_mod = 3.0
-
-        return is_uptime, dmg_mod, is_done
+        if current_time >= self.duration:
+            return True, 1.0, True
+        i = self.segment_index(current_time)
+        return self._uptime[i], self._mods[i], False
+
+
+@lru_cache(maxsize=8)
+def load_timeline_specs(path):
+    """Parse the ``timelines`` mapping of a YAML file (cached per path)."""
+    from ppmonk.utils.loader import load_yaml
+
+    data = load_yaml(path) or {}
+    return data.get('timelines') or {}
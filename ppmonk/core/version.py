@@ -0,0 +1,4 @@
+"""Version of the simulation rules, part of every cached result key."""
+
+# Bump whenever a change alters simulated damage, so cached scores and policies are not reused
+ENGINE_VERSION = 2
@@ -1,5 +1,13 @@
 """Reinforcement learning environments for PPMonk."""
 
-from .monk_env import MonkEnv
+from typing import TYPE_CHECKING
+
+from ppmonk.utils.lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .monk_env import MonkEnv
 
 __all__ = ["MonkEnv"]
+
+# gymnasium is only imported once an env is actually requested
+__getattr__, __dir__ = lazy_exports(__name__, {"MonkEnv": ".monk_env:MonkEnv"})
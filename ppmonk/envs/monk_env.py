@@ -1,13 +1,34 @@
+from bisect import bisect_right
+from time import perf_counter
+
 import gymnasium as gym
 from gymnasium import spaces
 import numpy as np
-from ppmonk.core.player import PlayerState
-from ppmonk.core.spell_book import SpellBook
+from ppmonk.core.rng import CombatRng
+from ppmonk.core.talent_profile import get_talent_profile
 from ppmonk.core.timeline import Timeline
 
+# Observation layout: energy, chi, gcd, 6 cooldowns, time, uptime, modifier,
+# scenario one-hot (4), time to burst, last action, then the 20-slot timeline map
+OBS_CD_KEYS = ('RSK', 'FOF', 'WDP', 'SOTWL', 'SW', 'Zenith')
+OBS_CDS = 3
+OBS_TIME = OBS_CDS + len(OBS_CD_KEYS)
+OBS_SCENARIO = OBS_TIME + 3
+OBS_BURST = OBS_SCENARIO + 4
+OBS_MAP = OBS_BURST + 2
+
 
 class MonkEnv(gym.Env):
-    def __init__(self, seed_offset=0, current_talents=None, player_kwargs=None):
+    """Windwalker combat as a gymnasium env with 10 actions and a 38-float observation.
+
+    ``reset`` and ``step`` return a fresh copy of the observation, so it is
+    safe to keep (e.g. as ``terminal_observation``). The vec envs set
+    ``copy_obs = False`` and get the env's own buffer instead, which the
+    next step or reset overwrites; ``last_obs`` is always that buffer.
+    """
+
+    def __init__(self, seed_offset=0, current_talents=None, player_kwargs=None, detail_level=None, timeline=None,
+                 profiler=None):
         # Obs: 18 (base) + 20 (map) = 38
         self.observation_space = spaces.Box(low=0, high=1, shape=(38,), dtype=np.float32)
         # [修复] Action Space 增加到 10 (0-9), 加入 Zenith
@@ -17,37 +38,78 @@ class MonkEnv(gym.Env):
             5: 'FOF', 6: 'WDP', 7: 'SOTWL', 8: 'SW', 9: 'Zenith'
         }
         self.spell_keys = list(self.action_map.values())[1:]  # TP ~ Zenith
+        self.action_index = {v: k for k, v in self.action_map.items()}
         self.scenario = 0
         self.training_mode = True
         self.rng = np.random.default_rng(seed_offset)
+        # Proc and crit rolls; reseeded from self.rng on every reset so a seed fixes the whole episode
+        self.combat_rng = CombatRng(seed_offset)
 
         self.current_talents = current_talents if current_talents else []
         self.player_kwargs = player_kwargs if player_kwargs else {}
+        # None: no logs/breakdowns while training, full detail for evaluation episodes
+        self.detail_level = detail_level
+        # None: a random built-in 20s scenario per episode. Otherwise a scenario id,
+        # a timeline name from configs/timelines.yaml or a Timeline instance
+        self.timeline_spec = timeline
+        # Optional ppmonk.core.profiler.Profiler, handed to every player this env builds
+        self.profiler = profiler
 
         # [新] 伤害统计
         self.damage_meter = {}
 
+        # Persistent observation; _get_obs rewrites the dynamic slots in place
+        self._obs = np.zeros(self.observation_space.shape, dtype=np.float32)
+        # False: reset/step return self._obs itself, for callers that copy it out right away
+        self.copy_obs = True
+        self._obs_cd_spells = []
+        self._masks = np.zeros(self.action_space.n, dtype=bool)
+        self._mask_key = None
+
     def reset(self, seed=None, options=None):
         super().reset(seed=seed)
         if seed is not None: self.rng = np.random.default_rng(seed)
+        self.combat_rng.reseed(int(self.rng.integers(2 ** 63)))
 
-        self.player = PlayerState(**self.player_kwargs)
-        self.book = SpellBook(talents=self.current_talents)
-        self.book.apply_talents(self.player)
+        detail_level = self.detail_level or ('none' if self.training_mode else 'full')
+        # Talents are applied once per (build, stats) and restored from the cached profile
+        profile = get_talent_profile(self.current_talents, {'event_driven': True, 'detail_level': detail_level, **self.player_kwargs})
+        self.player, self.book = profile.instantiate()
+        self.player.profiler = self.profiler
+        self.player.rng = self.combat_rng
+        # Target-count phases override the configured count while they last
+        self._default_target_count = self.player.target_count
 
         # 重置伤害统计
         self.damage_meter = {}
 
         if options and 'timeline' in options:
-            scen_id = options['timeline']
+            timeline = options['timeline']
+        elif self.timeline_spec is not None:
+            timeline = self.timeline_spec
         else:
-            scen_id = self.rng.integers(0, 4)
-        self.scenario = scen_id
-        self.timeline = Timeline(scen_id)
-        self.timeline.reset()
+            timeline = self.rng.integers(0, 4)
+        if isinstance(timeline, str):
+            timeline = Timeline.from_yaml(timeline)
+        elif not isinstance(timeline, Timeline):
+            timeline = Timeline(int(timeline))
+        self.timeline = timeline
+        self.scenario = timeline.scenario_id
+        self.timeline.reset(self.combat_rng.downtime)
+
+        # Static slots: scenario one-hot and the timeline damage map only change on reset
+        self._obs.fill(0.0)
+        if self.scenario is not None:
+            self._obs[OBS_SCENARIO + self.scenario] = 1.0
+        self._obs[OBS_MAP:] = self.timeline.global_map
+        self._obs_cd_spells = [self.book.spells.get(k) for k in OBS_CD_KEYS]
+        self._mask_spells = [self.book.spells[k] for k in self.spell_keys]
+        self._mask_energy_costs = sorted({spell.energy_cost for spell in self._mask_spells})
+        self._mask_key = None
 
         if self.training_mode and (options is None):
-            self.time = self.rng.uniform(0.0, 58.0)
+            # Random start anywhere but the last 2s of the fight
+            self.time = self.rng.uniform(0.0, max(0.0, self.timeline.duration - 2.0))
             self.player.energy = self.rng.uniform(0.0, self.player.max_energy)
             self.player.chi = self.rng.integers(0, 7)
         else:
@@ -55,59 +117,100 @@ class MonkEnv(gym.Env):
             self.player.energy = self.player.max_energy
             self.player.chi = self.player.max_chi
 
-        return self._get_obs(), {}
+        return self._returned_obs(), {}
+
+    def _returned_obs(self):
+        obs = self._get_obs()
+        return obs.copy() if self.copy_obs else obs
 
     def _get_obs(self):
+        """Refresh the dynamic slots of the observation buffer and return it.
+
+        The same array is returned on every call and overwritten by the next
+        step or reset; copy it to keep an earlier observation.
+        """
+        prof = self.profiler
+        if prof is not None:
+            started = perf_counter()
+        obs = self._obs
+        player = self.player
         uptime, mod, _ = self.timeline.get_status(self.time)
+        duration = self.timeline.duration
         time_to_burst = 0.0
         if self.timeline.burst_start > 0 and self.time < self.timeline.burst_start:
-            time_to_burst = (self.timeline.burst_start - self.time) / 60.0
-
-        norm_energy = self.player.energy / self.player.max_energy
-        norm_chi = self.player.chi / 6.0
-        norm_gcd = self.player.gcd_remaining / 1.5
-        norm_time = self.time / 60.0
+            time_to_burst = (self.timeline.burst_start - self.time) / duration
 
+        obs[0] = player.energy / player.max_energy
+        obs[1] = player.chi / 6.0
+        obs[2] = player.gcd_remaining / 1.5
         # [修复] Zenith 现在在 SpellBook 里了，不会报错
-        cds_to_track = ['RSK', 'FOF', 'WDP', 'SOTWL', 'SW', 'Zenith']
-        norm_cds = []
-        for k in cds_to_track:
-            if k in self.book.spells:
-                norm_cds.append(self.book.spells[k].current_cd / 30.0)
-            else:
-                norm_cds.append(0.0)  # 防止万一没了
-
-        scen_onehot = [0.0, 0.0, 0.0, 0.0]
-        scen_onehot[self.scenario] = 1.0
-        last_action_val = 0.0
-        if self.player.last_spell_name:
-            for k, v in self.action_map.items():
-                if v == self.player.last_spell_name:
-                    last_action_val = k / 10.0  # 归一化
-                    break
+        for slot, spell in enumerate(self._obs_cd_spells, OBS_CDS):
+            obs[slot] = spell.current_cd / 30.0 if spell is not None else 0.0  # 防止万一没了
+        obs[OBS_TIME] = self.time / duration
+        obs[OBS_TIME + 1] = 1.0 if uptime else 0.0
+        obs[OBS_TIME + 2] = mod / 3.0
+        obs[OBS_BURST] = time_to_burst
+        obs[OBS_BURST + 1] = self.action_index.get(player.last_spell_name, 0) / 10.0  # 归一化
+        if prof is not None:
+            prof.add('obs_encoding', started)
+        return obs
 
-        obs = [norm_energy, norm_chi, norm_gcd, *norm_cds, norm_time, 1.0 if uptime else 0.0, mod / 3.0, *scen_onehot,
-               time_to_burst, last_action_val]
-        return np.concatenate((obs, self.timeline.global_map), axis=0).astype(np.float32)
+    @property
+    def last_obs(self):
+        """Observation returned by the latest reset or step (the shared buffer, not a copy)."""
+        return self._obs
 
     def action_masks(self):
-        if self.time >= 60.0: return [False] * 10
-        masks = [True] * 10
+        """Legal actions as a bool array, recomputed only when its inputs change.
 
-        for i, key in enumerate(self.spell_keys):
-            spell = self.book.spells[key]
-            is_usable = False
-            if key == 'WDP':
-                is_usable = spell.is_usable(self.player, self.book.spells)
-            else:
-                is_usable = spell.is_usable(self.player)
-            if spell.abbr == self.player.last_spell_name:
-                is_usable = False
-            masks[i + 1] = is_usable
+        ``Spell.is_usable`` depends on synced charges, chi, which energy cost
+        thresholds are met, the free-cast procs, Zenith and ``last_spell_name``;
+        while those are unchanged the cached array is returned as is. The array
+        is owned by the env and updated in place.
+        """
+        prof = self.profiler
+        if prof is None:
+            return self._action_masks()
+        started = perf_counter()
+        masks = self._action_masks()
+        prof.add('action_masks', started)
+        return masks
+
+    def _action_masks(self):
+        player = self.player
+        spells = self._mask_spells
+        for spell in spells:
+            spell._sync_charges()
+        key = (self.time >= self.timeline.duration, player.chi, bisect_right(self._mask_energy_costs, player.energy),
+               player.last_spell_name, player.combo_breaker_stacks > 0, player.dance_of_chiji_stacks > 0,
+               player.zenith_active, *[spell._charges for spell in spells])
+        if key == self._mask_key:
+            return self._masks
+        self._mask_key = key
 
+        masks = self._masks
+        if key[0]:
+            masks.fill(False)
+            return masks
+        masks[0] = True
+        other_spells = self.book.spells
+        for i, spell in enumerate(spells, 1):
+            masks[i] = spell.abbr != player.last_spell_name and spell.is_usable(player, other_spells)
         return masks
 
     def step(self, action_idx):
+        prof = self.profiler
+        if prof is None:
+            return self._step(action_idx)
+        started = perf_counter()
+        result = self._step(action_idx)
+        prof.add('env_step', started)
+        if result[2]:
+            prof.end_episode()
+        return result
+
+    def _step(self, action_idx):
+        prof = self.profiler
         total_damage = 0
         time_to_wait = 0.0
         log_details = ""
@@ -117,7 +220,8 @@ class MonkEnv(gym.Env):
         if action_idx > 0:
             key = self.action_map[action_idx]
             spell = self.book.spells[key]
-            if spell.current_cd > 0:
+            # Multi-charge spells (Zenith) are castable while the next charge recharges
+            if spell.charges < 1:
                 time_to_wait = max(time_to_wait, spell.current_cd)
         remaining_time = max(0.0, self.timeline.duration - self.time)
         time_to_wait = min(time_to_wait, remaining_time)
@@ -129,9 +233,15 @@ class MonkEnv(gym.Env):
         if action_idx > 0:
             key = self.action_map[action_idx]
             spell = self.book.spells[key]
-            if spell.current_cd > 0.01:
-                return self._get_obs(), -10.0, False, False, {'damage': 0, 'log_details': "", 'auto_attack_logs': []}
+            if spell.charges < 1 and spell.current_cd > 0.01:
+                done = self.time >= self.timeline.duration
+                return self._returned_obs(), -10.0, done, False, {'damage': 0, 'log_details': "", 'auto_attack_logs': []}
+            self._sync_target_count()
+            if prof is not None:
+                cast_started = perf_counter()
             dmg, log_details = spell.cast(self.player, other_spells=self.book.spells, damage_meter=self.damage_meter)
+            if prof is not None:
+                prof.add('cast', cast_started)
             _, current_mod, _ = self.timeline.get_status(self.time)
             scaled_dmg = dmg * current_mod
             total_damage += scaled_dmg
@@ -148,15 +258,48 @@ class MonkEnv(gym.Env):
             dmg, logs = self._advance_time_with_mod(actual_duration)
             total_damage += dmg
             auto_attack_logs.extend(logs)
-        done = self.time >= 60.0
+        done = self.time >= self.timeline.duration
         reward = total_damage
-        return self._get_obs(), reward, done, False, {'damage': total_damage, 'log_details': log_details, 'auto_attack_logs': auto_attack_logs}
+        return self._returned_obs(), reward, done, False, {'damage': total_damage, 'log_details': log_details, 'auto_attack_logs': auto_attack_logs}
+
+    def _sync_target_count(self):
+        targets = self.timeline.get_target_count(self.time)
+        self.player.target_count = self._default_target_count if targets is None else targets
 
     def _advance_time_with_mod(self, duration):
+        """Advance ``duration`` seconds, split at every timeline phase boundary.
+
+        Each segment is one ``player.advance_time`` call scaled by that
+        segment's damage modifier and played at its target count, so a channel
+        crossing the execute boundary is scaled correctly at any step size.
+        """
         total_damage = 0
-        _, mod, _ = self.timeline.get_status(self.time)
-        dmg, auto_attack_logs = self.player.advance_time(duration, damage_meter=self.damage_meter)
-        self.book.tick(duration)
-        total_damage += dmg * mod
-        self.time += duration
-        return total_damage, auto_attack_logs
+        auto_attack_logs = []
+        end = self.time + duration
+        while True:
+            stop = min(end, self.timeline.next_boundary(self.time))
+            segment = stop - self.time
+            _, mod, _ = self.timeline.get_status(self.time)
+            self._sync_target_count()
+            dmg, logs = self.player.advance_time(segment, damage_meter=self.damage_meter)
+            if self.profiler is None:
+                self.book.tick(segment)
+            else:
+                started = perf_counter()
+                self.book.tick(segment)
+                self.profiler.add('spellbook_tick', started)
+            total_damage += dmg * mod
+            auto_attack_logs.extend(logs)
+            self.time = stop
+            if stop >= end:
+                return total_damage, auto_attack_logs
+
+
+def batch_action_masks(envs, out=None):
+    """Stack the action masks of ``envs`` into ``out`` (allocated when omitted)."""
+
+    if out is None:
+        out = np.empty((len(envs), envs[0].action_space.n), dtype=bool)
+    for i, env in enumerate(envs):
+        out[i] = env.action_masks()
+    return out
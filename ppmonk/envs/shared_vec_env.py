@@ -0,0 +1,311 @@
+"""Multi-process MonkEnv VecEnv that exchanges batches through shared memory."""
+
+from __future__ import annotations
+
+import multiprocessing as mp
+import os
+import threading
+import traceback
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from stable_baselines3.common.vec_env import VecEnv
+
+from ppmonk.envs.monk_env import MonkEnv
+
+_STEP, _RESET, _CALL, _CLOSE = range(4)
+
+
+class _SharedArrays:
+    """Named numpy arrays backed by ``multiprocessing.shared_memory`` blocks."""
+
+    def __init__(self, layout: Dict[str, Tuple[tuple, Any]], names: Optional[Dict[str, str]] = None) -> None:
+        self.blocks = {}
+        self.arrays = {}
+        for key, (shape, dtype) in layout.items():
+            size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+            if names is None:
+                block = shared_memory.SharedMemory(create=True, size=size)
+            else:
+                block = shared_memory.SharedMemory(name=names[key])
+            self.blocks[key] = block
+            self.arrays[key] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+            if names is None:
+                self.arrays[key].fill(0)
+
+    @property
+    def names(self) -> Dict[str, str]:
+        return {key: block.name for key, block in self.blocks.items()}
+
+    def close(self, unlink: bool = False) -> None:
+        # Views must be dropped before the mapping can be closed
+        self.arrays.clear()
+        for block in self.blocks.values():
+            block.close()
+            if unlink:
+                block.unlink()
+        self.blocks.clear()
+
+
+def _worker(worker_idx, start, stop, layout, names, barrier, conn, seed, training_mode, env_kwargs):
+    shared = _SharedArrays(layout, names)
+    a = shared.arrays
+    envs = [MonkEnv(seed_offset=seed + i, **env_kwargs) for i in range(start, stop)]
+    for env in envs:
+        env.training_mode = training_mode
+        env.copy_obs = False  # Observations are copied into shared memory right away
+
+    started = [False] * len(envs)
+
+    def refresh(local, obs):
+        a['obs'][start + local] = obs
+        a['masks'][start + local] = envs[local].action_masks()
+        started[local] = True
+
+    try:
+        while True:
+            barrier.wait()
+            command = int(a['control'][0])
+            if command == _CLOSE:
+                break
+            try:
+                if command == _STEP:
+                    infos = []
+                    for local, env in enumerate(envs):
+                        i = start + local
+                        obs, reward, terminated, truncated, info = env.step(int(a['actions'][i]))
+                        a['rews'][i] = reward
+                        a['dones'][i] = terminated or truncated
+                        a['truncated'][i] = truncated and not terminated
+                        if terminated or truncated:
+                            a['terminal_obs'][i] = obs
+                            obs, _ = env.reset()
+                        refresh(local, obs)
+                        infos.append(info)
+                    if a['control'][1]:
+                        conn.send(infos)
+                elif command == _RESET:
+                    seeds, options = conn.recv()
+                    reset_infos = []
+                    for local, env in enumerate(envs):
+                        maybe_options = {'options': options[local]} if options[local] else {}
+                        obs, reset_info = env.reset(seed=seeds[local], **maybe_options)
+                        refresh(local, obs)
+                        reset_infos.append(reset_info)
+                    conn.send(reset_infos)
+                elif command == _CALL:
+                    kind, name, args, kwargs, local_indices = conn.recv()
+                    results = []
+                    for local in local_indices:
+                        env = envs[local]
+                        if kind == 'get':
+                            results.append(getattr(env, name))
+                        elif kind == 'set':
+                            setattr(env, name, args[0])
+                            results.append(None)
+                        else:
+                            results.append(getattr(env, name)(*args, **kwargs))
+                        if started[local]:
+                            # Calls may change env state; keep the shared masks in sync
+                            a['masks'][start + local] = env.action_masks()
+                    conn.send(results)
+            except Exception:
+                a['errors'][worker_idx] = 1
+                conn.send(traceback.format_exc())
+            barrier.wait()
+    except threading.BrokenBarrierError:
+        # The main process aborted the barrier because a sibling worker died
+        pass
+    finally:
+        for env in envs:
+            env.close()
+        # close() clears shared.arrays, the dict ``a`` and ``refresh`` refer to
+        shared.close()
+
+
+class SharedMemoryMonkVecEnv(VecEnv):
+    """Shard MonkEnv instances over worker processes that share their buffers.
+
+    Workers write observations, rewards, dones and action masks straight
+    into ``multiprocessing.shared_memory`` arrays and synchronize with the
+    main process on a barrier, so a step costs no pickling at all. Info dicts
+    are only sent back through the pipes when ``return_infos`` is set; other
+    traffic (reset seeds, ``env_method``, ``get_attr``) uses the pipes too
+    but is rare.
+    """
+
+    def __init__(self, num_envs: int, n_workers: Optional[int] = None, seed: int = 0, training_mode: bool = True,
+                 return_infos: bool = False, start_method: Optional[str] = None, **env_kwargs: Any) -> None:
+        probe = MonkEnv(**env_kwargs)
+        self.return_infos = return_infos
+
+        n_workers = min(num_envs, n_workers or os.cpu_count() or 1)
+        bounds = np.linspace(0, num_envs, n_workers + 1).astype(int)
+        self._shards = [(int(lo), int(hi)) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+        obs_space = probe.observation_space
+        self._layout = {
+            'obs': ((num_envs, *obs_space.shape), obs_space.dtype),
+            'terminal_obs': ((num_envs, *obs_space.shape), obs_space.dtype),
+            'rews': ((num_envs,), np.float32),
+            'dones': ((num_envs,), np.bool_),
+            'truncated': ((num_envs,), np.bool_),
+            'masks': ((num_envs, probe.action_space.n), np.bool_),
+            'actions': ((num_envs,), np.int64),
+            'control': ((2,), np.int64),  # [command, send infos]
+            'errors': ((n_workers,), np.int8),
+        }
+        self._shared = _SharedArrays(self._layout)
+        self._buf = self._shared.arrays
+
+        if start_method is None:
+            # Same default as SubprocVecEnv: fork is not thread-safe
+            start_method = 'forkserver' if 'forkserver' in mp.get_all_start_methods() else 'spawn'
+        ctx = mp.get_context(start_method)
+        self._barrier = ctx.Barrier(n_workers + 1)
+        self._conns = []
+        self._processes = []
+        for worker_idx, (lo, hi) in enumerate(self._shards):
+            parent, child = ctx.Pipe()
+            process = ctx.Process(
+                target=_worker,
+                args=(worker_idx, lo, hi, self._layout, self._shared.names, self._barrier, child, seed, training_mode, env_kwargs),
+                daemon=True,
+            )
+            process.start()
+            child.close()
+            self._conns.append(parent)
+            self._processes.append(process)
+        self.closed = False
+        self._closing = False
+        self._waiting = False
+        # A dead worker would otherwise leave the main process blocked on the barrier forever
+        self._watchdog = threading.Thread(target=self._watch_workers, daemon=True)
+        self._watchdog.start()
+
+        # The base constructor already round-trips to the workers (get_attr('render_mode'))
+        super().__init__(num_envs, probe.observation_space, probe.action_space)
+
+    # --- Worker round-trips ---
+
+    def _watch_workers(self) -> None:
+        wait([process.sentinel for process in self._processes])
+        if not self._closing:
+            self._barrier.abort()
+
+    def _wait_barrier(self) -> None:
+        try:
+            self._barrier.wait()
+        except threading.BrokenBarrierError:
+            raise RuntimeError('A MonkEnv worker process exited unexpectedly') from None
+
+    def _dispatch(self, command: int, messages: Optional[List[Any]] = None) -> None:
+        self._buf['control'][0] = command
+        self._buf['control'][1] = int(self.return_infos)
+        if messages is not None:
+            for conn, message in zip(self._conns, messages):
+                conn.send(message)
+        self._wait_barrier()
+
+    def _collect(self, expect_reply: bool) -> List[Any]:
+        self._wait_barrier()
+        errors = self._buf['errors']
+        if errors.any():
+            failed = [self._conns[w].recv() for w in np.flatnonzero(errors)]
+            errors[:] = 0
+            raise RuntimeError('MonkEnv worker failed:\n' + '\n'.join(failed))
+        if not expect_reply:
+            return []
+        return [conn.recv() for conn in self._conns]
+
+    def _call(self, kind: str, name: str, indices, args=(), kwargs=None) -> List[Any]:
+        indices = list(self._get_indices(indices))
+        messages = []
+        for lo, hi in self._shards:
+            local = [i - lo for i in indices if lo <= i < hi]
+            messages.append((kind, name, args, kwargs or {}, local))
+        self._dispatch(_CALL, messages)
+        replies = self._collect(expect_reply=True)
+        by_index = {}
+        for (lo, hi), (_, _, _, _, local), results in zip(self._shards, messages, replies):
+            for j, result in zip(local, results):
+                by_index[lo + j] = result
+        return [by_index[i] for i in indices]
+
+    # --- VecEnv API ---
+
+    def reset(self) -> np.ndarray:
+        messages = [(self._seeds[lo:hi], self._options[lo:hi]) for lo, hi in self._shards]
+        self._dispatch(_RESET, messages)
+        replies = self._collect(expect_reply=True)
+        self.reset_infos = [info for shard in replies for info in shard]
+        self._reset_seeds()
+        self._reset_options()
+        return self._buf['obs'].copy()
+
+    def step_async(self, actions: np.ndarray) -> None:
+        self._buf['actions'][:] = actions
+        self._dispatch(_STEP)
+        self._waiting = True
+
+    def step_wait(self):
+        replies = self._collect(expect_reply=self.return_infos)
+        self._waiting = False
+        buf = self._buf
+        if self.return_infos:
+            infos = [info for shard in replies for info in shard]
+        else:
+            infos = [{} for _ in range(self.num_envs)]
+        for i in np.flatnonzero(buf['dones']):
+            infos[i]['TimeLimit.truncated'] = bool(buf['truncated'][i])
+            infos[i]['terminal_observation'] = buf['terminal_obs'][i].copy()
+        return buf['obs'].copy(), buf['rews'].copy(), buf['dones'].copy(), infos
+
+    def action_masks(self) -> np.ndarray:
+        """Masks of every env, kept current by the workers after each step/reset."""
+
+        return self._buf['masks']
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            if self._waiting:
+                self._collect(expect_reply=self.return_infos)
+            self._closing = True
+            self._dispatch(_CLOSE)
+        except RuntimeError:
+            pass
+        self._closing = True
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for conn in self._conns:
+            conn.close()
+        self._buf = None
+        self._shared.close(unlink=True)
+        self.closed = True
+
+    def get_images(self):
+        return [None for _ in range(self.num_envs)]
+
+    def get_attr(self, attr_name: str, indices=None) -> List[Any]:
+        if attr_name == 'action_masks':
+            # Bound env methods do not cross processes; masks are served from shared memory instead
+            return [self.action_masks for _ in self._get_indices(indices)]
+        return self._call('get', attr_name, indices)
+
+    def set_attr(self, attr_name: str, value: Any, indices=None) -> None:
+        self._call('set', attr_name, indices, args=(value,))
+
+    def env_method(self, method_name: str, *method_args, indices=None, **method_kwargs) -> List[Any]:
+        if method_name == 'action_masks':
+            masks = self.action_masks()
+            return masks if indices is None else [masks[i] for i in self._get_indices(indices)]
+        return self._call('call', method_name, indices, args=method_args, kwargs=method_kwargs)
+
+    def env_is_wrapped(self, wrapper_class, indices=None) -> List[bool]:
+        return [False for _ in self._get_indices(indices)]
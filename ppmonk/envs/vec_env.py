@@ -0,0 +1,92 @@
+"""In-process vectorized MonkEnv for stable-baselines3."""
+
+from __future__ import annotations
+
+from typing import Any, List, Optional
+
+import numpy as np
+from stable_baselines3.common.vec_env import VecEnv
+
+from ppmonk.envs.monk_env import MonkEnv, batch_action_masks
+
+
+class MonkVecEnv(VecEnv):
+    """Step ``num_envs`` MonkEnv instances inside the training process.
+
+    A MonkEnv step is cheap enough that ``SubprocVecEnv`` spends most of its
+    time pickling observations, masks and info dicts through pipes. This
+    steps every env in-process, writes into preallocated observation, reward,
+    done and mask buffers, and serves all action masks at once to
+    MaskablePPO through ``action_masks()``.
+    """
+
+    def __init__(self, num_envs: int, seed: int = 0, training_mode: bool = True, **env_kwargs: Any) -> None:
+        # Env i gets seed_offset seed + i, matching the per-rank factories used with SubprocVecEnv
+        self.envs = [MonkEnv(seed_offset=seed + i, **env_kwargs) for i in range(num_envs)]
+        for env in self.envs:
+            env.training_mode = training_mode
+            env.copy_obs = False  # Observations are copied into buf_obs right away
+        env = self.envs[0]
+        super().__init__(num_envs, env.observation_space, env.action_space)
+
+        self.buf_obs = np.zeros((num_envs, *env.observation_space.shape), dtype=env.observation_space.dtype)
+        self.buf_rews = np.zeros((num_envs,), dtype=np.float32)
+        self.buf_dones = np.zeros((num_envs,), dtype=bool)
+        self.buf_masks = np.zeros((num_envs, env.action_space.n), dtype=bool)
+        self.buf_infos: List[dict] = [{} for _ in range(num_envs)]
+        self.actions: Optional[np.ndarray] = None
+
+    def reset(self) -> np.ndarray:
+        for i, env in enumerate(self.envs):
+            maybe_options = {'options': self._options[i]} if self._options[i] else {}
+            self.buf_obs[i], self.reset_infos[i] = env.reset(seed=self._seeds[i], **maybe_options)
+        # Seeds and options are only used once
+        self._reset_seeds()
+        self._reset_options()
+        return self.buf_obs.copy()
+
+    def step_async(self, actions: np.ndarray) -> None:
+        self.actions = actions
+
+    def step_wait(self):
+        for i, env in enumerate(self.envs):
+            obs, self.buf_rews[i], terminated, truncated, info = env.step(int(self.actions[i]))
+            self.buf_dones[i] = terminated or truncated
+            info['TimeLimit.truncated'] = truncated and not terminated
+            if self.buf_dones[i]:
+                # The env reuses its observation buffer, so keep a copy across the reset
+                info['terminal_observation'] = obs.copy()
+                obs, self.reset_infos[i] = env.reset()
+            self.buf_obs[i] = obs
+            self.buf_infos[i] = info
+        # Observations are copied out: SB3 keeps the previous batch as _last_obs while the next one is written
+        return self.buf_obs.copy(), self.buf_rews.copy(), self.buf_dones.copy(), list(self.buf_infos)
+
+    def action_masks(self) -> np.ndarray:
+        """Masks of every env as one ``(num_envs, n_actions)`` bool array (reused between calls)."""
+
+        return batch_action_masks(self.envs, out=self.buf_masks)
+
+    def close(self) -> None:
+        for env in self.envs:
+            env.close()
+
+    def get_images(self):
+        return [None for _ in self.envs]
+
+    def get_attr(self, attr_name: str, indices=None) -> List[Any]:
+        return [getattr(self.envs[i], attr_name) for i in self._get_indices(indices)]
+
+    def set_attr(self, attr_name: str, value: Any, indices=None) -> None:
+        for i in self._get_indices(indices):
+            setattr(self.envs[i], attr_name, value)
+
+    def env_method(self, method_name: str, *method_args, indices=None, **method_kwargs) -> List[Any]:
+        if method_name == 'action_masks' and indices is None:
+            # MaskablePPO calls np.stack(env_method("action_masks")); hand it the batch buffer directly
+            return self.action_masks()
+        return [getattr(self.envs[i], method_name)(*method_args, **method_kwargs) for i in self._get_indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices=None) -> List[bool]:
+        # The envs are plain MonkEnv instances, never wrapped
+        return [isinstance(self.envs[i], wrapper_class) for i in self._get_indices(indices)]
@@ -0,0 +1,53 @@
+"""Simulation drivers built on the core engine: Monte Carlo DPS estimates, stat weights, build search,
+manifest batches and torch-free policy inference."""
+
+from typing import TYPE_CHECKING
+
+from ppmonk.utils.lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .batch import BatchSummary, load_manifest, run_batch
+    from .montecarlo import (
+        MonteCarloResult,
+        MonteCarloRunner,
+        PriorityPolicy,
+        Profile,
+        RunningStats,
+        compare_profiles,
+        run_monte_carlo,
+    )
+    from .numpy_policy import NumpyPolicy, export_policy
+    from .stat_weights import StatWeightsResult, stat_weights
+    from .talent_optimizer import BuildScore, OptimizerResult, optimize_talents
+
+__all__ = [
+    "BatchSummary",
+    "BuildScore",
+    "MonteCarloResult",
+    "MonteCarloRunner",
+    "NumpyPolicy",
+    "OptimizerResult",
+    "PriorityPolicy",
+    "Profile",
+    "RunningStats",
+    "StatWeightsResult",
+    "compare_profiles",
+    "export_policy",
+    "load_manifest",
+    "optimize_talents",
+    "run_batch",
+    "run_monte_carlo",
+    "stat_weights",
+]
+
+_MODULES = {
+    ".batch": ("BatchSummary", "load_manifest", "run_batch"),
+    ".montecarlo": ("MonteCarloResult", "MonteCarloRunner", "PriorityPolicy", "Profile", "RunningStats",
+                    "compare_profiles", "run_monte_carlo"),
+    ".numpy_policy": ("NumpyPolicy", "export_policy"),
+    ".stat_weights": ("StatWeightsResult", "stat_weights"),
+    ".talent_optimizer": ("BuildScore", "OptimizerResult", "optimize_talents"),
+}
+# The drivers build MonkEnv (gymnasium); nothing is loaded until a name is used
+__getattr__, __dir__ = lazy_exports(__name__, {name: f"{module}:{name}" for module, names in _MODULES.items()
+                                               for name in names})
@@ -0,0 +1,243 @@
+"""Run a manifest of profiles and stream the results to a JSONL file.
+
+A manifest is YAML or JSON: either a list of profiles or a mapping with
+``profiles`` and optional ``defaults`` that every profile starts from::
+
+    defaults: {iterations: 2000, scenario: 0}
+    profiles:
+      - name: haste
+        talents: [WDP, SW, Ascension]
+        ratings: {haste: 2500, crit: 1800}
+      - name: 2h cleave
+        talents: [WDP, SW]
+        weapon_type: 2h
+        target_count: 3
+        scenario: execute_6min
+
+Each profile is simulated under ``cache_key`` over everything that
+determines its result (including the policy file's contents, the resolved
+timeline spec and ``ENGINE_VERSION``); profiles with the same key share one
+simulation but still get one output row per name. Rows are appended to the
+output one JSON line at a time and flushed to disk, so after a crash
+``run_batch`` resumes by skipping every ``(key, name)`` already in the file;
+a line cut short by the crash is dropped and rerun.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from ppmonk.core.timeline import DEFAULT_TIMELINES_PATH, SCENARIOS, load_timeline_specs
+from ppmonk.core.version import ENGINE_VERSION
+from ppmonk.utils.result_cache import cache_key
+
+from .montecarlo import MonteCarloResult, MonteCarloRunner, PriorityPolicy, Profile
+
+PROFILE_FIELDS = ('name', 'talents', 'ratings', 'agility', 'weapon_type', 'target_count', 'scenario', 'iterations',
+                  'seed', 'policy')
+RATINGS = ('crit', 'haste', 'mastery', 'vers')
+DEFAULT_ITERATIONS = 1000
+
+
+@dataclass
+class BatchJob:
+    """One manifest profile, resolved to what the runner needs."""
+
+    key: str
+    profile: Profile
+    iterations: int
+    seed: int
+    spec: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class BatchSummary:
+    total: int
+    skipped: int
+    completed: int
+    output: str
+    simulated: int = 0
+
+    def summary(self) -> str:
+        return (f"{self.completed} profiles done ({self.simulated} simulated), {self.skipped} already done "
+                f"({self.total} in manifest) -> {self.output}")
+
+
+def _file_digest(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _timeline_spec(scenario, index: int) -> Dict[str, Any]:
+    # Named timelines are keyed by their contents, so editing timelines.yaml invalidates old rows
+    if isinstance(scenario, str):
+        specs = load_timeline_specs(DEFAULT_TIMELINES_PATH)
+        if scenario not in specs:
+            raise ValueError(f"Profile {index}: unknown timeline {scenario!r}; available: {', '.join(specs)}")
+        return {'name': scenario, **specs[scenario]}
+    if not 0 <= int(scenario) < len(SCENARIOS):
+        raise ValueError(f"Profile {index}: scenario must be 0-{len(SCENARIOS) - 1} or a timeline name")
+    return SCENARIOS[int(scenario)]
+
+
+def _player_kwargs(spec: Dict[str, Any]) -> Dict[str, Any]:
+    kwargs = {}
+    for name, value in (spec.get('ratings') or {}).items():
+        stat = name if name.startswith('rating_') else f'rating_{name}'
+        if stat[len('rating_'):] not in RATINGS:
+            raise ValueError(f"Unknown rating {name!r}; expected one of {list(RATINGS)}")
+        kwargs[stat] = value
+    for name in ('agility', 'weapon_type', 'target_count'):
+        if name in spec:
+            kwargs[name] = spec[name]
+    return kwargs
+
+
+def make_job(spec: Dict[str, Any], index: int = 0, base_dir: str = '.') -> BatchJob:
+    """Validate one profile mapping and resolve it into a ``BatchJob``.
+
+    Relative policy paths are taken relative to ``base_dir`` (the manifest's
+    directory).
+    """
+    unknown = sorted(set(spec) - set(PROFILE_FIELDS))
+    if unknown:
+        raise ValueError(f"Profile {index}: unknown fields {unknown}; expected a subset of {list(PROFILE_FIELDS)}")
+    talents = list(spec.get('talents') or [])
+    player_kwargs = _player_kwargs(spec)
+    scenario = spec.get('scenario', 0)
+    iterations = int(spec.get('iterations', DEFAULT_ITERATIONS))
+    seed = int(spec.get('seed', 0))
+    if iterations <= 0:
+        raise ValueError(f"Profile {index}: iterations must be positive, got {iterations}")
+
+    timeline = _timeline_spec(scenario, index)
+
+    policy, policy_digest = PriorityPolicy(), None
+    if spec.get('policy'):
+        from .numpy_policy import NumpyPolicy
+
+        path = os.path.join(base_dir, spec['policy'])
+        policy, policy_digest = NumpyPolicy.load(path), _file_digest(path)
+
+    # target_count sits in player_kwargs for PlayerState; cache_key takes it separately
+    stats = {k: v for k, v in player_kwargs.items() if k != 'target_count'}
+    key = cache_key(talents, stats, scenario, player_kwargs.get('target_count', 1),
+                    extra={'iterations': iterations, 'seed': seed, 'policy': policy_digest, 'timeline': timeline})
+    name = str(spec.get('name') or ' '.join(talents) or f'profile {index}')
+    profile = Profile(name=name, talents=talents, player_kwargs=player_kwargs, timeline=scenario, policy=policy)
+    return BatchJob(key, profile, iterations, seed, dict(spec, name=name))
+
+
+def load_manifest(path: str) -> List[BatchJob]:
+    """Read a YAML (``.yaml``/``.yml``) or JSON manifest into jobs."""
+    if path.endswith(('.yaml', '.yml')):
+        from ppmonk.utils.loader import load_yaml
+
+        data = load_yaml(path)
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    defaults: Dict[str, Any] = {}
+    if isinstance(data, dict):
+        defaults = data.get('defaults') or {}
+        data = data.get('profiles')
+    if not isinstance(data, list):
+        raise ValueError(f"{path}: expected a list of profiles or a mapping with 'profiles'")
+    base_dir = os.path.dirname(os.path.abspath(path))
+    return [make_job({**defaults, **spec}, i, base_dir) for i, spec in enumerate(data)]
+
+
+def completed_rows(path: str) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """Records already in a JSONL output file, by ``(key, name)``.
+
+    A trailing line without a newline was cut short by a crash; it is
+    truncated away so the next append starts on a fresh line.
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'rb') as f:
+        data = f.read()
+    end = data.rfind(b'\n') + 1
+    if end < len(data):
+        with open(path, 'r+b') as f:
+            f.truncate(end)
+    rows = {}
+    for line in data[:end].splitlines():
+        try:
+            record = json.loads(line)
+            rows[(record['key'], record['name'])] = record
+        except (ValueError, KeyError, TypeError):
+            continue
+    return rows
+
+
+def result_record(job: BatchJob, result: MonteCarloResult) -> Dict[str, Any]:
+    meter = {name: stats.mean for name, stats in sorted(result.meter.items(), key=lambda item: -item[1].mean)}
+    record = {
+        'key': job.key, 'name': job.profile.name, 'dps': result.dps.mean, 'ci95': result.dps.ci95,
+        'std': result.dps.std, 'iterations': result.iterations, 'elapsed': result.elapsed,
+        'damage_meter': meter, 'profile': job.spec, 'engine': ENGINE_VERSION,
+    }
+    if result.profiler is not None:
+        record['profiler'] = result.profiler.as_dict()
+    return record
+
+
+def _append(f, job: BatchJob, record: Dict[str, Any], on_result) -> None:
+    record = {**record, 'name': job.profile.name, 'profile': job.spec}
+    f.write(json.dumps(record) + '\n')
+    f.flush()
+    os.fsync(f.fileno())
+    if on_result is not None:
+        on_result(record)
+
+
+def run_batch(manifest: Union[str, Sequence[BatchJob]], output: str, runner: Optional[MonteCarloRunner] = None,
+              resume: bool = True, on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> BatchSummary:
+    """Simulate every profile of ``manifest`` not yet in ``output``.
+
+    All pending simulations share one stream of chunks on ``runner``'s pool
+    (one is created if not given). Each finished profile is appended to
+    ``output`` as a JSON line, flushed and fsynced before it is reported to
+    ``on_result``. A profile whose key already has a result, in the file or
+    under another name in this manifest, gets a copy of it under its own
+    name. ``resume=False`` truncates ``output`` first.
+    """
+    jobs = load_manifest(manifest) if isinstance(manifest, str) else list(manifest)
+    if not resume and os.path.exists(output):
+        os.remove(output)
+    done = completed_rows(output)
+    finished = {key: record for (key, _), record in done.items()}
+    todo: Dict[str, List[BatchJob]] = {}  # key -> profiles still missing a row, in manifest order
+    seen = set(done)
+    for job in jobs:
+        if (job.key, job.profile.name) not in seen:
+            seen.add((job.key, job.profile.name))
+            todo.setdefault(job.key, []).append(job)
+    pending = [group[0] for key, group in todo.items() if key not in finished]
+
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    own_runner = runner is None
+    runner = runner or MonteCarloRunner()
+    try:
+        with open(output, 'a', encoding='utf-8') as f:
+            for key, group in todo.items():
+                if key in finished:
+                    for job in group:
+                        _append(f, job, finished[key], on_result)
+            results = runner.run_many([(job.profile, job.iterations, job.seed) for job in pending])
+            for first, result in zip(pending, results):
+                record = result_record(first, result)
+                for job in todo[first.key]:
+                    _append(f, job, record, on_result)
+    finally:
+        if own_runner:
+            runner.close()
+    completed = sum(map(len, todo.values()))
+    return BatchSummary(total=len(jobs), skipped=len(jobs) - completed, completed=completed, output=output,
+                        simulated=len(pending))
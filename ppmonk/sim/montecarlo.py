@@ -0,0 +1,328 @@
+"""Parallel Monte Carlo DPS runs of a fixed rotation or policy.
+
+Iterations are split into chunks and fanned out over a process pool. Every
+iteration seeds its own RNG streams from ``SeedSequence(seed, spawn_key=(i,))``,
+so results only depend on ``seed`` and the iteration count, never on how many
+workers ran them or in which order they finished. Workers reduce their chunk
+to Welford accumulators and the parent merges them in chunk order, stopping
+as soon as the 95% confidence interval of the mean DPS is tight enough.
+"""
+
+from __future__ import annotations
+
+import math
+import multiprocessing as mp
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ppmonk.core.profiler import Profiler
+from ppmonk.core.timeline import Timeline
+from ppmonk.envs.monk_env import MonkEnv
+
+Z_95 = 1.959963984540054
+
+DEFAULT_PRIORITY = ('Zenith', 'SOTWL', 'WDP', 'FOF', 'RSK', 'SW', 'SCK', 'BOK', 'TP')
+
+
+@dataclass
+class RunningStats:
+    """Streaming mean/variance (Welford), mergeable across workers (Chan et al.)."""
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def push(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, other: 'RunningStats') -> None:
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else math.inf
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    @property
+    def sem(self) -> float:
+        return math.sqrt(self.variance / self.count) if self.count > 1 else math.inf
+
+    @property
+    def ci95(self) -> float:
+        """Half-width of the normal-approximation 95% confidence interval of the mean."""
+        return Z_95 * self.sem
+
+
+class PriorityPolicy:
+    """Cast the first usable spell of ``priority``; wait 0.1s when none is."""
+
+    def __init__(self, priority: Sequence[str] = DEFAULT_PRIORITY) -> None:
+        self.priority = tuple(priority)
+
+    def __call__(self, env: MonkEnv) -> int:
+        masks = env.action_masks()
+        for abbr in self.priority:
+            action = env.action_index[abbr]
+            if masks[action]:
+                return action
+        return 0
+
+
+@dataclass
+class Profile:
+    """One simulated setup: build, stats, encounter and the policy that plays it.
+
+    ``policy`` is called with the env and returns an action index; it must be
+    picklable (a module-level function or an object such as PriorityPolicy)
+    to run on worker processes.
+    """
+
+    name: str = 'default'
+    talents: Sequence[str] = ()
+    player_kwargs: Dict[str, Any] = field(default_factory=dict)
+    timeline: Union[int, str, Timeline] = 0
+    policy: Callable[[MonkEnv], int] = field(default_factory=PriorityPolicy)
+
+
+@dataclass
+class MonteCarloResult:
+    name: str
+    dps: RunningStats
+    meter: Dict[str, RunningStats]
+    converged: bool
+    elapsed: float
+    profiler: Optional[Profiler] = None
+
+    @property
+    def iterations(self) -> int:
+        return self.dps.count
+
+    def summary(self) -> str:
+        return f"{self.name}: {self.dps.mean:,.0f} DPS ± {self.dps.ci95:,.0f} (95% CI, n={self.iterations})"
+
+
+def iteration_seed(seed: int, iteration: int) -> int:
+    """Seed of iteration ``iteration``'s RNG streams."""
+    return int(np.random.SeedSequence(seed, spawn_key=(iteration,)).generate_state(1)[0])
+
+
+def run_episode(env: MonkEnv, profile: Profile, seed: int) -> float:
+    """Play one full encounter from the pull and return its DPS."""
+    env.reset(seed=seed, options={'timeline': profile.timeline})
+    total, done = 0.0, False
+    while not done:
+        _, _, done, _, info = env.step(profile.policy(env))
+        total += info['damage']
+    return total / env.timeline.duration
+
+
+def make_env(profile: Profile, **player_overrides) -> MonkEnv:
+    """Evaluation env for ``profile`` without logs or breakdowns."""
+    player_kwargs = {**profile.player_kwargs, **player_overrides}
+    env = MonkEnv(current_talents=list(profile.talents), player_kwargs=player_kwargs, detail_level='none')
+    env.training_mode = False
+    env.copy_obs = False  # Policies read env.last_obs
+    return env
+
+
+# Worker side of cancellation: every map_chunks call is a generation (from 1), and
+# closing it raises the shared counter to that generation so its leftover chunks stop
+_cancel_counter = None
+_task_generation = 0
+
+
+def _init_worker(counter) -> None:
+    global _cancel_counter
+    _cancel_counter = counter
+
+
+def _cancelled() -> bool:
+    return _cancel_counter is not None and _cancel_counter.value >= _task_generation
+
+
+def _call_chunk(fn, generation, task):
+    global _task_generation
+    _task_generation = generation
+    return None if _cancelled() else fn(task)
+
+
+def _run_chunk(task):
+    profile, seed, start, count, profiling = task
+    env = make_env(profile)
+    env.profiler = Profiler() if profiling else None
+    dps = RunningStats()
+    meters = []
+    for i in range(start, start + count):
+        if _cancelled():
+            break  # The caller already stopped; this partial chunk is never read
+        dps.push(run_episode(env, profile, iteration_seed(seed, i)))
+        meters.append(env.damage_meter)
+    meter = {}
+    for name in {name for m in meters for name in m}:
+        stats = meter[name] = RunningStats()
+        for m in meters:
+            stats.push(m.get(name, 0.0))
+    return dps, meter, env.profiler
+
+
+def _merge_meter(total: Dict[str, RunningStats], part: Dict[str, RunningStats], seen: int, added: int) -> None:
+    # Abilities missing from one side did 0 damage in those iterations
+    for name in total.keys() | part.keys():
+        stats = total.setdefault(name, RunningStats(count=seen))
+        stats.merge(part.get(name, RunningStats(count=added)))
+
+
+class MonteCarloRunner:
+    """Process pool that runs Monte Carlo DPS estimates for one or many profiles.
+
+    ``n_workers=1`` runs in-process. Use as a context manager (or call
+    ``close()``) to shut the pool down; ``compare`` reuses one pool for every
+    profile. With ``profiling=True`` every result carries a ``Profiler``
+    merged from all of its chunks.
+    """
+
+    def __init__(self, n_workers: Optional[int] = None, chunk_size: int = 25, start_method: Optional[str] = None,
+                 profiling: bool = False) -> None:
+        self.n_workers = max(1, n_workers or os.cpu_count() or 1)
+        self.chunk_size = chunk_size
+        self.profiling = profiling
+        self._pool = None
+        self._generation = 0
+        if self.n_workers > 1:
+            if start_method is None:
+                # Same default as SharedMemoryMonkVecEnv: fork is not thread-safe
+                start_method = 'forkserver' if 'forkserver' in mp.get_all_start_methods() else 'spawn'
+            ctx = mp.get_context(start_method)
+            self._cancel_counter = ctx.RawValue('q', 0)
+            self._pool = ctx.Pool(self.n_workers, initializer=_init_worker, initargs=(self._cancel_counter,))
+
+    def __enter__(self) -> 'MonteCarloRunner':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def map_chunks(self, fn: Callable[[tuple], Any], tasks: List[tuple]) -> Iterable[Any]:
+        """Yield ``fn(task)`` for every task, in order, computed on the pool.
+
+        Only a bounded window of tasks is in flight and results are consumed in
+        submission order, so a caller that stops early gets a deterministic
+        answer. Closing the generator early cancels the tasks still in flight:
+        queued ones are skipped and ``_run_chunk`` stops at its next episode,
+        without waiting for either. ``fn`` must be a module-level function.
+        """
+        if self._pool is None:
+            yield from map(fn, tasks)
+            return
+        self._generation += 1
+        generation = self._generation
+        window = 2 * self.n_workers
+
+        def submit(task):
+            return self._pool.apply_async(_call_chunk, (fn, generation, task))
+
+        pending = [submit(task) for task in tasks[:window]]
+        try:
+            for k in range(len(tasks)):
+                result = pending[k].get()
+                if k + window < len(tasks):
+                    pending.append(submit(tasks[k + window]))
+                yield result
+        finally:
+            self._cancel_counter.value = max(self._cancel_counter.value, generation)
+
+    def run(self, profile: Profile, ci_target: Optional[float] = None, min_iterations: int = 100,
+            max_iterations: int = 10_000, seed: int = 0) -> MonteCarloResult:
+        """Estimate the mean DPS of ``profile``.
+
+        Stops after ``max_iterations``, or earlier once at least
+        ``min_iterations`` ran and the 95% CI half-width is below ``ci_target``
+        DPS. Chunks already handed to the pool past that point are cancelled
+        and their results discarded, so the estimate only covers the chunks
+        merged before the stop.
+        """
+        started = time.perf_counter()
+        tasks = [(profile, seed, start, min(self.chunk_size, max_iterations - start), self.profiling)
+                 for start in range(0, max_iterations, self.chunk_size)]
+        dps = RunningStats()
+        meter: Dict[str, RunningStats] = {}
+        profiler = Profiler() if self.profiling else None
+        converged = False
+        chunks = self.map_chunks(_run_chunk, tasks)
+        try:
+            for part_dps, part_meter, part_profiler in chunks:
+                _merge_meter(meter, part_meter, dps.count, part_dps.count)
+                dps.merge(part_dps)
+                if profiler is not None:
+                    profiler.merge(part_profiler)
+                if ci_target is not None and dps.count >= min_iterations and dps.ci95 <= ci_target:
+                    converged = True
+                    break
+        finally:
+            chunks.close()
+        return MonteCarloResult(profile.name, dps, meter, converged, time.perf_counter() - started, profiler)
+
+    def run_many(self, jobs: Sequence[Tuple[Profile, int, int]]) -> Iterator[MonteCarloResult]:
+        """Run ``(profile, iterations, seed)`` jobs and yield each result as soon as it is complete.
+
+        The chunks of all jobs go through the pool as one stream, so workers
+        move straight on to the next profile instead of idling while the
+        last chunks of a short one finish. Results come in job order.
+        """
+        tasks, owners = [], []
+        for job, (profile, iterations, seed) in enumerate(jobs):
+            for start in range(0, iterations, self.chunk_size):
+                tasks.append((profile, seed, start, min(self.chunk_size, iterations - start), self.profiling))
+                owners.append(job)
+        started = time.perf_counter()
+        dps, meter, profiler = RunningStats(), {}, Profiler() if self.profiling else None
+        for k, (part_dps, part_meter, part_profiler) in enumerate(self.map_chunks(_run_chunk, tasks)):
+            _merge_meter(meter, part_meter, dps.count, part_dps.count)
+            dps.merge(part_dps)
+            if profiler is not None:
+                profiler.merge(part_profiler)
+            if k + 1 == len(tasks) or owners[k + 1] != owners[k]:
+                now = time.perf_counter()
+                yield MonteCarloResult(jobs[owners[k]][0].name, dps, meter, False, now - started, profiler)
+                started, dps, meter = now, RunningStats(), {}
+                profiler = Profiler() if self.profiling else None
+
+    def compare(self, profiles: Iterable[Profile], **run_kwargs) -> List[MonteCarloResult]:
+        """Run every profile with the same seeds and return the results, best DPS first."""
+        results = [self.run(profile, **run_kwargs) for profile in profiles]
+        return sorted(results, key=lambda result: result.dps.mean, reverse=True)
+
+
+def run_monte_carlo(profile: Profile, n_workers: Optional[int] = None, chunk_size: int = 25, **run_kwargs) -> MonteCarloResult:
+    """One-shot ``MonteCarloRunner.run`` with its own pool."""
+    with MonteCarloRunner(n_workers, chunk_size) as runner:
+        return runner.run(profile, **run_kwargs)
+
+
+def compare_profiles(profiles: Iterable[Profile], n_workers: Optional[int] = None, chunk_size: int = 25,
+                     **run_kwargs) -> List[MonteCarloResult]:
+    """One-shot ``MonteCarloRunner.compare`` with its own pool."""
+    with MonteCarloRunner(n_workers, chunk_size) as runner:
+        return runner.compare(profiles, **run_kwargs)
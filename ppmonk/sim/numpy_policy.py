@@ -0,0 +1,113 @@
+"""Torch-free inference for trained MaskablePPO policies.
+
+``export_policy`` copies the actor half of a MaskablePPO ``MlpPolicy`` (the
+policy MLP and the action head) into an ``.npz`` file; it is the only part
+that needs torch. ``NumpyPolicy`` loads that file and picks the masked
+argmax action with plain numpy matrix products, which is what
+``model.predict(obs, action_masks=..., deterministic=True)`` computes, minus
+the per-call tensor conversion. It takes single observations or a batch of
+them, and as a ``Profile.policy`` it plays Monte Carlo runs on worker
+processes without importing torch there.
+"""
+
+from __future__ import annotations
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from ppmonk.core.version import ENGINE_VERSION
+
+
+def _relu(x):
+    return np.maximum(x, 0.0, out=x)
+
+
+def _identity(x):
+    return x
+
+
+_ACTIVATIONS = {'tanh': np.tanh, 'relu': _relu, 'identity': _identity}
+
+
+class NumpyPolicy:
+    """Deterministic masked-argmax actor of an exported MaskablePPO policy."""
+
+    def __init__(self, layers: Sequence[Tuple[np.ndarray, np.ndarray]], action_head: Tuple[np.ndarray, np.ndarray],
+                 activation: str = 'tanh') -> None:
+        if activation not in _ACTIVATIONS:
+            raise ValueError(f"Unsupported activation {activation!r}; expected one of {sorted(_ACTIVATIONS)}")
+        # Weights are stored (in, out) so a batch of row observations multiplies from the left
+        self.layers: List[Tuple[np.ndarray, np.ndarray]] = [
+            (np.ascontiguousarray(w, dtype=np.float32), np.asarray(b, dtype=np.float32)) for w, b in layers]
+        self.action_head = (np.ascontiguousarray(action_head[0], dtype=np.float32),
+                            np.asarray(action_head[1], dtype=np.float32))
+        self.activation = activation
+
+    @property
+    def obs_dim(self) -> int:
+        return (self.layers[0][0] if self.layers else self.action_head[0]).shape[0]
+
+    @property
+    def n_actions(self) -> int:
+        return self.action_head[0].shape[1]
+
+    @classmethod
+    def from_model(cls, model) -> 'NumpyPolicy':
+        """Copy the actor weights out of a MaskablePPO model (needs torch)."""
+        import torch.nn as nn
+
+        policy = model.policy
+        if type(policy.pi_features_extractor).__name__ != 'FlattenExtractor':
+            raise ValueError("Only policies with the default FlattenExtractor can be exported")
+        layers, activation = [], 'identity'
+        for module in policy.mlp_extractor.policy_net:
+            if isinstance(module, nn.Linear):
+                layers.append((module.weight.detach().cpu().numpy().T, module.bias.detach().cpu().numpy()))
+            elif type(module).__name__.lower() in _ACTIVATIONS:
+                activation = type(module).__name__.lower()
+            else:
+                raise ValueError(f"Cannot export policy layer {module!r}")
+        head = policy.action_net
+        return cls(layers, (head.weight.detach().cpu().numpy().T, head.bias.detach().cpu().numpy()), activation)
+
+    @classmethod
+    def load(cls, path: str) -> 'NumpyPolicy':
+        with np.load(path, allow_pickle=False) as data:
+            n_layers = int(data['n_layers'])
+            layers = [(data[f'w{i}'], data[f'b{i}']) for i in range(n_layers)]
+            return cls(layers, (data['action_w'], data['action_b']), str(data['activation']))
+
+    def save(self, path: str) -> None:
+        arrays = {f'w{i}': w for i, (w, _) in enumerate(self.layers)}
+        arrays.update({f'b{i}': b for i, (_, b) in enumerate(self.layers)})
+        # np.savez appends .npz to bare names; write through a handle so ``path`` is used as given
+        with open(path, 'wb') as f:
+            np.savez(f, n_layers=len(self.layers), action_w=self.action_head[0], action_b=self.action_head[1],
+                     activation=self.activation, engine_version=ENGINE_VERSION, **arrays)
+
+    def logits(self, obs: np.ndarray) -> np.ndarray:
+        """Action logits for one observation or a ``(n, obs_dim)`` batch."""
+        activate = _ACTIVATIONS[self.activation]
+        x = np.asarray(obs, dtype=np.float32)
+        for w, b in self.layers:
+            x = activate(x @ w + b)
+        w, b = self.action_head
+        return x @ w + b
+
+    def act(self, obs: np.ndarray, masks: np.ndarray):
+        """Highest-logit legal action; an int for one observation, an array for a batch."""
+        logits = self.logits(obs)
+        actions = np.where(masks, logits, -np.inf).argmax(axis=-1)
+        return int(actions) if actions.ndim == 0 else actions
+
+    def __call__(self, env) -> int:
+        return self.act(env.last_obs, env.action_masks())
+
+
+def export_policy(model, path: str) -> NumpyPolicy:
+    """Write ``model``'s actor to ``path`` (``.npz``) and return it as a ``NumpyPolicy``."""
+    policy = NumpyPolicy.from_model(model)
+    policy.save(path)
+    return policy
+
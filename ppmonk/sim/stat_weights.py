@@ -0,0 +1,153 @@
+"""Stat weights from paired Monte Carlo runs (common random numbers).
+
+For every iteration the base profile and each perturbed profile are played
+with the same RNG seed, and only the per-iteration DPS difference is
+accumulated. The runs stay correlated, so the difference has a much smaller
+variance than two independent estimates would, and far fewer iterations are
+needed for the same error bars.
+"""
+
+from __future__ import annotations
+
+import inspect
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from ppmonk.core.player import PlayerState
+from ppmonk.sim.montecarlo import MonteCarloRunner, Profile, RunningStats, Z_95, iteration_seed, make_env, run_episode
+
+# Large enough for the DPS change to clear the per-iteration noise, small enough to stay roughly linear
+DEFAULT_DELTAS = {
+    'agility': 200.0,
+    'rating_crit': 400.0,
+    'rating_haste': 400.0,
+    'rating_mastery': 400.0,
+    'rating_vers': 400.0,
+}
+_PLAYER_DEFAULTS = {name: param.default for name, param in inspect.signature(PlayerState.__init__).parameters.items()}
+
+
+@dataclass
+class StatWeight:
+    stat: str
+    delta: float
+    gain: RunningStats  # Per-iteration DPS(stat + delta) - DPS(base)
+    normalized: float = math.nan
+    normalized_error: float = math.nan
+
+    @property
+    def weight(self) -> float:
+        """DPS per stat point."""
+        return self.gain.mean / self.delta
+
+    @property
+    def error(self) -> float:
+        """95% CI half-width of ``weight``."""
+        return self.gain.ci95 / self.delta
+
+
+@dataclass
+class StatWeightsResult:
+    name: str
+    base: RunningStats
+    weights: Dict[str, StatWeight]
+    reference: str
+    converged: bool
+    elapsed: float
+
+    @property
+    def iterations(self) -> int:
+        return self.base.count
+
+    def summary(self) -> str:
+        lines = [f"{self.name}: {self.base.mean:,.0f} DPS (n={self.iterations}), weights relative to {self.reference}"]
+        for w in sorted(self.weights.values(), key=lambda w: w.normalized, reverse=True):
+            lines.append(f"  {w.stat:<15} {w.normalized:6.3f} ± {w.normalized_error:.3f}   ({w.weight:.3f} ± {w.error:.3f} DPS/pt)")
+        return '\n'.join(lines)
+
+
+def _normalize(weights: Dict[str, StatWeight], reference: str) -> None:
+    ref = weights[reference]
+    # Delta method for a ratio of means; the covariance term is dropped, which overstates the error slightly
+    rel_ref = ref.error / ref.weight if ref.weight else math.inf
+    for w in weights.values():
+        w.normalized = w.weight / ref.weight if ref.weight else math.nan
+        if w is ref:
+            w.normalized_error = 0.0
+        elif not ref.weight:
+            w.normalized_error = math.nan
+        else:
+            rel = w.error / w.weight if w.weight else math.inf
+            w.normalized_error = abs(w.normalized) * math.hypot(rel, rel_ref) if w.weight else w.error / abs(ref.weight)
+
+
+def _run_weights_chunk(task):
+    profile, deltas, seed, start, count = task
+    base_env = make_env(profile)
+    envs = {stat: make_env(profile, **{stat: _base_value(profile, stat) + delta}) for stat, delta in deltas.items()}
+    base = RunningStats()
+    gains = {stat: RunningStats() for stat in deltas}
+    for i in range(start, start + count):
+        s = iteration_seed(seed, i)
+        dps = run_episode(base_env, profile, s)
+        base.push(dps)
+        for stat, env in envs.items():
+            gains[stat].push(run_episode(env, profile, s) - dps)
+    return base, gains
+
+
+def _base_value(profile: Profile, stat: str) -> float:
+    return float(profile.player_kwargs.get(stat, _PLAYER_DEFAULTS[stat]))
+
+
+def stat_weights(profile: Profile, deltas: Optional[Dict[str, float]] = None, reference: str = 'agility',
+                 runner: Optional[MonteCarloRunner] = None, ci_target: Optional[float] = None,
+                 min_iterations: int = 50, max_iterations: int = 2000, seed: int = 0) -> StatWeightsResult:
+    """Estimate DPS per point of each stat in ``deltas`` (default: agility and the four ratings).
+
+    Every chunk of iterations plays the base profile and all perturbed
+    profiles with shared seeds, in parallel over ``runner``'s pool. Stops
+    after ``max_iterations``, or once at least ``min_iterations`` ran and
+    every normalized weight's 95% CI half-width is below ``ci_target``.
+    """
+    deltas = dict(deltas or DEFAULT_DELTAS)
+    if reference not in deltas:
+        raise ValueError(f"Reference stat {reference!r} must be one of the perturbed stats {list(deltas)}")
+    unknown = [stat for stat in deltas if stat not in _PLAYER_DEFAULTS]
+    if unknown:
+        raise ValueError(f"Unknown PlayerState stats: {unknown}")
+
+    started = time.perf_counter()
+    owned = runner is None
+    runner = runner or MonteCarloRunner()
+    try:
+        chunk = runner.chunk_size
+        tasks = [(profile, deltas, seed, start, min(chunk, max_iterations - start)) for start in range(0, max_iterations, chunk)]
+        base = RunningStats()
+        weights = {stat: StatWeight(stat, delta, RunningStats()) for stat, delta in deltas.items()}
+        converged = False
+        for part_base, part_gains in runner.map_chunks(_run_weights_chunk, tasks):
+            base.merge(part_base)
+            for stat, gain in part_gains.items():
+                weights[stat].gain.merge(gain)
+            _normalize(weights, reference)
+            if ci_target is not None and base.count >= min_iterations and \
+                    all(w.normalized_error <= ci_target for w in weights.values()):
+                converged = True
+                break
+    finally:
+        if owned:
+            runner.close()
+    return StatWeightsResult(profile.name, base, weights, reference, converged, time.perf_counter() - started)
+
+
+def independent_error(result: StatWeightsResult) -> Dict[str, float]:
+    """95% CI half-width each weight would have had with independent seeds, at the same iteration count."""
+    errors: Dict[str, float] = {}
+    for stat, w in result.weights.items():
+        # Var(A - B) = Var(A) + Var(B) for independent runs; Var(A) ~ Var(B) ~ Var(base)
+        errors[stat] = Z_95 * math.sqrt(2.0 * result.base.variance / result.base.count) / w.delta
+    return errors
+
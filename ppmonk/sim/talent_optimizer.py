@@ -0,0 +1,287 @@
+"""Talent build optimizer: beam search over legal builds, Monte Carlo refinement.
+
+Builds grow one node at a time from the roots of the tree, so every candidate
+obeys the talent window's gating (a node needs one of its parents at full
+rank) and fits the point budget. Hero trees cost no points; every hero tree
+and choice combination is its own starting build. Each level is scored with
+a deterministic expected-value rotation on the process pool, choice variants
+of the same node set are pruned down to the best one and only the
+``beam_width`` best builds are expanded further. The ``top_k`` best complete
+builds are then ranked with Monte Carlo.
+
+EV scores and Monte Carlo results are stored in a JSON cache keyed by a hash
+of the build, the scoring settings and ``ENGINE_VERSION``, so re-runs only
+simulate builds they have not seen.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ppmonk.core.rng import CombatRng
+from ppmonk.core.talent_profile import get_talent_profile
+from ppmonk.core.talent_tree import MONK_TALENT_DATA
+from ppmonk.core.version import ENGINE_VERSION
+from ppmonk.sim.montecarlo import DEFAULT_PRIORITY, MonteCarloRunner, PriorityPolicy, Profile
+
+DEFAULT_CACHE_PATH = os.path.join('cache', 'talent_scores.json')
+
+_NODES = {node['id']: node for node in MONK_TALENT_DATA}
+_ORDER = {node['id']: i for i, node in enumerate(MONK_TALENT_DATA)}
+_SPEC_NODES = [node for node in MONK_TALENT_DATA if not node['id'].startswith('hero-')]
+
+Build = Tuple[str, ...]
+
+
+def node_id(key: str) -> str:
+    """Tree node of a talent key (``'6-2_b'`` -> ``'6-2'``)."""
+    return key[:-2] if key.endswith('_b') else key
+
+
+def _variants(node) -> Tuple[str, ...]:
+    return (node['id'], node['id'] + '_b') if node.get('is_choice') else (node['id'],)
+
+
+def _canonical(keys: Iterable[str]) -> Build:
+    return tuple(sorted(keys, key=lambda key: _ORDER[node_id(key)]))
+
+
+def _is_available(node, chosen) -> bool:
+    # Same rule as TalentTreeWindow._is_node_available; chosen nodes are always at full rank
+    return not node['req'] or any(req in chosen for req in node['req'])
+
+
+def build_points(build: Iterable[str]) -> int:
+    """Points a build spends; hero talents are free."""
+    return sum(_NODES[node_id(key)]['max_rank'] for key in build if not key.startswith('hero-'))
+
+
+def hero_options() -> List[Build]:
+    """Starting builds: no hero tree, or one full hero tree with each combination of its choices."""
+    trees: Dict[str, list] = {}
+    for node in MONK_TALENT_DATA:
+        if node['id'].startswith('hero-'):
+            trees.setdefault(node['id'].split('-')[1], []).append(node)
+    options = [()]
+    for nodes in trees.values():
+        options.extend(itertools.product(*(_variants(node) for node in nodes)))
+    return [_canonical(option) for option in options]
+
+
+def is_legal(build: Iterable[str], points: Optional[int] = None) -> bool:
+    """Whether every talent is gated by a chosen parent, no choice is taken twice and the budget holds."""
+    keys = list(build)
+    chosen = [node_id(key) for key in keys]
+    if len(set(chosen)) != len(chosen) or any(nid not in _NODES for nid in chosen):
+        return False
+    if any(key.endswith('_b') and not _NODES[node_id(key)].get('is_choice') for key in keys):
+        return False
+    if len({nid.split('-')[1] for nid in chosen if nid.startswith('hero-')}) > 1:
+        return False
+    chosen = set(chosen)
+    if not all(_is_available(_NODES[nid], chosen) for nid in chosen):
+        return False
+    return points is None or build_points(keys) <= points
+
+
+def ev_dps(talents: Sequence[str], player_kwargs: Optional[Dict[str, Any]] = None, duration: float = 60.0,
+           priority: Sequence[str] = DEFAULT_PRIORITY, seed: int = 0) -> float:
+    """DPS of a priority rotation played with expected-value damage (no crit or proc rolls).
+
+    Much cheaper and less noisy than a Monte Carlo run; good enough to rank
+    builds against each other, not to predict their absolute damage.
+    """
+    kwargs = {**(player_kwargs or {}), 'event_driven': True, 'detail_level': 'none'}
+    player, book = get_talent_profile(talents, kwargs).instantiate()
+    player.rng = CombatRng(seed)
+    spells = [book.spells[abbr] for abbr in priority if abbr in book.spells]
+    total, t = 0.0, 0.0
+    while t < duration:
+        step = 0.1
+        for spell in spells:
+            if spell.abbr != player.last_spell_name and spell.is_usable(player, book.spells):
+                dmg, _ = spell.cast(player, other_spells=book.spells, use_expected_value=True)
+                total += dmg
+                step = spell.get_effective_cast_time(player) if spell.is_channeled else max(player.gcd_remaining, 0.1)
+                break
+        step = min(step, duration - t)
+        dmg, _ = player.advance_time(step, use_expected_value=True)
+        book.tick(step)
+        total += dmg
+        t += step
+    return total / duration
+
+
+def _score_chunk(task):
+    builds, player_kwargs, duration, priority, seed = task
+    return [ev_dps(build, player_kwargs, duration, priority, seed) for build in builds]
+
+
+class ScoreCache:
+    """JSON file of results keyed by a hash of the build and the settings that produced them."""
+
+    def __init__(self, path: Optional[str] = DEFAULT_CACHE_PATH) -> None:
+        self.path = path
+        self.entries: Dict[str, Any] = {}
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    @staticmethod
+    def key(kind: str, build: Build, settings: Dict[str, Any]) -> str:
+        payload = json.dumps({'kind': kind, 'build': list(build), 'settings': settings, 'engine': ENGINE_VERSION},
+                             sort_keys=True)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Any:
+        return self.entries.get(key)
+
+    def put(self, key: str, value: Any) -> None:
+        self.entries[key] = value
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp, self.path)
+
+
+@dataclass
+class BuildScore:
+    talents: Build
+    ev_dps: float
+    dps: Optional[float] = None  # Monte Carlo mean, top-K only
+    ci95: Optional[float] = None
+    iterations: int = 0
+
+    @property
+    def points(self) -> int:
+        return build_points(self.talents)
+
+
+@dataclass
+class OptimizerResult:
+    builds: List[BuildScore]  # Refined top-K, best Monte Carlo DPS first
+    candidates: List[BuildScore] = field(default_factory=list)  # Every complete build reached, best EV first
+    evaluated: int = 0  # EV scores computed by this run; the rest came from the cache
+    cached: int = 0
+    simulated: int = 0  # Builds refined with Monte Carlo by this run
+
+    @property
+    def best(self) -> BuildScore:
+        return self.builds[0]
+
+    def summary(self) -> str:
+        lines = [f"{len(self.candidates)} complete builds, {self.evaluated} scored ({self.cached} cached)"]
+        for rank, score in enumerate(self.builds, 1):
+            lines.append(f"{rank:2d}. {score.dps:,.0f} DPS ± {score.ci95:,.0f}  (EV {score.ev_dps:,.0f}, "
+                         f"{score.points} pts)  {' '.join(score.talents)}")
+        return '\n'.join(lines)
+
+
+def optimize_talents(points: int, player_kwargs: Optional[Dict[str, Any]] = None,
+                     beam_width: int = 12, top_k: int = 5, duration: float = 60.0, timeline=0,
+                     priority: Sequence[str] = DEFAULT_PRIORITY, mc_iterations: int = 500,
+                     ci_target: Optional[float] = None, runner: Optional[MonteCarloRunner] = None,
+                     cache_path: Optional[str] = DEFAULT_CACHE_PATH, seed: int = 0) -> OptimizerResult:
+    """Search for the highest-DPS legal build spending at most ``points`` spec points.
+
+    The tree data has no point budget of its own, so the caller passes the
+    one of the character level being optimized.
+
+    EV scoring runs ``duration`` seconds of ``priority`` on a target dummy;
+    the ``top_k`` refinement plays ``timeline`` for up to ``mc_iterations``
+    (fewer once the 95% CI is below ``ci_target``) with the same seeds for
+    every build. ``cache_path=None`` disables the on-disk cache.
+    """
+    player_kwargs = dict(player_kwargs or {})
+    settings = {'player_kwargs': sorted(player_kwargs.items()), 'duration': duration, 'priority': list(priority),
+                'seed': seed}
+    cache = ScoreCache(cache_path)
+    scores: Dict[Build, float] = {}
+    result = OptimizerResult(builds=[])
+
+    owned = runner is None
+    runner = runner or MonteCarloRunner()
+    try:
+        def score(builds: List[Build]) -> None:
+            todo = []
+            for build in builds:
+                cached = cache.get(ScoreCache.key('ev', build, settings))
+                if cached is None:
+                    todo.append(build)
+                else:
+                    scores[build] = cached
+                    result.cached += 1
+            per_task = max(1, -(-len(todo) // (4 * runner.n_workers)))
+            tasks = [(todo[i:i + per_task], player_kwargs, duration, tuple(priority), seed)
+                     for i in range(0, len(todo), per_task)]
+            for (builds_part, *_), values in zip(tasks, runner.map_chunks(_score_chunk, tasks)):
+                for build, value in zip(builds_part, values):
+                    scores[build] = value
+                    cache.put(ScoreCache.key('ev', build, settings), value)
+            result.evaluated += len(todo)
+            cache.save()
+
+        frontier = hero_options()
+        score(frontier)
+        seen = set(frontier)
+        complete: List[Build] = []
+        while frontier:
+            children = []
+            for build in frontier:
+                chosen = {node_id(key) for key in build}
+                spent = build_points(build)
+                grew = False
+                for node in _SPEC_NODES:
+                    if node['id'] in chosen or spent + node['max_rank'] > points or not _is_available(node, chosen):
+                        continue
+                    grew = True
+                    for key in _variants(node):
+                        child = _canonical(build + (key,))
+                        if child not in seen:
+                            seen.add(child)
+                            children.append(child)
+                if not grew:
+                    complete.append(build)
+            score(children)
+            # A choice variant is dominated by the better-scoring variant of the same node set
+            best: Dict[frozenset, Build] = {}
+            for child in children:
+                nodes = frozenset(map(node_id, child))
+                if nodes not in best or scores[child] > scores[best[nodes]]:
+                    best[nodes] = child
+            frontier = sorted(best.values(), key=scores.__getitem__, reverse=True)[:beam_width]
+
+        complete.sort(key=scores.__getitem__, reverse=True)
+        result.candidates = [BuildScore(build, scores[build]) for build in complete]
+
+        mc_settings = {**settings, 'timeline': timeline if isinstance(timeline, (int, str)) else timeline.name,
+                       'mc_iterations': mc_iterations, 'ci_target': ci_target}
+        for candidate in result.candidates[:top_k]:
+            key = ScoreCache.key('mc', candidate.talents, mc_settings)
+            cached = cache.get(key)
+            if cached is None:
+                profile = Profile(name=' '.join(candidate.talents), talents=list(candidate.talents),
+                                  player_kwargs=player_kwargs, timeline=timeline, policy=PriorityPolicy(priority))
+                mc = runner.run(profile, ci_target=ci_target, min_iterations=min(100, mc_iterations),
+                                max_iterations=mc_iterations, seed=seed)
+                cached = {'dps': mc.dps.mean, 'ci95': mc.dps.ci95, 'iterations': mc.iterations}
+                cache.put(key, cached)
+                result.simulated += 1
+            candidate.dps, candidate.ci95, candidate.iterations = cached['dps'], cached['ci95'], cached['iterations']
+            result.builds.append(candidate)
+        cache.save()
+    finally:
+        if owned:
+            runner.close()
+    result.builds.sort(key=lambda score: score.dps, reverse=True)
+    return result
@@ -0,0 +1,102 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from ppmonk.cli import main
+from ppmonk.sim.batch import completed_rows, load_manifest, make_job, run_batch
+from ppmonk.sim.montecarlo import MonteCarloRunner
+
+MANIFEST = {
+    'defaults': {'iterations': 6, 'scenario': 3, 'seed': 1},
+    'profiles': [
+        {'name': 'base', 'talents': ['WDP', 'SW']},
+        {'name': 'haste', 'talents': ['WDP', 'SW'], 'ratings': {'haste': 2500}},
+        {'name': '2h cleave', 'talents': ['WDP'], 'weapon_type': '2h', 'target_count': 3},
+        {'name': 'base again', 'talents': ['WDP', 'SW']},
+    ],
+}
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.manifest = os.path.join(self.tmp.name, 'manifest.json')
+        self.output = os.path.join(self.tmp.name, 'results.jsonl')
+        with open(self.manifest, 'w') as f:
+            json.dump(MANIFEST, f)
+        self.runner = MonteCarloRunner(n_workers=1, chunk_size=4)
+
+    def tearDown(self):
+        self.runner.close()
+        self.tmp.cleanup()
+
+    def read_output(self):
+        with open(self.output) as f:
+            return [json.loads(line) for line in f]
+
+    def test_manifest_validation(self):
+        jobs = load_manifest(self.manifest)
+        self.assertEqual(jobs[0].key, jobs[3].key)
+        self.assertNotEqual(jobs[0].key, jobs[1].key)
+        self.assertEqual(jobs[1].profile.player_kwargs, {'rating_haste': 2500})
+        self.assertEqual(jobs[2].profile.player_kwargs, {'weapon_type': '2h', 'target_count': 3})
+        with open(self.manifest, 'w') as f:
+            json.dump([{'talents': ['WDP'], 'haste': 2500}], f)
+        with self.assertRaises(ValueError):
+            load_manifest(self.manifest)
+
+    def test_named_timelines_are_keyed_by_contents(self):
+        spec = {'talents': ['WDP'], 'scenario': 'patchwerk_5min'}
+        key = make_job(spec).key
+        edited = {'patchwerk_5min': {'duration': 240, 'scenario': 0}}
+        with mock.patch('ppmonk.sim.batch.load_timeline_specs', return_value=edited):
+            self.assertNotEqual(make_job(spec).key, key)
+        with self.assertRaises(ValueError):
+            make_job({**spec, 'scenario': 'no_such_timeline'})
+
+    def test_streams_and_matches_single_runs(self):
+        seen = []
+        summary = run_batch(self.manifest, self.output, runner=self.runner, on_result=seen.append)
+        self.assertEqual((summary.completed, summary.skipped, summary.simulated), (4, 0, 3))
+        records = self.read_output()
+        # Identical profiles share one simulation but each name gets its row
+        self.assertEqual([r['name'] for r in records], ['base', 'base again', 'haste', '2h cleave'])
+        self.assertEqual(records[0]['dps'], records[1]['dps'])
+        self.assertEqual(records[1]['profile']['name'], 'base again')
+        self.assertEqual(seen, records)
+
+        job = load_manifest(self.manifest)[1]
+        single = self.runner.run(job.profile, max_iterations=job.iterations, seed=job.seed)
+        self.assertAlmostEqual(records[2]['dps'], single.dps.mean, places=6)
+        self.assertEqual(records[2]['iterations'], 6)
+
+    def test_resumes_after_crash(self):
+        run_batch(self.manifest, self.output, runner=self.runner)
+        with open(self.output) as f:
+            lines = f.readlines()
+        # Crash while writing: 'base' survives, 'base again' is cut short
+        with open(self.output, 'w') as f:
+            f.write(lines[0] + lines[1][:20])
+        first = json.loads(lines[0])
+        self.assertEqual(set(completed_rows(self.output)), {(first['key'], 'base')})
+
+        summary = run_batch(self.manifest, self.output, runner=self.runner)
+        self.assertEqual((summary.completed, summary.skipped, summary.simulated), (3, 1, 2))
+        records = self.read_output()
+        self.assertEqual([r['name'] for r in records], ['base', 'base again', 'haste', '2h cleave'])
+        self.assertEqual(records[0], first)
+        self.assertEqual(records[1], json.loads(lines[1]))
+        self.assertEqual(records[2]['dps'], json.loads(lines[2])['dps'])
+
+        summary = run_batch(self.manifest, self.output, runner=self.runner)
+        self.assertEqual(summary.completed, 0)
+
+    def test_cli(self):
+        self.assertEqual(main(['batch', self.manifest, '--out', self.output, '--workers', '1', '--json']), 0)
+        self.assertEqual(len(self.read_output()), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
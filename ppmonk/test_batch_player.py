@@ -0,0 +1,76 @@
+import unittest
+
+import numpy as np
+
+from ppmonk.core.batch_player import BatchPlayerState
+from ppmonk.core.player import PlayerState
+from ppmonk.core.rng import CombatRng
+from ppmonk.core.spell_book import SpellBook
+from ppmonk.test_time_engine import BUILDS, ROTATION, play_rotation, run_rotation
+
+PROC_BUILD = ['1-1', '5-4', '7-3', '9-7', '2-1', '8-1', '4-1', '4-2', '4-3', '5-5', '6-5', '7-1', '9-2', '8-7']
+
+
+def run_batch_rotation(batch, duration=60.0):
+    """Vectorized twin of run_rotation: every monk walks ROTATION on its own clock."""
+    batch.known[batch.spell_index['Xuen']] = True
+    position = np.zeros(batch.n, dtype=np.int64)
+    t = np.zeros(batch.n)
+    while True:
+        alive = t < duration
+        if not alive.any():
+            break
+        step = np.where(alive, 0.5, 0.0)
+        wanted = position % len(ROTATION)
+        for slot in np.unique(wanted[alive]):
+            abbr = ROTATION[slot]
+            ready = alive & (wanted == slot) & (batch.current_cd(abbr) <= 0.01)
+            _, cast = batch.cast(abbr, ready)
+            if abbr in ('SCK', 'FOF'):
+                step[cast] = batch.cast_time(abbr)
+            else:
+                step[cast] = np.maximum(batch.gcd_remaining[cast], 0.1)
+        position[alive] += 1
+        batch.advance_time(step)
+        t += step
+    return batch.damage
+
+
+class TestBatchPlayerState(unittest.TestCase):
+    def test_expected_value_matches_scalar(self):
+        for event_driven in (False, True):
+            for target_count in (1, 8):
+                with self.subTest(event_driven=event_driven, targets=target_count):
+                    scalar_total, _, _ = run_rotation(BUILDS['default'], event_driven, target_count)
+                    batch = BatchPlayerState(3, BUILDS['default'], use_expected_value=True, target_count=target_count,
+                                             event_driven=event_driven)
+                    totals = run_batch_rotation(batch)
+                    np.testing.assert_allclose(totals, scalar_total, rtol=1e-9)
+
+    def test_stochastic_means_agree_with_scalar(self):
+        duration = 30.0
+        scalar = []
+        for seed in range(150):
+            player = PlayerState(event_driven=True, detail_level='none')
+            player.rng = CombatRng(seed)
+            book = SpellBook(talents=PROC_BUILD)
+            book.apply_talents(player)
+            book.spells['Xuen'].is_known = True
+            total, _ = play_rotation(player, book, duration, {}, use_expected_value=False)
+            scalar.append(total)
+        scalar = np.array(scalar)
+
+        batch = BatchPlayerState(1500, PROC_BUILD, seed=11, event_driven=True)
+        totals = run_batch_rotation(batch, duration)
+
+        self.assertGreater(totals.std(), 0.0)
+        stderr = np.hypot(scalar.std(ddof=1) / np.sqrt(scalar.size), totals.std(ddof=1) / np.sqrt(totals.size))
+        self.assertLess(abs(scalar.mean() - totals.mean()), 4.0 * stderr)
+
+    def test_hero_talents_are_rejected(self):
+        with self.assertRaises(ValueError):
+            BatchPlayerState(4, BUILDS['shado_pan'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import json
+import os
+import tempfile
+import unittest
+
+from benchmarks.__main__ import main
+from benchmarks.cases import BUILDS, all_cases
+from benchmarks.harness import compare, load_report
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_cases_cover_every_build_and_subsystem(self):
+        names = [case.name for case in all_cases()]
+        self.assertEqual(len(names), len(set(names)))
+        for build in BUILDS:
+            for subsystem in ('advance_time', 'spellbook', 'env_reset', 'env_step', 'episode_60s'):
+                self.assertIn(f'{subsystem}/{build}', names)
+            self.assertIn(f'spell_cast/{build}/RSK', names)
+
+    def test_report_and_regression_check(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            baseline_path, current_path = os.path.join(tmp, 'baseline.json'), os.path.join(tmp, 'current.json')
+            args = ['-k', 'spellbook/default|advance_time/default', '--quick']
+            self.assertEqual(main(args + ['--out', baseline_path]), 0)
+            baseline = load_report(baseline_path)
+            self.assertEqual(set(baseline['results']), {'spellbook/default', 'advance_time/default'})
+            self.assertGreater(baseline['results']['spellbook/default']['us_per_unit']['median'], 0.0)
+
+            # A baseline ten times faster than anything this machine can do
+            for result in baseline['results'].values():
+                result['us_per_unit']['median'] /= 10.0
+            with open(baseline_path, 'w') as f:
+                json.dump(baseline, f)
+            self.assertEqual(main(args + ['--out', current_path, '--compare', baseline_path]), 1)
+
+            rows, added, removed = compare(load_report(current_path), baseline)
+            self.assertTrue(all(row.status(0.1) == 'REGRESSION' for row in rows))
+            self.assertEqual((added, removed), ([], []))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+try:
+    from ppmonk.core.callbacks import TrainingControlCallback
+except ImportError:
+    TrainingControlCallback = None
+
+
+@unittest.skipIf(TrainingControlCallback is None, 'stable-baselines3 is not installed')
+class TestPlateauStopping(unittest.TestCase):
+    def run_callback(self, rewards, patience=2):
+        rewards = iter(rewards)
+        callback = TrainingControlCallback(100000, None, None, eval_fn=lambda model: next(rewards),
+                                           eval_freq=10, patience=patience)
+        callback.model = None  # Normally set by init_callback; eval_fn ignores it here
+        callback._on_training_start()
+        steps = 0
+        while steps < 1000:
+            steps += 1
+            callback.n_calls, callback.num_timesteps = steps, steps
+            if not callback._on_step():
+                break
+        return callback, steps
+
+    def test_stops_once_reward_plateaus(self):
+        callback, steps = self.run_callback([100.0, 120.0, 130.0, 130.2, 129.0] + [0.0] * 100)
+        self.assertTrue(callback.plateaued)
+        self.assertEqual(steps, 40)
+        self.assertEqual(callback.best_reward, 130.0)
+
+    def test_keeps_training_while_improving(self):
+        callback, steps = self.run_callback([float(i) * 100 + 1 for i in range(200)])
+        self.assertFalse(callback.plateaued)
+        self.assertEqual(steps, 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import contextlib
+import io
+import json
+import subprocess
+import sys
+import time
+import unittest
+
+from ppmonk.cli import COLD_START_BUDGET, main
+
+HEAVY = ('torch', 'stable_baselines3', 'sb3_contrib', 'gymnasium')
+
+
+def loaded_after(statement):
+    code = f"import sys; {statement}; print(' '.join(sorted(sys.modules)))"
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    return set(out.splitlines()[-1].split())
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_light_entry_points_skip_the_rl_stack(self):
+        modules = loaded_after('import ppmonk, ppmonk.core, ppmonk.core.callbacks, ppmonk.envs, ppmonk.sim, main')
+        self.assertFalse(modules & set(HEAVY))
+        self.assertNotIn('numpy', loaded_after('import ppmonk.core.player, ppmonk.core.spell_book'))
+
+    def test_exports_resolve_on_access(self):
+        import ppmonk.core
+        import ppmonk.sim
+        from ppmonk.core.player import PlayerState
+        from ppmonk.sim.montecarlo import Profile
+
+        self.assertIs(ppmonk.core.Player, PlayerState)
+        self.assertIs(ppmonk.sim.Profile, Profile)
+        self.assertIn('stat_weights', dir(ppmonk.sim))
+        with self.assertRaises(AttributeError):
+            ppmonk.sim.missing
+
+
+class TestCli(unittest.TestCase):
+    def test_cold_start_budget(self):
+        timings = []
+        for _ in range(3):
+            started = time.perf_counter()
+            out = subprocess.run([sys.executable, '-m', 'ppmonk', '--version'], capture_output=True, text=True,
+                                 check=True).stdout
+            timings.append(time.perf_counter() - started)
+        self.assertTrue(out.startswith('ppmonk engine'))
+        self.assertLess(min(timings), COLD_START_BUDGET)
+        self.assertFalse(loaded_after("from ppmonk.cli import main; main(['--version'])") & {'numpy', *HEAVY})
+
+    def test_sim_json(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            code = main(['sim', '--iterations', '4', '--workers', '1', '--stat', 'rating_haste=1800', '--json'])
+        self.assertEqual(code, 0)
+        result = json.loads(out.getvalue())
+        self.assertEqual(result['iterations'], 4)
+        self.assertGreater(result['dps'], 0.0)
+        self.assertIn('RSK', result['damage_meter'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+
+import numpy as np
+
+from ppmonk.core import mechanics
+
+
+class TestMechanics(unittest.TestCase):
+    def test_arrays_broadcast_like_scalars(self):
+        zenith = np.array([False, True, False, True])
+        momentum = np.array([False, False, True, True])
+        speeds = mechanics.swing_speed(0.2, momentum, True, zenith)
+        for i in range(4):
+            self.assertEqual(speeds[i], mechanics.swing_speed(0.2, bool(momentum[i]), True, bool(zenith[i])))
+        np.testing.assert_array_equal(mechanics.weapon_of_wind_mult(zenith), [1.0, 1.10, 1.0, 1.10])
+        self.assertEqual(mechanics.weapon_of_wind_mult(True), mechanics.WEAPON_OF_WIND)
+
+    def test_tick_teb(self):
+        timers, stacks = mechanics.tick_teb(np.array([5.0, 0.005, 0.005]), np.array([3, 3, 20]), 0.01)
+        np.testing.assert_allclose(timers, [4.99, 7.995, 7.995])
+        np.testing.assert_array_equal(stacks, [3, 4, 20])
+        self.assertEqual(mechanics.tick_teb(0.005, 20, 0.01), (0.005 - 0.01 + mechanics.TEB_INTERVAL, 20))
+
+    def test_soft_cap_scale(self):
+        self.assertEqual(mechanics.soft_cap_scale(5), 1.0)
+        self.assertAlmostEqual(mechanics.soft_cap_scale(20), 0.5)
+        self.assertAlmostEqual(mechanics.soft_cap_scale(16, cap=8), 0.5 ** 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
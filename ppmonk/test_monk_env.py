@@ -0,0 +1,117 @@
+import unittest
+
+import numpy as np
+
+from ppmonk.envs.monk_env import OBS_BURST, OBS_MAP, OBS_SCENARIO, MonkEnv, batch_action_masks
+from ppmonk.core.timeline import Timeline
+from ppmonk.test_time_engine import BUILDS
+
+
+class TestObservation(unittest.TestCase):
+    def setUp(self):
+        self.env = MonkEnv(current_talents=BUILDS['default'])
+        self.env.training_mode = False
+
+    def test_layout(self):
+        obs, _ = self.env.reset(options={'timeline': 3})
+        self.assertEqual(obs.shape, (38,))
+        self.assertEqual(obs.dtype, np.float32)
+        np.testing.assert_array_equal(obs[OBS_SCENARIO:OBS_SCENARIO + 4], [0, 0, 0, 1])
+        np.testing.assert_array_equal(obs[OBS_MAP:], self.env.timeline.global_map)
+        self.assertAlmostEqual(float(obs[OBS_BURST]), 16.0 / 20.0, places=6)
+
+        obs, *_ = self.env.step(3)
+        self.assertAlmostEqual(float(obs[OBS_BURST + 1]), 0.3, places=6)
+
+    def test_returned_observations_are_copies(self):
+        first, _ = self.env.reset(options={'timeline': 0})
+        kept = first.copy()
+        second, *_ = self.env.step(1)
+        np.testing.assert_array_equal(first, kept)
+        np.testing.assert_array_equal(second, self.env.last_obs)
+        self.assertIsNot(second, self.env.last_obs)
+
+    def test_buffer_is_reused_without_copies(self):
+        self.env.copy_obs = False
+        first, _ = self.env.reset(options={'timeline': 0})
+        second, *_ = self.env.step(1)
+        self.assertIs(first, second)
+        self.assertIs(second, self.env.last_obs)
+
+
+class TestActionMasks(unittest.TestCase):
+    def setUp(self):
+        self.env = MonkEnv(current_talents=BUILDS['default'])
+        self.env.training_mode = False
+        self.env.reset(options={'timeline': 0})
+
+    def expected(self):
+        env = self.env
+        masks = [True]
+        for key in env.spell_keys:
+            spell = env.book.spells[key]
+            masks.append(spell.abbr != env.player.last_spell_name and spell.is_usable(env.player, env.book.spells))
+        return masks
+
+    def test_tracks_state_changes(self):
+        policy = np.random.default_rng(2)
+        done = False
+        while not done:
+            masks = self.env.action_masks()
+            self.assertEqual(masks.dtype, np.bool_)
+            self.assertEqual(masks.tolist(), self.expected())
+            _, _, done, _, _ = self.env.step(int(policy.choice(np.flatnonzero(masks))))
+        self.assertFalse(self.env.action_masks().any())
+
+    def test_cached_between_queries(self):
+        first = self.env.action_masks()
+        key = self.env._mask_key
+        self.assertIs(self.env.action_masks(), first)
+        self.assertEqual(self.env._mask_key, key)
+        self.env.step(2)
+        self.assertFalse(self.env.action_masks()[2])
+
+    def test_batch(self):
+        envs = [self.env, MonkEnv(current_talents=BUILDS['default'])]
+        envs[1].reset(seed=1)
+        out = batch_action_masks(envs)
+        self.assertEqual(out.shape, (2, 10))
+        np.testing.assert_array_equal(out[1], envs[1].action_masks())
+
+
+
+class TestPhaseSplitting(unittest.TestCase):
+    def setUp(self):
+        self.env = MonkEnv(current_talents=BUILDS['default'])
+        self.env.training_mode = False
+
+    def test_advance_is_split_at_the_execute_boundary(self):
+        env = self.env
+        env.reset(options={'timeline': 3})
+        env.step(5)  # FOF channel running
+        env.time = 15.0
+        state = (env.player.snapshot(), env.book.snapshot())
+
+        damage, _ = env._advance_time_with_mod(2.0)
+        self.assertEqual(env.time, 17.0)
+
+        env.player.restore(state[0])
+        env.book.restore(state[1])
+        before, _ = env.player.advance_time(1.0)
+        env.book.tick(1.0)
+        after, _ = env.player.advance_time(1.0)
+        self.assertGreater(after, 0.0)
+        self.assertAlmostEqual(damage, before + 3.0 * after)
+
+    def test_target_count_phases(self):
+        env = self.env
+        timeline = Timeline(spec={'duration': 60, 'targets': [{'start': 10, 'end': 20, 'count': 5}]})
+        env.reset(options={'timeline': timeline})
+        env._advance_time_with_mod(12.0)
+        self.assertEqual(env.player.target_count, 5)
+        env._advance_time_with_mod(10.0)
+        self.assertEqual(env.player.target_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+import numpy as np
+
+from ppmonk.sim.montecarlo import MonteCarloRunner, Profile, RunningStats, run_monte_carlo
+from ppmonk.test_time_engine import BUILDS
+
+
+class TestRunningStats(unittest.TestCase):
+    def test_matches_numpy_after_merge(self):
+        values = np.random.default_rng(0).normal(1000.0, 50.0, 301)
+        left, right = RunningStats(), RunningStats()
+        for v in values[:120]:
+            left.push(v)
+        for v in values[120:]:
+            right.push(v)
+        left.merge(right)
+        self.assertEqual(left.count, 301)
+        self.assertAlmostEqual(left.mean, values.mean(), places=9)
+        self.assertAlmostEqual(left.variance, values.var(ddof=1), places=6)
+
+
+class TestMonteCarlo(unittest.TestCase):
+    def setUp(self):
+        self.profile = Profile('default', BUILDS['default'], timeline=3)
+
+    def test_results_do_not_depend_on_worker_count(self):
+        serial = run_monte_carlo(self.profile, n_workers=1, chunk_size=4, max_iterations=12, seed=7)
+        pooled = run_monte_carlo(self.profile, n_workers=2, chunk_size=4, max_iterations=12, seed=7)
+        self.assertEqual(serial.iterations, 12)
+        self.assertGreater(serial.dps.std, 0.0)
+        self.assertEqual(serial.dps, pooled.dps)
+        self.assertEqual(serial.meter.keys(), pooled.meter.keys())
+        self.assertEqual(serial.meter['RSK'], pooled.meter['RSK'])
+
+    def test_stops_at_ci_target(self):
+        with MonteCarloRunner(n_workers=1, chunk_size=5) as runner:
+            loose = runner.run(self.profile, ci_target=1e9, min_iterations=10, max_iterations=200)
+            capped = runner.run(self.profile, ci_target=1e-3, min_iterations=10, max_iterations=15)
+        self.assertTrue(loose.converged)
+        self.assertEqual(loose.iterations, 10)
+        self.assertFalse(capped.converged)
+        self.assertEqual(capped.iterations, 15)
+
+    def test_early_stop_cancels_chunks_in_flight(self):
+        with MonteCarloRunner(n_workers=2, chunk_size=200) as runner:
+            runner.run(self.profile, max_iterations=2)  # Pool start-up
+            stopped = runner.run(self.profile, ci_target=1e9, min_iterations=1, max_iterations=2000)
+            after = runner.run(self.profile, max_iterations=4, seed=3)
+        self.assertEqual(stopped.iterations, 200)
+        # The next run does not wait for the leftover chunks of the stopped one
+        self.assertLess(after.elapsed, stopped.elapsed / 2)
+        self.assertEqual(after.dps, run_monte_carlo(self.profile, n_workers=1, max_iterations=4, seed=3).dps)
+
+    def test_compare_ranks_profiles(self):
+        profiles = [Profile(name, BUILDS[name], timeline=0) for name in ('default', 'shado_pan')]
+        with MonteCarloRunner(n_workers=1, chunk_size=5) as runner:
+            results = runner.compare(profiles, max_iterations=5)
+        self.assertEqual(len(results), 2)
+        self.assertGreaterEqual(results[0].dps.mean, results[1].dps.mean)
+
+
+if __name__ == '__main__':
+    unittest.main()
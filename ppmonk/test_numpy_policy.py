@@ -0,0 +1,88 @@
+import importlib.util
+import os
+import pickle
+import tempfile
+import unittest
+
+import numpy as np
+
+from ppmonk.envs.monk_env import MonkEnv
+from ppmonk.sim.montecarlo import MonteCarloRunner, Profile
+from ppmonk.sim.numpy_policy import NumpyPolicy
+from ppmonk.test_time_engine import BUILDS
+
+HAS_SB3_CONTRIB = importlib.util.find_spec('sb3_contrib') is not None
+
+
+def random_policy(seed=0, obs_dim=38, hidden=16, n_actions=10):
+    rng = np.random.default_rng(seed)
+    layers = [(rng.normal(size=(obs_dim, hidden)), rng.normal(size=hidden)),
+              (rng.normal(size=(hidden, hidden)), rng.normal(size=hidden))]
+    return NumpyPolicy(layers, (rng.normal(size=(hidden, n_actions)), rng.normal(size=n_actions)))
+
+
+class TestNumpyPolicy(unittest.TestCase):
+    def setUp(self):
+        self.policy = random_policy()
+        self.env = MonkEnv(current_talents=BUILDS['default'])
+        self.env.training_mode = False
+
+    def test_masked_argmax(self):
+        obs, _ = self.env.reset(options={'timeline': 0})
+        done = False
+        while not done:
+            masks = self.env.action_masks()
+            action = self.policy(self.env)
+            self.assertIsInstance(action, int)
+            if masks.any():
+                self.assertTrue(masks[action])
+                logits = self.policy.logits(obs)
+                self.assertEqual(logits[action], logits[masks].max())
+            obs, _, done, _, _ = self.env.step(action)
+
+    def test_batch_matches_single(self):
+        rng = np.random.default_rng(1)
+        obs = rng.random((32, 38), dtype=np.float32)
+        masks = rng.random((32, 10)) < 0.5
+        masks[:, 0] = True
+        batch = self.policy.act(obs, masks)
+        self.assertEqual(batch.tolist(), [self.policy.act(o, m) for o, m in zip(obs, masks)])
+
+    def test_save_load_roundtrip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'policy.npz')
+            self.policy.save(path)
+            loaded = NumpyPolicy.load(path)
+        obs = np.random.default_rng(2).random((8, 38), dtype=np.float32)
+        np.testing.assert_array_equal(loaded.logits(obs), self.policy.logits(obs))
+        self.assertEqual((loaded.obs_dim, loaded.n_actions, loaded.activation), (38, 10, 'tanh'))
+
+    def test_monte_carlo_profile(self):
+        profile = Profile('numpy', BUILDS['default'], policy=pickle.loads(pickle.dumps(self.policy)))
+        with MonteCarloRunner(n_workers=1, chunk_size=2) as runner:
+            result = runner.run(profile, max_iterations=2)
+        self.assertEqual(result.iterations, 2)
+        self.assertGreater(result.dps.mean, 0.0)
+
+
+@unittest.skipUnless(HAS_SB3_CONTRIB, 'sb3-contrib is not installed')
+class TestExport(unittest.TestCase):
+    def test_matches_model_predict(self):
+        from sb3_contrib import MaskablePPO
+
+        env = MonkEnv(current_talents=BUILDS['default'])
+        env.training_mode = False
+        model = MaskablePPO('MlpPolicy', env, policy_kwargs={'net_arch': [32, 32]}, device='cpu', seed=0)
+        policy = NumpyPolicy.from_model(model)
+        rng = np.random.default_rng(3)
+        obs, _ = env.reset(seed=0, options={'timeline': 3})
+        done = False
+        while not done:
+            masks = env.action_masks().copy()
+            expected, _ = model.predict(obs, action_masks=masks, deterministic=True)
+            self.assertEqual(policy.act(obs, masks), int(expected))
+            obs, _, done, _, _ = env.step(int(rng.choice(np.flatnonzero(masks))))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import pickle
+import unittest
+
+from ppmonk.core.profiler import Profiler
+from ppmonk.core.timeline import Timeline
+from ppmonk.sim.montecarlo import MonteCarloRunner, PriorityPolicy, Profile, make_env, run_episode
+from ppmonk.test_time_engine import BUILDS
+
+SHORT = Timeline(spec={'name': '20s', 'duration': 20.0, 'scenario': 0})
+
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.profile = Profile('shado_pan', BUILDS['shado_pan'], timeline=SHORT, policy=PriorityPolicy())
+
+    def test_counts_subsystems_without_changing_results(self):
+        env = make_env(self.profile)
+        plain = run_episode(env, self.profile, 3)
+        self.assertIsNone(env.player.profiler)
+
+        profiler = Profiler()
+        env.profiler = profiler
+        self.assertEqual(run_episode(env, self.profile, 3), plain)
+        self.assertIs(env.player.profiler, profiler)
+        self.assertEqual(profiler.episodes, 1)
+        for name in ('env_step', 'advance_time', 'auto_attack', 'channel_tick', 'cast', 'tick_damage',
+                     'proc.flurry_strikes', 'spellbook_tick', 'action_masks', 'obs_encoding'):
+            self.assertGreater(profiler.count(name), 0, name)
+        self.assertEqual(profiler.count('cast'), profiler.count('env_step'))
+        self.assertLessEqual(profiler.seconds('advance_time'), profiler.seconds('env_step'))
+        self.assertIn('auto_attack', profiler.summary())
+
+    def test_sink_dumps_every_episode(self):
+        dumps = []
+        env = make_env(self.profile)
+        env.profiler = Profiler(sink=dumps.append)
+        for seed in range(2):
+            run_episode(env, self.profile, seed)
+        self.assertEqual(len(dumps), 2)
+        self.assertTrue(dumps[1].startswith('episode 2'))
+        self.assertEqual(env.profiler.stats, {})
+
+        copy = pickle.loads(pickle.dumps(env.profiler))
+        self.assertIsNone(copy.sink)
+
+    def test_monte_carlo_merges_chunks(self):
+        with MonteCarloRunner(n_workers=1, chunk_size=2, profiling=True) as runner:
+            result = runner.run(self.profile, max_iterations=5)
+        self.assertEqual(result.profiler.episodes, 5)
+        self.assertGreater(result.profiler.count('auto_attack'), 0)
+        with MonteCarloRunner(n_workers=1) as runner:
+            self.assertIsNone(runner.run(self.profile, max_iterations=2).profiler)
+
+
+if __name__ == '__main__':
+    unittest.main()
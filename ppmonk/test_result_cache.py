@@ -0,0 +1,110 @@
+import os
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from ppmonk.utils.result_cache import ResultCache, cache_key
+
+
+class TestCacheKey(unittest.TestCase):
+    def test_covers_the_configuration(self):
+        base = cache_key(['WDP', 'SW'], {'rating_haste': 1500.0}, 0, 1)
+        self.assertEqual(base, cache_key(['WDP', 'SW', 'WDP'], {'rating_haste': 1500.0}, 0, 1))
+        self.assertNotEqual(base, cache_key(['SW', 'WDP'], {'rating_haste': 1500.0}, 0, 1))
+        self.assertNotEqual(base, cache_key(['WDP', 'SW'], {'rating_haste': 1501.0}, 0, 1))
+        self.assertNotEqual(base, cache_key(['WDP', 'SW'], {'rating_haste': 1500.0}, 3, 1))
+        self.assertNotEqual(base, cache_key(['WDP', 'SW'], {'rating_haste': 1500.0}, 0, 2))
+        self.assertNotEqual(base, cache_key(['WDP', 'SW'], {'rating_haste': 1500.0}, 0, 1, extra={'total_steps': 10}))
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(os.path.join(self.tmp.name, 'results'), max_bytes=10_000)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_roundtrip(self):
+        def save_policy(path):
+            with open(path, 'wb') as f:
+                f.write(b'policy')
+
+        self.assertIsNone(self.cache.get('a'))
+        self.cache.put('a', {'total_ap': np.float64(1.5), 'damage_meter': {'RSK': 2.0}}, save_policy)
+        self.assertIn('a', self.cache)
+        self.assertEqual(self.cache.get('a'), {'total_ap': 1.5, 'damage_meter': {'RSK': 2.0}})
+        with open(self.cache.policy_path('a'), 'rb') as f:
+            self.assertEqual(f.read(), b'policy')
+        self.assertEqual(os.listdir(self.cache.root), ['a'])
+
+    def test_lru_eviction(self):
+        blob = {'log': ['x' * 3000]}
+        for key in 'abc':
+            self.cache.put(key, blob)
+            time.sleep(0.02)
+        self.cache.get('a')  # Now the most recently used
+        self.cache.put('d', blob)
+        self.assertEqual({key for key, _, _ in self.cache.entries()}, {'a', 'c', 'd'})
+        self.assertLessEqual(self.cache.size(), self.cache.max_bytes)
+
+    def test_nearest_policy(self):
+        def save_policy(path):
+            open(path, 'wb').close()
+
+        match = {'talents': ['WDP', 'SW'], 'scenario': 0, 'target_count': 1}
+        for key, haste, talents in (('near', 1600.0, ['WDP', 'SW']), ('far', 3000.0, ['WDP', 'SW']),
+                                    ('other', 1500.0, ['SW'])):
+            meta = {**match, 'talents': talents, 'stats': {'rating_haste': haste, 'rating_crit': 2000.0}}
+            self.cache.put(key, {}, save_policy, meta=meta)
+        self.cache.put('no-policy', {}, meta={**match, 'stats': {'rating_haste': 1500.0, 'rating_crit': 2000.0}})
+
+        stats = {'rating_haste': 1500.0, 'rating_crit': 2000.0}
+        self.assertEqual(self.cache.nearest(match, stats), ('near', 100.0))
+        self.assertIsNone(self.cache.nearest(match, stats, max_distance=50.0))
+        self.assertIsNone(self.cache.nearest({**match, 'scenario': 3}, stats))
+
+    def test_run_simulation_hit_skips_training(self):
+        from main import SCENARIO_MAP, run_simulation
+
+        talents = ['WDP', 'SW']
+        player_kwargs = {'rating_haste': 1500.0, 'rating_crit': 2000.0, 'rating_mastery': 1000.0,
+                         'rating_vers': 500.0, 'target_count': 1}
+        key = cache_key(talents, player_kwargs, SCENARIO_MAP['Patchwerk'], 1, extra={'total_steps': 1000000})
+        self.cache.put(key, {'total_ap': 123.0, 'timeline_data': {}, 'damage_meter': {}, 'log': ['line']})
+
+        lines = []
+        result = run_simulation(talents=talents, log_callback=lines.append, result_cache=self.cache)
+        self.assertEqual(result['total_ap'], 123.0)
+        self.assertTrue(result['cached'])
+        self.assertEqual(lines[0], 'line')
+
+    def test_run_simulation_fine_tunes_have_their_own_key(self):
+        from main import SCENARIO_MAP, WARM_START_STEPS, run_simulation
+
+        def save_policy(path):
+            open(path, 'wb').close()
+
+        talents = ['WDP', 'SW']
+        stats = {'rating_haste': 1500.0, 'rating_crit': 2000.0, 'rating_mastery': 1000.0, 'rating_vers': 500.0}
+        scenario = SCENARIO_MAP['Patchwerk']
+        match = {'talents': talents, 'scenario': scenario, 'target_count': 1}
+        self.cache.put('cold', {}, save_policy, meta={**match, 'stats': {**stats, 'rating_haste': 1600.0},
+                                                       'warm_start_from': None})
+        # A closer fine-tune is not a warm-start source
+        self.cache.put('fine-tune', {}, save_policy, meta={**match, 'stats': stats, 'warm_start_from': 'cold'})
+        player_kwargs = {**stats, 'target_count': 1}
+        key = cache_key(talents, player_kwargs, scenario, 1,
+                        extra={'total_steps': WARM_START_STEPS, 'warm_start_from': 'cold'})
+        self.assertNotEqual(key, cache_key(talents, player_kwargs, scenario, 1, extra={'total_steps': 1000000}))
+        self.cache.put(key, {'total_ap': 7.0, 'log': []})
+
+        result = run_simulation(talents=talents, log_callback=None, result_cache=self.cache)
+        self.assertEqual(result['total_ap'], 7.0)
+        self.assertTrue(result['cached'])
+
+
+if __name__ == '__main__':
+    unittest.main()
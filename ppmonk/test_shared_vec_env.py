@@ -0,0 +1,77 @@
+import importlib.util
+import unittest
+
+import numpy as np
+
+from ppmonk.envs.monk_env import MonkEnv
+from ppmonk.test_time_engine import BUILDS
+
+HAS_SB3 = importlib.util.find_spec('stable_baselines3') is not None
+
+
+@unittest.skipUnless(HAS_SB3, 'stable-baselines3 is not installed')
+class TestSharedMemoryMonkVecEnv(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        from ppmonk.envs.shared_vec_env import SharedMemoryMonkVecEnv
+
+        # Worker start-up dominates, so the pool is shared; every test starts with reset()
+        cls.vec = SharedMemoryMonkVecEnv(4, n_workers=4, seed=3, current_talents=BUILDS['default'], timeline=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.vec.close()
+
+    def tearDown(self):
+        self.vec.return_infos = False
+
+    def test_matches_in_process_envs(self):
+        # One env per worker; a seeded reset fixes each env's CombatRng from seed + env index,
+        # and auto-resets continue from the env's own generator
+        solo = [MonkEnv(seed_offset=3 + i, current_talents=BUILDS['default'], timeline=0) for i in range(4)]
+
+        self.vec.seed(3)
+        obs = self.vec.reset()
+        np.testing.assert_array_equal(obs, np.stack([env.reset(seed=3 + i)[0] for i, env in enumerate(solo)]))
+
+        policy = np.random.default_rng(0)
+        for _ in range(30):
+            masks = np.stack(self.vec.env_method('action_masks'))
+            np.testing.assert_array_equal(masks, np.stack([env.action_masks() for env in solo]))
+            actions = np.array([policy.choice(np.flatnonzero(row)) for row in masks])
+            obs, rewards, dones, infos = self.vec.step(actions)
+
+            expected = []
+            for i, env in enumerate(solo):
+                result = env.step(int(actions[i]))
+                if result[2]:
+                    result = (env.reset()[0], *result[1:])
+                expected.append((result[0].copy(), *result[1:]))
+            np.testing.assert_array_equal(obs, np.stack([e[0] for e in expected]))
+            np.testing.assert_array_equal(dones, [e[2] for e in expected])
+            np.testing.assert_allclose(rewards, np.array([e[1] for e in expected], dtype=np.float32))
+            for info, done in zip(infos, dones):
+                self.assertEqual(set(info), {'TimeLimit.truncated', 'terminal_observation'} if done else set())
+
+    def test_infos_on_request_and_auto_reset(self):
+        self.vec.reset()
+        self.vec.return_infos = True
+        self.vec.set_attr('time', 60.0, indices=[2])
+        _, _, dones, infos = self.vec.step(np.zeros(4, dtype=np.int64))
+
+        self.assertEqual(dones.tolist(), [False, False, True, False])
+        self.assertTrue(all('damage' in info for info in infos))
+        self.assertIn('terminal_observation', infos[2])
+        self.assertLess(self.vec.get_attr('time', indices=[2])[0], 20.0)
+
+    def test_worker_errors_are_raised(self):
+        self.vec.reset()
+        with self.assertRaises(RuntimeError):
+            self.vec.env_method('no_such_method')
+        # The pool keeps working afterwards
+        self.assertEqual(len(self.vec.env_method('action_masks', indices=[0, 1])), 2)
+        self.vec.step(np.zeros(4, dtype=np.int64))
+
+
+if __name__ == '__main__':
+    unittest.main()
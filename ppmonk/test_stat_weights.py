@@ -0,0 +1,45 @@
+import math
+import unittest
+
+from ppmonk.sim.montecarlo import MonteCarloRunner, Profile, RunningStats
+from ppmonk.sim.stat_weights import StatWeight, _normalize, independent_error, stat_weights
+from ppmonk.test_time_engine import BUILDS
+
+
+class TestStatWeights(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with MonteCarloRunner(n_workers=1, chunk_size=6) as runner:
+            cls.result = stat_weights(Profile('default', BUILDS['default']), runner=runner, max_iterations=12)
+
+    def test_agility_scales_all_damage(self):
+        agility = self.result.weights['agility']
+        # Damage is linear in agility, so the paired difference has no noise at all
+        self.assertAlmostEqual(agility.weight, self.result.base.mean / 2000.0, delta=1e-6 * agility.weight)
+        self.assertEqual(agility.normalized, 1.0)
+
+    def test_common_random_numbers_shrink_errors(self):
+        independent = independent_error(self.result)
+        for stat in ('rating_mastery', 'rating_vers'):
+            weight = self.result.weights[stat]
+            self.assertGreater(weight.weight, 0.0)
+            self.assertLess(weight.error, independent[stat] / 3.0)
+
+    def test_reference_must_be_perturbed(self):
+        with self.assertRaises(ValueError):
+            stat_weights(Profile(), deltas={'rating_crit': 100.0}, reference='agility')
+
+    def test_zero_reference_weight(self):
+        gains = {stat: RunningStats() for stat in ('agility', 'rating_crit', 'rating_vers')}
+        for values in ((0.0, 0.0, 0.0), (0.0, 4.0, 0.0)):
+            for gain, value in zip(gains.values(), values):
+                gain.push(value)
+        weights = {stat: StatWeight(stat, 1.0, gain) for stat, gain in gains.items()}
+        _normalize(weights, 'agility')
+        for stat in ('rating_crit', 'rating_vers'):
+            self.assertTrue(math.isnan(weights[stat].normalized))
+            self.assertTrue(math.isnan(weights[stat].normalized_error))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+
+from ppmonk.core.talents import TALENT_DB
+from ppmonk.sim.montecarlo import MonteCarloRunner
+from ppmonk.sim.talent_optimizer import build_points, ev_dps, hero_options, is_legal, optimize_talents
+
+
+class TestBuildLegality(unittest.TestCase):
+    def test_gating(self):
+        self.assertTrue(is_legal(['1-1', '2-1', '3-2']))
+        self.assertFalse(is_legal(['2-1']))  # Parent 1-1 missing
+        self.assertFalse(is_legal(['1-1', '2-1', '3-2'], points=3))  # Ferociousness has two ranks
+
+    def test_choices_and_hero_trees(self):
+        self.assertFalse(is_legal(['1-1', '2-1', '3-1_b']))  # Not a choice node
+        self.assertFalse(is_legal(['hero-sp-header', 'hero-cotc-header']))
+        options = hero_options()
+        self.assertIn((), options)
+        self.assertEqual(len(options), len(set(options)))
+        for option in options:
+            self.assertTrue(is_legal(option, points=0))
+            self.assertTrue(all(key in TALENT_DB for key in option))
+
+    def test_ev_score_is_deterministic(self):
+        self.assertEqual(ev_dps(['1-1'], duration=10.0), ev_dps(['1-1'], duration=10.0))
+        self.assertGreater(ev_dps([], duration=10.0), 0.0)
+
+
+class TestOptimizer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.tmp.name, 'scores.json')
+        self.runner = MonteCarloRunner(n_workers=1, chunk_size=4)
+
+    def tearDown(self):
+        self.runner.close()
+        self.tmp.cleanup()
+
+    def optimize(self):
+        return optimize_talents(points=6, beam_width=3, top_k=2, duration=10.0, mc_iterations=4,
+                                runner=self.runner, cache_path=self.cache_path)
+
+    def test_search_and_refinement(self):
+        result = self.optimize()
+        self.assertEqual(len(result.builds), 2)
+        self.assertGreaterEqual(result.builds[0].dps, result.builds[1].dps)
+        self.assertEqual(result.simulated, 2)
+        for score in result.candidates:
+            self.assertTrue(is_legal(score.talents, points=6))
+            self.assertLessEqual(build_points(score.talents), 6)
+            self.assertTrue(all(key in TALENT_DB for key in score.talents))
+        evs = [score.ev_dps for score in result.candidates]
+        self.assertEqual(evs, sorted(evs, reverse=True))
+
+    def test_rerun_uses_cache(self):
+        first = self.optimize()
+        self.assertGreater(first.evaluated, 0)
+        second = self.optimize()
+        self.assertEqual((second.evaluated, second.simulated), (0, 0))
+        self.assertEqual(second.cached, first.evaluated + first.cached)
+        self.assertEqual([s.talents for s in second.builds], [s.talents for s in first.builds])
+        self.assertEqual([s.dps for s in second.builds], [s.dps for s in first.builds])
+
+
+if __name__ == '__main__':
+    unittest.main()
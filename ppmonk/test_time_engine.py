@@ -0,0 +1,280 @@
+import unittest
+
+from ppmonk.core.damage_window import DamageWindow
+from ppmonk.core.player import PlayerState
+from ppmonk.core.rng import CombatRng
+from ppmonk.core.spell_book import SpellBook
+from ppmonk.core.talent_profile import get_talent_profile
+
+BUILDS = {
+    'default': ['1-1', '5-4', '7-3', '9-7', '2-1', '8-1', '9-4', '9-8', '10-5'],
+    'shado_pan': ['1-1', '5-4', '7-3_b', '9-7', 'hero-sp-header', 'hero-sp-choice1', '8-1', '9-4', '9-5', '4-1'],
+    'cotc': ['1-1', '5-4', '7-3_b', '9-7', 'hero-cotc-header', 'hero-cotc-choice2', '2-1', '9-8', '8-1'],
+}
+ROTATION = ['Zenith', 'TP', 'RSK', 'FOF', 'TP', 'BOK', 'SOTWL', 'WDP', 'TP', 'SCK', 'BOK', 'Xuen', 'Conduit', 'TP', 'RSK', 'SW', 'BOK']
+
+
+def run_rotation(talents, event_driven, target_count=1, duration=60.0, seed=7, detail_level='full', use_profile=False):
+    player_kwargs = {'target_count': target_count, 'event_driven': event_driven, 'detail_level': detail_level}
+    if use_profile:
+        player, book = get_talent_profile(talents, player_kwargs).instantiate()
+    else:
+        player = PlayerState(**player_kwargs)
+        book = SpellBook(talents=talents)
+        book.apply_talents(player)
+    player.rng = CombatRng(seed)
+    book.spells['Xuen'].is_known = True
+
+    meter = {}
+    total, _ = play_rotation(player, book, duration, meter)
+    return total, meter, player
+
+
+def play_rotation(player, book, duration, meter, start=0, use_expected_value=True):
+    total = 0.0
+    t = 0.0
+    i = start
+    while t < duration:
+        spell = book.spells[ROTATION[i % len(ROTATION)]]
+        i += 1
+        step = 0.5
+        if spell.is_usable(player, book.spells) and spell.current_cd <= 0.01:
+            dmg, _ = spell.cast(player, other_spells=book.spells, damage_meter=meter, use_expected_value=use_expected_value)
+            total += dmg
+            step = spell.get_effective_cast_time(player) if spell.is_channeled else max(player.gcd_remaining, 0.1)
+        dmg, _ = player.advance_time(step, damage_meter=meter, use_expected_value=use_expected_value)
+        book.tick(step)
+        total += dmg
+        t += step
+    return total, i
+
+
+class TestEventDrivenEngine(unittest.TestCase):
+    def test_idle_time_matches_fixed_loop(self):
+        fixed = PlayerState()
+        events = PlayerState(event_driven=True)
+        fixed_dmg, fixed_logs = fixed.advance_time(60.0, use_expected_value=True)
+        event_dmg, event_logs = events.advance_time(60.0, use_expected_value=True)
+
+        self.assertAlmostEqual(fixed_dmg, event_dmg, delta=fixed_dmg * 1e-9)
+        self.assertEqual(len(fixed_logs), len(event_logs))
+        self.assertAlmostEqual(fixed.swing_timer, events.swing_timer, places=6)
+        self.assertAlmostEqual(fixed.energy, events.energy, places=6)
+
+    def test_energy_regenerates_lazily(self):
+        player = PlayerState(rating_haste=0, event_driven=True)
+        player.energy = 20.0
+        player.advance_time(3.0)
+        self.assertAlmostEqual(player.energy, 50.0, places=6)
+
+        player.energy -= 45.0
+        player.rating_haste = 4400
+        player.update_stats()
+        player.advance_time(1.0)
+        self.assertAlmostEqual(player.energy, 5.0 + 20.0, places=6)
+
+        player.advance_time(30.0)
+        self.assertEqual(player.energy, player.max_energy)
+
+    def test_rotations_match_fixed_loop(self):
+        for name, talents in BUILDS.items():
+            for target_count in (1, 8):
+                with self.subTest(build=name, targets=target_count):
+                    fixed_total, fixed_meter, fixed_player = run_rotation(talents, False, target_count)
+                    event_total, event_meter, event_player = run_rotation(talents, True, target_count)
+
+                    # The fixed loop only resolves buff/proc timers on a 0.01s grid, so allow for that quantization
+                    self.assertAlmostEqual(fixed_total, event_total, delta=fixed_total * 1e-3)
+                    self.assertEqual(set(fixed_meter), set(event_meter))
+                    self.assertEqual(fixed_player.chi, event_player.chi)
+                    self.assertAlmostEqual(fixed_player.simulation_time, event_player.simulation_time, places=5)
+
+
+    def test_detail_levels_do_not_change_damage(self):
+        talents = BUILDS['shado_pan']
+        full_total, full_meter, _ = run_rotation(talents, True, detail_level='full')
+        none_total, none_meter, _ = run_rotation(talents, True, detail_level='none')
+        self.assertEqual(full_total, none_total)
+        self.assertEqual(full_meter, none_meter)
+
+        player = PlayerState(event_driven=True, detail_level='none')
+        book = SpellBook(talents=talents)
+        book.apply_talents(player)
+        _, breakdown = book.spells['RSK'].cast(player, other_spells=book.spells)
+        self.assertIsNone(breakdown)
+        _, logs = player.advance_time(10.0)
+        self.assertEqual(logs, [])
+
+        player.detail_level = 'totals'
+        _, logs = player.advance_time(10.0)
+        self.assertTrue(logs)
+        self.assertTrue(all('Breakdown' not in entry for entry in logs))
+
+    def test_channel_ticks_are_logged_when_they_land(self):
+        ticks = []
+        for event_driven in (False, True):
+            player = PlayerState(event_driven=event_driven)
+            book = SpellBook(talents=BUILDS['default'])
+            book.apply_talents(player)
+            book.spells['FOF'].cast(player, other_spells=book.spells, use_expected_value=True)
+            _, logs = player.advance_time(5.0, use_expected_value=True)
+            ticks.append([entry['timestamp'] for entry in logs if entry['Action'] == 'FOF (Tick)'])
+        self.assertEqual(len(ticks[0]), len(ticks[1]))
+        for fixed, event in zip(*ticks):
+            self.assertAlmostEqual(fixed, event, delta=0.011)
+
+
+class TestTimestampCooldowns(unittest.TestCase):
+    def setUp(self):
+        self.player = PlayerState(event_driven=True)
+        self.book = SpellBook(talents=['1-1'])
+        self.book.apply_talents(self.player)
+
+    def advance(self, duration):
+        self.player.advance_time(duration)
+        self.book.tick(duration)
+
+    def test_zenith_charges_recharge_in_sequence(self):
+        zenith = self.book.spells['Zenith']
+        zenith.cast(self.player, other_spells=self.book.spells)
+        zenith.cast(self.player, other_spells=self.book.spells)
+        self.assertEqual(zenith.charges, 0)
+        self.assertAlmostEqual(zenith.current_cd, 90.0)
+
+        self.advance(60.0)
+        self.assertEqual(zenith.charges, 0)
+        self.assertAlmostEqual(zenith.current_cd, 30.0, places=6)
+
+        self.advance(40.0)
+        self.assertEqual(zenith.charges, 1)
+        self.assertAlmostEqual(zenith.current_cd, 80.0, places=6)
+
+        self.advance(80.0)
+        self.assertEqual(zenith.charges, 2)
+        self.assertEqual(zenith.current_cd, 0.0)
+
+    def test_jade_serpent_recovery_rate_is_piecewise(self):
+        rsk = self.book.spells['RSK']
+        rsk.cast(self.player, other_spells=self.book.spells)
+        rsk.current_cd = 20.0
+        self.player.jade_serpent_cdr_active = True
+        self.player.jade_serpent_cdr_duration = 8.0
+        self.player.cooldown_recovery_rate = 1.75
+
+        self.advance(10.0)
+        self.assertAlmostEqual(rsk.current_cd, 20.0 - (8.0 * 1.75 + 2.0), places=6)
+        self.assertFalse(self.player.jade_serpent_cdr_active)
+
+        self.advance(4.0)
+        self.assertEqual(rsk.charges, 1)
+        self.assertEqual(rsk.current_cd, 0.0)
+
+    def test_tick_without_advance_time(self):
+        rsk = self.book.spells['RSK']
+        rsk.cast(self.player, other_spells=self.book.spells)
+        rsk.current_cd = 10.0
+        self.book.tick(4.0)
+        self.assertAlmostEqual(rsk.current_cd, 6.0, places=6)
+        self.advance(2.0)  # The player clock catches up with the book's without skipping
+        self.assertAlmostEqual(rsk.current_cd, 4.0, places=6)
+
+        rsk.tick_cd(3.0, self.player)
+        self.assertAlmostEqual(rsk.current_cd, 1.0, places=6)
+        rsk.tick_cd(1.5)
+        self.assertEqual(rsk.charges, 1)
+        self.assertEqual(rsk.current_cd, 0.0)
+
+class TestTalentProfile(unittest.TestCase):
+    def test_profile_matches_fresh_build(self):
+        for name, talents in BUILDS.items():
+            with self.subTest(build=name):
+                fresh_total, fresh_meter, _ = run_rotation(talents, True)
+                # Run twice so the second episode comes from the cache after the first one mutated its copy
+                run_rotation(talents, True, use_profile=True)
+                cached_total, cached_meter, _ = run_rotation(talents, True, use_profile=True)
+                self.assertEqual(fresh_total, cached_total)
+                self.assertEqual(fresh_meter, cached_meter)
+
+    def test_instances_are_independent(self):
+        profile = get_talent_profile(BUILDS['default'], {'event_driven': True})
+        self.assertIs(profile, get_talent_profile(list(BUILDS['default']), {'event_driven': True}))
+
+        first_player, first_book = profile.instantiate()
+        second_player, second_book = profile.instantiate()
+        first_book.spells['RSK'].cast(first_player, other_spells=first_book.spells)
+        first_player.advance_time(5.0)
+        first_book.tick(5.0)
+
+        self.assertIs(second_book.spells['RSK'].clock, second_book.clock)
+        self.assertEqual(second_book.clock.now, 0.0)
+        self.assertEqual(second_book.spells['RSK'].current_cd, 0.0)
+        self.assertEqual(second_player.energy, second_player.max_energy)
+        self.assertEqual(second_player.simulation_time, 0.0)
+        self.assertEqual(len(second_player.recent_damage_window), 0)
+        self.assertIs(second_book.player, second_player)
+
+
+class TestSnapshotRestore(unittest.TestCase):
+    def test_restore_replays_identically(self):
+        for name, talents in BUILDS.items():
+            with self.subTest(build=name):
+                player = PlayerState(target_count=3, event_driven=True)
+                player.rng = CombatRng(3)
+                book = SpellBook(talents=talents)
+                book.apply_talents(player)
+                book.spells['Xuen'].is_known = True
+                _, index = play_rotation(player, book, 21.0, {})
+
+                checkpoint = (player.snapshot(), book.snapshot())
+                first_meter = {}
+                first_total, _ = play_rotation(player, book, 30.0, first_meter, start=index)
+                first_final = (player.snapshot(), book.snapshot())
+
+                player.restore(checkpoint[0])
+                book.restore(checkpoint[1])
+                self.assertEqual(player.snapshot(), checkpoint[0])
+                second_meter = {}
+                second_total, _ = play_rotation(player, book, 30.0, second_meter, start=index)
+
+                self.assertEqual(first_total, second_total)
+                self.assertEqual(first_meter, second_meter)
+                self.assertEqual((player.snapshot(), book.snapshot()), first_final)
+
+    def test_snapshot_is_detached_from_live_state(self):
+        player = PlayerState(event_driven=True)
+        book = SpellBook(talents=['1-1'])
+        book.apply_talents(player)
+        state = player.snapshot()
+        book_state = book.snapshot()
+
+        book.spells['Zenith'].cast(player, other_spells=book.spells)
+        player.energy = 10.0
+        player.record_damage(5000.0)
+        player.advance_time(2.0)
+        book.tick(2.0)
+
+        player.restore(state)
+        book.restore(book_state)
+        self.assertEqual(player.energy, player.max_energy)
+        self.assertEqual(player.simulation_time, 0.0)
+        self.assertEqual(player.get_damage_last_4s(), 0.0)
+        self.assertFalse(player.zenith_active)
+        self.assertEqual(book.spells['Zenith'].charges, 2)
+        self.assertEqual(book.clock.now, 0.0)
+
+
+class TestDamageWindow(unittest.TestCase):
+    def test_running_sum_matches_window_scan(self):
+        window = DamageWindow(4.0)
+        hits = [(i * 0.05, float(i % 7 + 1) * 1000.0) for i in range(400)]
+        for t, amount in hits:
+            window.record(t, amount)
+            expected = sum(d for ts, d in hits if t - 4.0 < ts <= t)
+            self.assertAlmostEqual(window.sum(t), expected, delta=expected * 1e-9)
+        # Only the last 4s of hits are retained
+        self.assertLessEqual(len(window), 81)
+        self.assertEqual(window.sum(100.0), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
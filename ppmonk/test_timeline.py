@@ -0,0 +1,87 @@
+import math
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from ppmonk.core.timeline import Timeline
+from ppmonk.envs.monk_env import MonkEnv
+
+
+class TestTimeline(unittest.TestCase):
+    def test_builtin_scenarios(self):
+        execute = Timeline(3)
+        self.assertEqual(execute.get_status(15.9), (True, 1.0, False))
+        self.assertEqual(execute.get_status(16.0), (True, 3.0, False))
+        self.assertEqual(execute.get_status(20.0), (True, 1.0, True))
+        self.assertEqual(execute.burst_start, 16.0)
+        np.testing.assert_allclose(execute.global_map[15:17], [1.0 / 3.0, 1.0])
+
+        downtime = Timeline(1)
+        self.assertFalse(downtime.get_status(10.0)[0])
+        self.assertTrue(downtime.get_status(12.0)[0])
+
+    def test_phases_and_boundaries(self):
+        timeline = Timeline(spec={
+            'duration': 300,
+            'downtime': [{'start': 100, 'end': 120}],
+            'damage_amp': [{'start': 50, 'end': 150, 'multiplier': 2.0}, {'start': 110, 'end': 130, 'multiplier': 1.5}],
+            'targets': [{'start': 0, 'end': 60, 'count': 4}],
+        })
+        self.assertIsNone(timeline.scenario_id)
+        self.assertEqual(timeline.boundaries, [0.0, 50.0, 60.0, 100.0, 110.0, 120.0, 130.0, 150.0, 300.0])
+        self.assertEqual(timeline.get_status(115.0), (False, 3.0, False))
+        self.assertEqual(timeline.get_status(125.0), (True, 3.0, False))
+        self.assertEqual(timeline.get_target_count(10.0), 4)
+        self.assertIsNone(timeline.get_target_count(60.0))
+        self.assertAlmostEqual(timeline.time_to_next_change(55.0), 5.0)
+        self.assertEqual(timeline.time_to_next_change(300.0), math.inf)
+        # Lookups going backwards in time still land in the right segment
+        self.assertEqual(timeline.get_status(20.0), (True, 1.0, False))
+
+    def test_invalid_window(self):
+        with self.assertRaises(ValueError):
+            Timeline(spec={'duration': 60, 'downtime': [{'start': 30, 'end': 20}]})
+
+    def test_invalid_scenario(self):
+        self.assertEqual(Timeline(spec={'duration': 60, 'scenario': 3}).scenario_id, 3)
+        for scenario in (4, -1, '1', 1.5):
+            with self.assertRaises(ValueError):
+                Timeline(spec={'duration': 60, 'scenario': scenario})
+
+    def test_from_yaml(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'timelines.yaml')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write("timelines:\n  long:\n    duration: 420\n    scenario: 3\n"
+                        "    damage_amp:\n      - {start: 400, end: 420, multiplier: 3.0}\n")
+            timeline = Timeline.from_yaml('long', path)
+            with self.assertRaises(KeyError):
+                Timeline.from_yaml('missing', path)
+        self.assertEqual((timeline.name, timeline.duration, timeline.scenario_id), ('long', 420.0, 3))
+        self.assertEqual(timeline.get_status(410.0)[1], 3.0)
+
+    def test_bundled_timelines_load(self):
+        for name in ('patchwerk_5min', 'council_7min', 'adds_8min'):
+            self.assertGreaterEqual(Timeline.from_yaml(name).duration, 300.0)
+
+
+class TestLongEncounter(unittest.TestCase):
+    def test_env_runs_to_the_end_of_the_fight(self):
+        env = MonkEnv(timeline='patchwerk_5min')
+        env.training_mode = False
+        env.reset()
+        done, steps = False, 0
+        while not done and steps < 5000:
+            # First usable spell, a simple priority list
+            usable = np.flatnonzero(env.action_masks()[1:])
+            _, _, done, _, _ = env.step(int(usable[0]) + 1 if usable.size else 0)
+            steps += 1
+        self.assertTrue(done)
+        self.assertAlmostEqual(env.time, 300.0)
+        self.assertFalse(env.action_masks().any())
+
+
+if __name__ == '__main__':
+    unittest.main()
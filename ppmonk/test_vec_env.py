@@ -0,0 +1,61 @@
+import importlib.util
+import unittest
+
+import numpy as np
+
+from ppmonk.envs.monk_env import MonkEnv
+from ppmonk.test_time_engine import BUILDS
+
+HAS_SB3 = importlib.util.find_spec('stable_baselines3') is not None
+
+
+@unittest.skipUnless(HAS_SB3, 'stable-baselines3 is not installed')
+class TestMonkVecEnv(unittest.TestCase):
+    def setUp(self):
+        from ppmonk.envs.vec_env import MonkVecEnv
+
+        self.vec = MonkVecEnv(3, seed=5, current_talents=BUILDS['default'], timeline=0)
+        self.solo = [MonkEnv(seed_offset=5 + i, current_talents=BUILDS['default'], timeline=0) for i in range(3)]
+
+    def test_matches_independent_envs(self):
+        obs = self.vec.reset()
+        solo_obs = np.stack([env.reset()[0] for env in self.solo])
+        np.testing.assert_array_equal(obs, solo_obs)
+
+        policy = np.random.default_rng(0)
+        for _ in range(40):
+            masks = self.vec.env_method('action_masks')
+            solo_masks = np.stack([env.action_masks() for env in self.solo])
+            np.testing.assert_array_equal(masks, solo_masks)
+            actions = np.array([policy.choice(np.flatnonzero(row)) for row in masks])
+
+            obs, rewards, dones, infos = self.vec.step(actions)
+            solo = []
+            for env, a in zip(self.solo, actions):
+                result = env.step(int(a))
+                if result[2]:
+                    result = (env.reset()[0], *result[1:])
+                solo.append((result[0].copy(), *result[1:]))
+
+            np.testing.assert_array_equal(obs, np.stack([s[0] for s in solo]))
+            np.testing.assert_array_equal(dones, [s[2] for s in solo])
+            np.testing.assert_allclose(rewards, np.array([s[1] for s in solo], dtype=np.float32))
+            self.assertEqual(len(infos), 3)
+
+    def test_done_envs_auto_reset(self):
+        self.vec.reset()
+        self.vec.envs[0].time = 60.0
+        obs, _, dones, infos = self.vec.step(np.zeros(3, dtype=np.int64))
+        self.assertTrue(dones[0])
+        self.assertIn('terminal_observation', infos[0])
+        self.assertLess(self.vec.envs[0].time, 20.0)
+        np.testing.assert_array_equal(obs[0], self.vec.envs[0]._get_obs())
+
+    def test_returned_observations_are_not_aliased(self):
+        first = self.vec.reset()
+        second, _, _, _ = self.vec.step(np.zeros(3, dtype=np.int64))
+        self.assertFalse(np.shares_memory(first, second))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -624,7 +624,8 @@ class SandboxWindow(ctk.CTkToplevel):
             rating_haste=haste,
             rating_mastery=mastery,
             rating_vers=vers,
-            weapon_type=self.weapon_type.get()
+            weapon_type=self.weapon_type.get(),
+            event_driven=True
         )
         self.sim_player.target_count = self.target_count.get()
 
@@ -1,6 +1,6 @@
 import customtkinter as ctk
 import tkinter as tk
-from ppmonk.core.talents import TALENT_DB
+from ppmonk.core.talent_tree import MONK_TALENT_DATA
 
 # Task 2: Talent Tree Refactor
 CANVAS_WIDTH = 1800
@@ -108,97 +108,6 @@ TALENT_LOCALIZATION = {
     "Xuen's\nBond": "雪怒羁绊"
 }
 
-MONK_TALENT_DATA = [
-    # --- Row 1 ---
-    {"id": "1-1", "label": "Fists of Fury", "row": 0, "col": 4, "max_rank": 1, "req": []},
-
-    # --- Row 2 ---
-    {"id": "2-1", "label": "Momentum\nBoost", "row": 1, "col": 3, "max_rank": 1, "req": ["1-1"]},
-    {"id": "2-2", "label": "Combat\nWisdom", "row": 1, "col": 4, "max_rank": 1, "req": ["1-1"]},
-    {"id": "2-3", "label": "Sharp\nReflexes", "row": 1, "col": 5, "max_rank": 1, "req": ["1-1"]},
-
-    # --- Row 3 ---
-    {"id": "3-1", "label": "Touch of\nthe Tiger", "row": 2, "col": 2, "max_rank": 1, "req": ["2-1"]},
-    {"id": "3-2", "label": "Ferociousness", "row": 2, "col": 3, "max_rank": 2, "req": ["2-1"]},
-    {"id": "3-3", "label": "Hardened\nSoles", "row": 2, "col": 5, "max_rank": 2, "req": ["2-3"]},
-    {"id": "3-4", "label": "Ascension", "row": 2, "col": 6, "max_rank": 1, "req": ["2-3"]},
-
-    # --- Row 4 ---
-    {"id": "4-1", "label": "Dual\nThreat", "row": 3, "col": 2, "max_rank": 1, "req": ["3-1", "3-2"]},
-    {"id": "4-2", "label": "Teachings of\nMonastery", "row": 3, "col": 4, "max_rank": 1, "req": ["2-2"]},
-    {"id": "4-3", "label": "Glory of\nthe Dawn", "row": 3, "col": 6, "max_rank": 1, "req": ["3-3", "3-4"]},
-
-    # --- Row 5 ---
-    {"id": "5-1", "label": "Crane\nVortex", "row": 4, "col": 1, "max_rank": 1, "req": ["4-1"]},
-    {"id": "5-2", "label": "Meridian\nStrikes", "row": 4, "col": 2, "max_rank": 1, "req": ["4-1"]},
-    {"id": "5-3", "label": "Rising\nStar", "row": 4, "col": 3, "max_rank": 1, "req": ["4-1", "4-2"]},
-    {"id": "5-4", "label": "Zenith", "row": 4, "col": 4, "max_rank": 1, "req": ["4-2"]},
-    {"id": "5-5", "label": "Hit\nCombo", "row": 4, "col": 5, "max_rank": 1, "req": ["4-2", "4-3"]},
-    {"id": "5-6", "label": "Brawler's\nIntensity", "row": 4, "col": 7, "max_rank": 1, "req": ["4-3"]},
-
-    # --- Row 6 ---
-    {"id": "6-1", "label": "Jade\nIgnition", "row": 5, "col": 1, "max_rank": 1, "req": ["5-1"]},
-    {"id": "6-2", "label": "Cyclone's\nDrift", "row": 5, "col": 2, "max_rank": 1, "req": ["5-1", "5-2", "5-3"],
-     "is_choice": True, "choices": ["Cyclone's\nDrift", "Crashing\nFists"]},
-    {"id": "6-3", "label": "Spiritual\nFocus", "row": 5, "col": 3, "max_rank": 1, "req": ["5-4"],
-     "is_choice": True, "choices": ["Spiritual\nFocus", "Drinking\nHorn Cover"]},
-    {"id": "6-4", "label": "Obsidian\nSpiral", "row": 5, "col": 5, "max_rank": 1, "req": ["5-4"]},
-    {"id": "6-5", "label": "Combo\nBreaker", "row": 5, "col": 6, "max_rank": 1, "req": ["5-5", "5-6"]},
-
-    # --- Row 7 ---
-    {"id": "7-1", "label": "Dance of\nChi-Ji", "row": 6, "col": 2, "max_rank": 1, "req": ["6-1", "6-2"]},
-    {"id": "7-2", "label": "Shadowboxing\nTreads", "row": 6, "col": 3, "max_rank": 1, "req": ["6-2", "6-3"]},
-    {"id": "7-3", "label": "Whirling\nDragon Punch", "row": 6, "col": 4, "max_rank": 1, "req": ["5-4"],
-     "is_choice": True, "choices": ["Whirling\nDragon Punch", "Strike of\nWindlord"]},
-    {"id": "7-4", "label": "Energy\nBurst", "row": 6, "col": 5, "max_rank": 1, "req": ["6-5"]},
-    {"id": "7-5", "label": "Inner\nPeace", "row": 6, "col": 7, "max_rank": 1, "req": ["6-5"]},
-
-    # --- Row 8 ---
-    {"id": "8-1", "label": "Tiger Eye\nBrew", "row": 7, "col": 0, "max_rank": 1, "req": []},
-    {"id": "8-2", "label": "Sequenced\nStrikes", "row": 7, "col": 1, "max_rank": 1, "req": ["7-1"]},
-    {"id": "8-3", "label": "Sunfire\nSpiral", "row": 7, "col": 2, "max_rank": 1, "req": ["7-2"]},
-    {"id": "8-4", "label": "Communion\nw/ Wind", "row": 7, "col": 3, "max_rank": 1, "req": ["7-3"]},
-    {"id": "8-5", "label": "Echo\nTechnique", "row": 7, "col": 4, "max_rank": 1, "req": ["7-3"],
-     "is_choice": True, "choices": ["Echo\nTechnique", "Revolving\nWhirl"]},
-    {"id": "8-6", "label": "Universal\nEnergy", "row": 7, "col": 5, "max_rank": 1, "req": ["7-3", "7-4"]},
-    {"id": "8-7", "label": "Memory of\nMonastery", "row": 7, "col": 6, "max_rank": 1, "req": ["7-4", "7-5"]},
-
-    # --- Row 9 ---
-    # Task 2: max_rank 2
-    {"id": "9-1", "label": "TEB\nBuff", "row": 8, "col": 0, "max_rank": 2, "req": ["8-1"]},
-    {"id": "9-2", "label": "Rushing\nJade Wind", "row": 8, "col": 1, "max_rank": 1, "req": ["8-2"]},
-    {"id": "9-3", "label": "Xuen's\nBattlegear", "row": 8, "col": 2, "max_rank": 1, "req": ["8-2", "8-3", "8-4"]},
-    {"id": "9-4", "label": "Thunderfist", "row": 8, "col": 3, "max_rank": 1, "req": ["8-5"]},
-    {"id": "9-5", "label": "Weapon of\nWind", "row": 8, "col": 4, "max_rank": 1, "req": ["8-5"]},
-    {"id": "9-6", "label": "Knowledge\nTemple", "row": 8, "col": 5, "max_rank": 1, "req": ["8-5", "8-6"]},
-    {"id": "9-7", "label": "Slicing\nWinds", "row": 8, "col": 6, "max_rank": 1, "req": ["8-6", "8-7"]},
-    {"id": "9-8", "label": "Jadefire\nStomp", "row": 8, "col": 7, "max_rank": 1, "req": ["8-7"]},
-
-    # --- Row 10 ---
-    {"id": "10-1", "label": "TEB\nFinal", "row": 9, "col": 0, "max_rank": 1, "req": ["9-1"]},
-    {"id": "10-2", "label": "Skyfire\nHeel", "row": 9, "col": 1, "max_rank": 1, "req": ["9-3"]},
-    {"id": "10-3", "label": "Harmonic\nCombo", "row": 9, "col": 2, "max_rank": 1, "req": ["9-3"]},
-    {"id": "10-4", "label": "Flurry of\nXuen", "row": 9, "col": 3, "max_rank": 1, "req": ["9-3", "9-4", "9-5"]},
-    {"id": "10-5", "label": "Martial\nAgility", "row": 9, "col": 5, "max_rank": 1, "req": ["9-5", "9-6"]},
-    {"id": "10-6", "label": "Airborne\nRhythm", "row": 9, "col": 6, "max_rank": 1, "req": ["9-7"],
-     "is_choice": True, "choices": ["Airborne\nRhythm", "Hurricane's\nVault"]},
-    {"id": "10-7", "label": "Path of\nJade", "row": 9, "col": 7, "max_rank": 1, "req": ["9-8"],
-     "is_choice": True, "choices": ["Path of\nJade", "Singularly\nFocused"]},
-
-    # --- Simplified Hero Talents (Right Side) ---
-
-    # Shado-Pan Tree (Column 9-11 area)
-    {"id": "hero-sp-header", "label": "Shado-Pan\nTree", "row": 0, "col": 9, "max_rank": 1, "req": []},
-    {"id": "hero-sp-choice1", "label": "Pride of\nPandaria", "row": 1, "col": 9, "max_rank": 1, "req": ["hero-sp-header"],
-     "is_choice": True, "choices": ["Pride of\nPandaria", "High\nImpact"]},
-
-    # Conduit of the Celestials Tree (Column 11 area)
-    {"id": "hero-cotc-header", "label": "Celestial\nTree", "row": 0, "col": 11, "max_rank": 1, "req": []},
-    {"id": "hero-cotc-choice1", "label": "Xuen's\nGuidance", "row": 1, "col": 11, "max_rank": 1, "req": ["hero-cotc-header"],
-     "is_choice": True, "choices": ["Xuen's\nGuidance", "Temple\nTraining"]},
-    {"id": "hero-cotc-choice2", "label": "Restore\nBalance", "row": 2, "col": 11, "max_rank": 1, "req": ["hero-cotc-choice1"],
-     "is_choice": True, "choices": ["Restore\nBalance", "Xuen's\nBond"]},
-]
 
 class TalentNode:
     def __init__(self, canvas, data, onClick):
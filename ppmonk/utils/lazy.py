@@ -0,0 +1,38 @@
+"""Lazy package exports (PEP 562).
+
+Package ``__init__`` modules map their public names to the submodules that
+define them; nothing is imported until a name is first accessed, so
+``import ppmonk.core.player`` does not drag in numpy through the timeline
+and ``import ppmonk.sim`` does not load gymnasium until an env is built.
+"""
+
+from __future__ import annotations
+
+import importlib
+import sys
+
+
+def lazy_exports(package: str, exports: dict[str, str]):
+    """Return the ``__getattr__`` and ``__dir__`` for ``package``.
+
+    ``exports`` maps a public name to ``'.module:attr'`` (an attribute of a
+    submodule) or ``'.module'`` (the submodule itself). Resolved values are
+    stored on the package, so each name costs one import at most.
+    """
+
+    def __getattr__(name: str):
+        try:
+            target = exports[name]
+        except KeyError:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}") from None
+        module_name, _, attr = target.partition(':')
+        value = importlib.import_module(module_name, package)
+        if attr:
+            value = getattr(value, attr)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+
+    return __getattr__, __dir__
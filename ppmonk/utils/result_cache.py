@@ -0,0 +1,199 @@
+"""Content-addressed on-disk cache of finished simulations.
+
+Every entry is a directory named after the SHA-256 of the full simulation
+configuration (talents in application order, player kwargs, scenario,
+target count, training settings and ``ENGINE_VERSION``). It holds the trained
+policy (``policy.zip``, written by the model's own ``save``, and its
+torch-free export ``policy.npz``), ``result.json``
+with the timeline data, damage meter and evaluation log, and ``meta.json``
+with the readable configuration that ``nearest`` searches for warm starts.
+
+Entries are written to a temporary directory and renamed into place, so a
+crashed run never leaves a half-written entry behind. Reading an entry bumps
+its ``result.json`` mtime; once the cache grows past ``max_bytes`` the least
+recently used entries are deleted.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import shutil
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from ppmonk.core.version import ENGINE_VERSION
+
+DEFAULT_CACHE_DIR = os.path.join('cache', 'results')
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+POLICY_FILE = 'policy.zip'
+NUMPY_POLICY_FILE = 'policy.npz'
+RESULT_FILE = 'result.json'
+META_FILE = 'meta.json'
+
+
+def _json_default(value):
+    # numpy scalars and arrays that end up in log details
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return str(value)
+
+
+def cache_key(talents: Iterable[str], player_kwargs: Optional[Dict[str, Any]], scenario,
+              target_count: int = 1, extra: Optional[Dict[str, Any]] = None) -> str:
+    """Hash of everything that determines a simulation's outcome.
+
+    Talents keep their order (duplicates dropped) because several of them do
+    not commute; ``extra`` carries training settings such as the step count.
+    """
+    payload = {
+        'talents': list(dict.fromkeys(talents or [])),
+        'player_kwargs': sorted((player_kwargs or {}).items()),
+        'scenario': scenario,
+        'target_count': int(target_count),
+        'extra': sorted((extra or {}).items()),
+        'engine': ENGINE_VERSION,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=_json_default).encode('utf-8')).hexdigest()
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class ResultCache:
+    """Directory of simulation results with LRU eviction under a size cap."""
+
+    def __init__(self, root: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def _entry(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.isfile(os.path.join(self._entry(key), RESULT_FILE))
+
+    def policy_path(self, key: str) -> Optional[str]:
+        """Path of the entry's saved policy, or None if it has none."""
+        path = os.path.join(self._entry(key), POLICY_FILE)
+        return path if os.path.isfile(path) else None
+
+    def numpy_policy_path(self, key: str) -> Optional[str]:
+        """Path of the entry's exported ``NumpyPolicy``, or None if it has none."""
+        path = os.path.join(self._entry(key), NUMPY_POLICY_FILE)
+        return path if os.path.isfile(path) else None
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Stored result for ``key`` (and mark it recently used), or None on a miss."""
+        path = os.path.join(self._entry(key), RESULT_FILE)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return result
+
+    def meta(self, key: str) -> Optional[Dict[str, Any]]:
+        """Configuration stored with the entry, or None."""
+        try:
+            with open(os.path.join(self._entry(key), META_FILE), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, result: Dict[str, Any], save_policy: Optional[Callable[[str], None]] = None,
+            meta: Optional[Dict[str, Any]] = None, save_numpy_policy: Optional[Callable[[str], None]] = None) -> None:
+        """Store ``result`` under ``key``; ``save_policy(path)`` / ``save_numpy_policy(path)`` write the policy files."""
+        os.makedirs(self.root, exist_ok=True)
+        tmp = os.path.join(self.root, f'.tmp-{key}-{uuid.uuid4().hex}')
+        os.makedirs(tmp)
+        try:
+            if save_policy is not None:
+                save_policy(os.path.join(tmp, POLICY_FILE))
+            if save_numpy_policy is not None:
+                save_numpy_policy(os.path.join(tmp, NUMPY_POLICY_FILE))
+            if meta is not None:
+                with open(os.path.join(tmp, META_FILE), 'w', encoding='utf-8') as f:
+                    json.dump({**meta, 'engine': ENGINE_VERSION}, f, ensure_ascii=False, default=_json_default)
+            with open(os.path.join(tmp, RESULT_FILE), 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False, default=_json_default)
+            final = self._entry(key)
+            if os.path.exists(final):
+                shutil.rmtree(final, ignore_errors=True)
+            os.replace(tmp, final)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        self.evict(keep=key)
+
+    def entries(self) -> List[Tuple[str, float, int]]:
+        """``(key, last_used, size_bytes)`` of every complete entry, least recently used first."""
+        if not os.path.isdir(self.root):
+            return []
+        found = []
+        for key in os.listdir(self.root):
+            if key.startswith('.'):
+                continue
+            try:
+                last_used = os.path.getmtime(os.path.join(self._entry(key), RESULT_FILE))
+            except OSError:
+                continue
+            found.append((key, last_used, _dir_size(self._entry(key))))
+        return sorted(found, key=lambda entry: entry[1])
+
+    def nearest(self, match: Dict[str, Any], stats: Dict[str, float],
+                max_distance: float = math.inf) -> Optional[Tuple[str, float]]:
+        """Closest entry with a saved policy for the same configuration, as ``(key, distance)``.
+
+        Candidates must have been trained by the current engine and agree
+        with ``match`` on every field; among them the one whose
+        ``meta['stats']`` is nearest to ``stats`` (Euclidean) wins, if it is
+        within ``max_distance``.
+        """
+        match = json.loads(json.dumps(match, default=_json_default))
+        best = None
+        for key, _, _ in self.entries():
+            meta = self.meta(key)
+            if not meta or meta.get('engine') != ENGINE_VERSION or self.policy_path(key) is None:
+                continue
+            if any(meta.get(field) != value for field, value in match.items()):
+                continue
+            other = meta.get('stats') or {}
+            if set(other) != set(stats):
+                continue
+            distance = math.sqrt(sum((float(other[stat]) - float(value)) ** 2 for stat, value in stats.items()))
+            if distance <= max_distance and (best is None or distance < best[1]):
+                best = (key, distance)
+        return best
+
+    def size(self) -> int:
+        return sum(size for _, _, size in self.entries())
+
+    def evict(self, keep: Optional[str] = None) -> List[str]:
+        """Delete least recently used entries until the cache fits ``max_bytes``; returns the removed keys."""
+        entries = self.entries()
+        total = sum(size for _, _, size in entries)
+        removed = []
+        for key, _, size in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self._entry(key), ignore_errors=True)
+            total -= size
+            removed.append(key)
+        return removed
+
+    def clear(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
+
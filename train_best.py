@@ -4,13 +4,16 @@ from __future__ import annotations
 
 import os
 
+import numpy as np
 import torch
 from stable_baselines3.common.callbacks import CallbackList, CheckpointCallback, EvalCallback
-from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv, VecMonitor
+from stable_baselines3.common.vec_env import DummyVecEnv, VecMonitor
 from sb3_contrib import MaskablePPO
 from sb3_contrib.common.wrappers import ActionMasker
 
 from ppmonk.envs.monk_env import MonkEnv
+from ppmonk.envs.shared_vec_env import SharedMemoryMonkVecEnv
+from ppmonk.sim.numpy_policy import export_policy
 
 LOG_DIR = "./logs/"
 MODEL_DIR = "./models/"
@@ -29,16 +32,6 @@ def mask_fn(env: MonkEnv):
     return env.action_masks()
 
 
-def make_train_env(rank: int, seed: int = 0):
-    """Factory to create a masked training environment with a unique seed."""
-
-    def _init():
-        env = MonkEnv(seed_offset=rank + seed)
-        return ActionMasker(env, mask_fn)
-
-    return _init
-
-
 def make_eval_env():
     """Create a deterministic evaluation environment without RSI."""
 
@@ -68,7 +61,8 @@ def run_training():
 
     print(f">>> [Init] 启动 {NUM_CPU} 核并行训练...")
 
-    train_env = SubprocVecEnv([make_train_env(i) for i in range(NUM_CPU)])
+    # Env i keeps seed_offset i, as with the former per-rank SubprocVecEnv factories
+    train_env = SharedMemoryMonkVecEnv(NUM_CPU)
     train_env = VecMonitor(train_env, filename=os.path.join(LOG_DIR, "train_monitor"))
 
     eval_env = DummyVecEnv([make_eval_env])
@@ -113,14 +107,17 @@ def run_training():
 
     print("\n>>> [Demo] 加载最强模型进行演示...")
     best_model = MaskablePPO.load(os.path.join(MODEL_DIR, "best_model"), env=eval_env)
+    # Torch-free copy of the actor for evaluate.py, Monte Carlo runs and the UI replay
+    policy = export_policy(best_model, os.path.join(MODEL_DIR, "best_model.npz"))
+    print(f">>> [Export] {os.path.join(MODEL_DIR, 'best_model.npz')}")
 
     reset_output = eval_env.reset()
     obs = reset_output[0] if isinstance(reset_output, tuple) else reset_output
     print(f"{'Time':<6} | {'Action':<8} | {'Dmg':<6}")
 
     for _ in range(25):
-        action_masks = eval_env.env_method("action_masks")[0]
-        action, _ = best_model.predict(obs, action_masks=action_masks, deterministic=True)
+        action_masks = np.stack(eval_env.env_method("action_masks"))
+        action = policy.act(obs, action_masks)
         obs, rewards, dones, infos = eval_env.step(action)
         if dones[0]:
             break